@@ -0,0 +1,44 @@
+"""
+Concurrent in-flight orders from one process on the asyncio client, against the local mock exchange.
+
+    cd src && python -m benchmarks.bench_async_orders --orders 5000 --latency 0.05
+"""
+
+import asyncio
+import logging
+import time
+
+import typer
+
+from benchmarks.mock_exchange import MockExchange
+from utils.async_http_client import AsyncHTTPClient
+from utils.hmac_auth import AsyncHMACAuthenticator, HMACAuthConfig
+
+ORDER = {'book': 'btc_mxn', 'side': 'buy', 'type': 'market', 'major': '0.001'}
+
+
+async def _place_all(url: str, orders: int):
+    client = AsyncHTTPClient()
+    auth = AsyncHMACAuthenticator(HMACAuthConfig('key', 'secret'), async_http_client=client, exchange=None)
+
+    async def place():
+        response = await auth.authenticated_request_async(f'{url}/v3/orders', 'POST', ORDER)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(place() for _ in range(orders)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return elapsed
+
+
+def main(orders: int = typer.Option(2000), latency: float = typer.Option(0.05, help='Mock server latency (s)')):
+    logging.disable(logging.INFO)
+    with MockExchange(latency=latency) as url:
+        elapsed = asyncio.run(_place_all(url, orders))
+    print(f'{orders} concurrent orders, {latency * 1000:.0f}ms server latency: '
+          f'{elapsed:.2f}s total, {orders / elapsed:.0f} orders/s')
+
+
+if __name__ == '__main__':
+    typer.run(main)
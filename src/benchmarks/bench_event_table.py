@@ -0,0 +1,93 @@
+"""
+Data-driven events at scale: startup time and memory of CSV and SQLite event tables, the cost
+of each event once loaded, and webhook key lookups (first hit loads the event, later hits don't).
+
+    cd src && python -m benchmarks.bench_event_table --events 10000,100000
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import typer
+
+from components.actions.base.action import Action, ActionManager
+from components.events.base.event import Event, EventManager
+from components.events.base.table import open_event_table
+
+
+class NoopAction(Action):
+    def run(self, *args, **kwargs):
+        pass
+
+
+def _write_tables(directory: str, count: int):
+    rows = [(f'Strategy{i}Acct{i % 50}', 'NoopAction', 'symbol in {EURUSD, GBPUSD}' if i % 2 else '', 1)
+            for i in range(count)]
+    csv_path = os.path.join(directory, f'events-{count}.csv')
+    with open(csv_path, 'w') as table:
+        table.write('name,actions,rule,active\n')
+        table.writelines(f'{name},{actions},"{rule}",{active}\n' for name, actions, rule, active in rows)
+    db_path = os.path.join(directory, f'events-{count}.db')
+    db = sqlite3.connect(db_path)
+    db.execute('CREATE TABLE events (name TEXT PRIMARY KEY, actions TEXT, rule TEXT, active INTEGER)')
+    db.executemany('INSERT INTO events VALUES (?, ?, ?, ?)', rows)
+    db.commit()
+    db.close()
+    return [name for name, *_ in rows], csv_path, db_path
+
+
+def _open(path: str, action_manager) -> EventManager:
+    manager = EventManager()
+    manager.add_table(open_event_table(path, action_manager))
+    return manager
+
+
+def _measure(label: str, path: str, names, action_manager, lookups: int):
+    keys = [Event(name).key for name in random.sample(names, min(lookups, len(names)))]
+
+    # timings first, without tracemalloc slowing every allocation down
+    start = time.perf_counter()
+    manager = _open(path, action_manager)
+    startup = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        manager.find(key)
+    first = (time.perf_counter() - start) / len(keys)
+    start = time.perf_counter()
+    for key in keys:
+        manager.find(key)
+    cached = (time.perf_counter() - start) / len(keys)
+    start = time.perf_counter()
+    manager.get_all()
+    load_all = time.perf_counter() - start
+    del manager
+
+    tracemalloc.start()
+    manager = _open(path, action_manager)
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    events = manager.get_all()
+    per_event = (tracemalloc.get_traced_memory()[0] - table_bytes) / len(events)
+    tracemalloc.stop()
+
+    print(f'{label:<14} startup {startup * 1000:7.1f}ms  table {table_bytes / len(names):5.0f} B/event  '
+          f'lookup first {first * 1e6:5.1f}us cached {cached * 1e6:4.2f}us  '
+          f'load all {load_all:5.2f}s {per_event:4.0f} B/event')
+
+
+def main(events: str = typer.Option('10000,100000'), lookups: int = typer.Option(1000)):
+    action_manager = ActionManager()
+    action_manager._actions.append(NoopAction())
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        for count in [int(value) for value in events.split(',')]:
+            names, csv_path, db_path = _write_tables(directory, count)
+            _measure(f'csv {count}', csv_path, names, action_manager, lookups)
+            _measure(f'sqlite {count}', db_path, names, action_manager, lookups)
+
+
+if __name__ == '__main__':
+    typer.run(main)
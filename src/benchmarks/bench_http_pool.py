@@ -0,0 +1,59 @@
+"""
+Per-order latency against the local mock exchange, with cold (new connection per order)
+and warm (pooled keep-alive) connections.
+
+    cd src && python -m benchmarks.bench_http_pool --orders 500
+"""
+
+import logging
+import statistics
+import time
+
+import typer
+
+from benchmarks.mock_exchange import MockExchange
+from utils.hmac_auth import HMACAuthConfig, HMACAuthenticator
+from utils.http_client import HTTPClient
+
+ORDER = {'book': 'btc_mxn', 'side': 'buy', 'type': 'market', 'major': '0.001'}
+
+
+def _report(label: str, samples):
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f'{label:<6} mean={statistics.mean(samples) * 1000:.3f}ms '
+          f'p50={statistics.median(samples) * 1000:.3f}ms p99={p99 * 1000:.3f}ms')
+
+
+def main(orders: int = typer.Option(500), latency: float = typer.Option(0.0, help='Mock server latency (s)')):
+    logging.disable(logging.INFO)
+    with MockExchange(latency=latency) as url:
+        endpoint = f'{url}/v3/orders'
+
+        cold = []
+        for _ in range(orders):
+            # a fresh pool per order pays TCP setup every time, as the old requests.request() path did
+            client = HTTPClient()
+            auth = HMACAuthenticator(HMACAuthConfig('key', 'secret'), http_client=client, exchange=None)
+            start = time.perf_counter()
+            auth.authenticated_request(endpoint, 'POST', ORDER).raise_for_status()
+            cold.append(time.perf_counter() - start)
+            client.close()
+
+        client = HTTPClient()
+        auth = HMACAuthenticator(HMACAuthConfig('key', 'secret'), http_client=client, exchange=None)
+        auth.authenticated_request(endpoint, 'POST', ORDER)
+        warm = []
+        for _ in range(orders):
+            start = time.perf_counter()
+            auth.authenticated_request(endpoint, 'POST', ORDER).raise_for_status()
+            warm.append(time.perf_counter() - start)
+        client.close()
+
+    print(f'{orders} orders against {url}')
+    _report('cold', cold)
+    _report('warm', warm)
+
+
+if __name__ == '__main__':
+    typer.run(main)
@@ -0,0 +1,66 @@
+"""
+Revaluing open positions on a price update: the vectorized PnLEngine against a per-position
+Python loop over the same data.
+
+    cd src && python -m benchmarks.bench_pnl_engine --positions 100000 --symbols 50
+"""
+
+import statistics
+import time
+
+import numpy as np
+import typer
+
+from utils.pnl_engine import PnLEngine
+
+
+def _report(label: str, samples):
+    print(f'{label:<10} mean={statistics.mean(samples) * 1000:.3f}ms p50={statistics.median(samples) * 1000:.3f}ms')
+
+
+def main(positions: int = typer.Option(100000), symbols: int = typer.Option(50),
+         updates: int = typer.Option(100)):
+    rng = np.random.default_rng(0)
+    names = [f'SYM{i}' for i in range(symbols)]
+    engine = PnLEngine()
+    rows = []
+
+    start = time.perf_counter()
+    for key in range(positions):
+        symbol = names[key % symbols]
+        side = 'buy' if key % 2 else 'sell'
+        volume, entry = float(rng.uniform(0.01, 5)), float(rng.uniform(0.9, 1.1))
+        engine.open(key, symbol, side, volume, entry, contract_size=100000)
+        rows.append((symbol, 1 if key % 2 else -1, volume, entry))
+    print(f'opened {positions} positions on {symbols} symbols in {time.perf_counter() - start:.3f}s')
+
+    def quotes():
+        return {name: (bid, bid + 0.0002) for name, bid in zip(names, rng.uniform(0.9, 1.1, symbols).tolist())}
+
+    vectorized = []
+    for _ in range(updates):
+        update = quotes()
+        start = time.perf_counter()
+        engine.update_prices(update)
+        vectorized.append(time.perf_counter() - start)
+
+    looped = []
+    for _ in range(max(updates // 10, 1)):
+        update = quotes()
+        start = time.perf_counter()
+        total = 0.0
+        for symbol, side, volume, entry in rows:
+            bid, ask = update[symbol]
+            total += ((bid if side > 0 else ask) - entry) * side * volume * 100000
+        looped.append(time.perf_counter() - start)
+
+    _report('vectorized', vectorized)
+    _report('loop', looped)
+    start = time.perf_counter()
+    for _ in range(10000):
+        engine.exposure(names[0])
+    print(f'exposure lookup {(time.perf_counter() - start) / 10000 * 1e6:.2f}us')
+
+
+if __name__ == '__main__':
+    typer.run(main)
@@ -0,0 +1,61 @@
+"""
+Content-based routing: match time per payload as the number of rules grows, against
+checking every rule in turn.
+
+    cd src && python -m benchmarks.bench_routing --payloads 20000
+"""
+
+import random
+import time
+
+import typer
+
+from utils.routing import RoutingIndex, parse_rule
+
+SYMBOLS = ['EURUSD', 'GBPUSD', 'USDJPY', 'XAUUSD', 'BTCMXN', 'ETHMXN']
+
+
+def _rules(count: int):
+    rules = []
+    for i in range(count):
+        symbols = ', '.join(random.sample(SYMBOLS, 2))
+        if i % 3 == 0:
+            rules.append(f'strategy == s{i} and symbol in {{{symbols}}}')
+        elif i % 3 == 1:
+            rules.append(f'strategy == s{i} and side == sell and volume < 1')
+        else:
+            rules.append(f'strategy == s{i} and symbol not in {{{symbols}}}')
+    return rules
+
+
+def _report(label: str, elapsed: float, payloads: int):
+    print(f'{label:<24} {payloads / elapsed:>12,.0f}/s  {elapsed / payloads * 1e6:.2f}us per payload')
+
+
+def main(payloads: int = typer.Option(20000), rules: str = typer.Option('10,100,1000,10000')):
+    for count in [int(value) for value in rules.split(',')]:
+        random.seed(count)
+        index = RoutingIndex()
+        compiled = []
+        for i, rule in enumerate(_rules(count)):
+            index.add(i, rule)
+            compiled.append((i, parse_rule(rule)))
+        index.compile()
+        samples = [{'strategy': f's{random.randrange(count)}', 'symbol': random.choice(SYMBOLS),
+                    'side': random.choice(['buy', 'sell']), 'volume': '0.5'} for _ in range(payloads)]
+
+        start = time.perf_counter()
+        for payload in samples:
+            index.match(payload)
+        _report(f'{count} rules, index', time.perf_counter() - start, payloads)
+
+        # scanning every rule is slow at large counts, a sample is enough
+        scanned = samples[:max(100, payloads * 10 // count)]
+        start = time.perf_counter()
+        for payload in scanned:
+            [target for target, conditions in compiled if all(condition.test(payload) for condition in conditions)]
+        _report(f'{count} rules, scan', time.perf_counter() - start, len(scanned))
+
+
+if __name__ == '__main__':
+    typer.run(main)
@@ -0,0 +1,112 @@
+"""
+Minimal local stand-in for the Bitso and Recall REST APIs, used by the benchmarks.
+Speaks HTTP/1.1 with keep-alive so connection reuse can be measured.
+"""
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_order_ids = itertools.count(1)
+
+
+class MockExchangeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately; without this, delayed ACKs add ~40ms per keep-alive response
+    disable_nagle_algorithm = True
+    # seconds of artificial server-side latency per request
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path.endswith('/v3/balance'):
+            self._send({'success': True, 'payload': {'balances': [
+                {'currency': 'btc', 'available': '1.0', 'locked': '0', 'total': '1.0'},
+                {'currency': 'mxn', 'available': '100000.0', 'locked': '0', 'total': '100000.0'},
+            ]}})
+        elif path.endswith('/v3/available_books'):
+            self._send({'success': True, 'payload': [
+                {'book': 'btc_mxn', 'minimum_amount': '0.00001', 'maximum_amount': '500',
+                 'minimum_price': '100', 'maximum_price': '10000000', 'minimum_value': '10',
+                 'maximum_value': '10000000', 'tick_size': '10'},
+            ]})
+        elif path.endswith('/v3/orders') or path.endswith('/v3/open_orders'):
+            self._send({'success': True, 'payload': []})
+        elif '/v3/order_trades/' in path:
+            # every order traded in one fill of 0.001 btc
+            oid = path.rsplit('/', 1)[-1]
+            self._send({'success': True, 'payload': [
+                {'book': 'btc_mxn', 'oid': oid, 'major': '-0.00100000', 'minor': '1000.00', 'price': '1000000'},
+            ]})
+        elif path.endswith('/api/agent/portfolio'):
+            self._send({'success': True, 'tokens': []})
+        else:
+            self._send({'success': True, 'payload': {}})
+
+    def do_POST(self):
+        body = self._read_body()
+        path = urlparse(self.path).path
+        if path.endswith('/v3/orders'):
+            self._send({'success': True, 'payload': {'oid': str(next(_order_ids))}})
+        elif path.endswith('/api/trade/execute'):
+            self._send({'success': True, 'transaction': {'id': str(next(_order_ids)), **(body or {})}})
+        else:
+            self._send({'success': False, 'error': {'message': 'not found'}}, status=404)
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        oids = parse_qs(url.query).get('oids')
+        if oids:
+            self._send({'success': True, 'payload': oids[0].split(',')})
+        elif url.path.endswith('/all'):
+            self._send({'success': True, 'payload': []})
+        else:
+            self._send({'success': True, 'payload': [url.path.rsplit('/', 1)[-1]]})
+
+
+class _MockExchangeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connection bursts from the concurrency benchmarks
+    request_queue_size = 1024
+
+
+class MockExchange:
+    """Runs the mock exchange on a background thread: `with MockExchange() as url: ...`"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0):
+        handler = type('Handler', (MockExchangeHandler,), {'latency': latency})
+        self.server = _MockExchangeServer((host, port), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self.url
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -4,6 +4,13 @@ import uuid
 LOG_LOCATION = 'components/logs/log.log'
 LOG_LIMIT = 100
 
+# in-memory history kept per event/action (ring buffers, oldest entries are dropped)
+EVENT_LOG_CAPACITY = 1000
+ACTION_LOG_CAPACITY = 1000
+ACTION_STATS_WINDOW = 100
+# recent signals kept per (strategy, symbol) for ProcessSignal's rolling statistics
+SIGNAL_WINDOW = 500
+
 # ensure log file exists
 try:
     open(LOG_LOCATION, 'r')
@@ -1,8 +1,12 @@
 import datetime
+from collections import deque
 from logging import getLogger, DEBUG
 
+from commons import ACTION_LOG_CAPACITY, ACTION_STATS_WINDOW
+from components.logs.history import RunStats
 from components.logs.log_event import LogEvent
 from utils.log import get_logger
+from utils.registry_cache import registry_version
 
 logger = get_logger(__name__)
 
@@ -35,6 +39,8 @@ am = ActionManager()
 
 
 class ActionLogEvent:
+    __slots__ = ('timestamp', 'status', 'msg')
+
     def __init__(self, status, msg):
         self.timestamp = datetime.datetime.now()
         self.status = status
@@ -43,10 +49,13 @@ class ActionLogEvent:
 
 class Action:
     objects = am
+    # Schema a payload must match for this action to run (None accepts anything)
+    schema = None
 
     def __init__(self):
         self.name = self.get_name()
-        self.logs = []
+        self.logs = deque(maxlen=ACTION_LOG_CAPACITY)
+        self.stats = RunStats(window=ACTION_STATS_WINDOW)
         self._raw_data = None
 
     def get_name(self):
@@ -62,11 +71,45 @@ class Action:
         """
         return self.logs
 
+    def get_stats(self):
+        """
+        Gets rolling run aggregates
+        :return: dict
+        """
+        return self.stats.as_json()
+
+    def record_run(self, latency: float, error: Exception = None):
+        """
+        Records the outcome of a run, called by the triggering event
+        :param latency: run time in seconds
+        :param error: exception raised by the run, if any
+        """
+        self.stats.record(latency, error)
+        if error is not None:
+            self.logs.append(ActionLogEvent('ERROR', str(error)))
+
+    def order_intent(self, data: dict, strategy: str):
+        """
+        Describes the order a run with this data would send, for the pre-trade risk checks
+        :param strategy: name the order counts against for rate limits
+        :return: OrderIntent, or None if the data doesn't send an order
+        """
+        return None
+
+    def record_rejection(self, error: Exception):
+        """
+        Records a run skipped before it started (pre-trade risk check or schema)
+        :param error: the RiskRejected or SchemaError raised
+        """
+        self.logs.append(ActionLogEvent('REJECTED', str(error)))
+        logger.warning(f'ACTION REJECTED --->\t{str(self)}: {error}')
+
     def register(self):
         """
         Registers action with manager
         """
         self.objects._actions.append(self)
+        registry_version.bump()
         logger.info(f'ACTION REGISTERED --->\t{str(self)}')
 
     def set_data(self, data):
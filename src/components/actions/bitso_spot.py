@@ -1,19 +1,271 @@
+import asyncio
+import threading
+from decimal import Decimal, ROUND_DOWN
+from typing import Optional
+from urllib.parse import urlencode
+
 from components.actions.base.action import Action
-from utils.hmac_auth import create_hmac_authenticator
+from components.schemas.trading import BitsoOrder
+from utils.background import PeriodicTask
+from utils.cache import CachedValue
+from utils.hmac_auth import create_async_hmac_authenticator
 from utils.log import get_logger
+from utils.pnl_engine import get_pnl_engine
+from utils.risk import OrderIntent, get_risk_engine
 from config import bitso_config
 import json
+import time
 
 logger = get_logger(__name__)
 
+# order ids per bulk cancel request (DELETE /v3/orders?oids=...)
+CANCEL_BATCH_SIZE = 20
+# page size for GET /v3/open_orders (the API maximum)
+OPEN_ORDERS_PAGE_SIZE = 100
+
+
+def _batches(items, size):
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class BitsoBookRules:
+    """
+    Order limits for one Bitso book, parsed from /v3/available_books
+    """
+
+    __slots__ = ('book', 'minimum_amount', 'maximum_amount', 'minimum_price', 'maximum_price',
+                 'minimum_value', 'maximum_value', 'tick_size', 'amount_step', 'value_step')
+
+    def __init__(self, payload: dict):
+        def dec(key):
+            value = payload.get(key)
+            return Decimal(str(value)) if value not in (None, '') else None
+
+        self.book = payload['book']
+        self.minimum_amount = dec('minimum_amount')
+        self.maximum_amount = dec('maximum_amount')
+        self.minimum_price = dec('minimum_price')
+        self.maximum_price = dec('maximum_price')
+        self.minimum_value = dec('minimum_value')
+        self.maximum_value = dec('maximum_value')
+        self.tick_size = dec('tick_size')
+        # Bitso doesn't publish amount precision; minimum_amount carries the book's decimals
+        exponent = self.minimum_amount.as_tuple().exponent if self.minimum_amount else -8
+        self.amount_step = Decimal(1).scaleb(min(exponent, 0))
+        exponent = self.minimum_value.as_tuple().exponent if self.minimum_value else -2
+        self.value_step = Decimal(1).scaleb(min(exponent, 0))
+
+    def validate_minor(self, minor: str) -> str:
+        """
+        Rounds a quote-currency (minor) amount down to the book's precision and checks value limits
+        :raises ValueError: if the order would be rejected by Bitso
+        """
+        minor = Decimal(str(minor)).quantize(self.value_step, rounding=ROUND_DOWN)
+        if self.minimum_value is not None and minor < self.minimum_value:
+            raise ValueError(f'{self.book}: order value {minor} is below minimum {self.minimum_value}')
+        if self.maximum_value is not None and minor > self.maximum_value:
+            raise ValueError(f'{self.book}: order value {minor} is above maximum {self.maximum_value}')
+        return format(minor, 'f')
+
+    def validate(self, amount: str, price: str = None):
+        """
+        Rounds amount (down to the book's precision) and price (down to tick_size) and checks limits
+        :return: (amount, price) as strings
+        :raises ValueError: if the order would be rejected by Bitso
+        """
+        amount = Decimal(str(amount)).quantize(self.amount_step, rounding=ROUND_DOWN)
+        if self.minimum_amount is not None and amount < self.minimum_amount:
+            raise ValueError(f'{self.book}: amount {amount} is below minimum {self.minimum_amount}')
+        if self.maximum_amount is not None and amount > self.maximum_amount:
+            raise ValueError(f'{self.book}: amount {amount} is above maximum {self.maximum_amount}')
+
+        if price is not None:
+            price = Decimal(str(price))
+            if self.tick_size:
+                price = (price / self.tick_size).to_integral_value(rounding=ROUND_DOWN) * self.tick_size
+            if self.minimum_price is not None and price < self.minimum_price:
+                raise ValueError(f'{self.book}: price {price} is below minimum {self.minimum_price}')
+            if self.maximum_price is not None and price > self.maximum_price:
+                raise ValueError(f'{self.book}: price {price} is above maximum {self.maximum_price}')
+            value = amount * price
+            if self.minimum_value is not None and value < self.minimum_value:
+                raise ValueError(f'{self.book}: order value {value} is below minimum {self.minimum_value}')
+            if self.maximum_value is not None and value > self.maximum_value:
+                raise ValueError(f'{self.book}: order value {value} is above maximum {self.maximum_value}')
+            price = format(price, 'f')
+
+        return format(amount, 'f'), price
+
+
+class BitsoBalances:
+    """
+    Per-currency available/locked balances. Loaded from /v3/balance, adjusted locally from
+    the orders we place, and periodically reconciled with the exchange. Currencies whose
+    change we can't know exactly (e.g. what a market buy received) are marked stale so the
+    next reconcile corrects them.
+    """
+
+    def __init__(self):
+        self.available = {}
+        self.locked = {}
+        self.reconciled_at = None
+        self.stale = set()
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.reconciled_at is not None
+
+    def load(self, response: dict):
+        """Replaces all balances with a /v3/balance response"""
+        balances = response.get('payload', {}).get('balances', [])
+        with self._lock:
+            self.available = {b['currency'].lower(): Decimal(str(b['available'])) for b in balances}
+            self.locked = {b['currency'].lower(): Decimal(str(b.get('locked', 0))) for b in balances}
+            self.stale.clear()
+            self.reconciled_at = time.time()
+
+    def get_available(self, currency: str):
+        return self.available.get(currency.lower(), Decimal(0)) if self.loaded else None
+
+    def apply_order(self, book: str, side: str, order_type: str, amount: str = None, minor: str = None,
+                    price: str = None):
+        """
+        Applies an accepted order to the cached balances
+        :return: True if the currency we spent changed by an amount we couldn't compute (reconcile soon)
+        """
+        base, quote = book.lower().split('_')
+        amount = Decimal(amount) if amount else None
+        minor = Decimal(minor) if minor else None
+        price = Decimal(price) if price else None
+        spent, received = (quote, base) if side == 'buy' else (base, quote)
+
+        # what the order takes from us is known exactly...
+        if side == 'sell':
+            cost = amount
+        elif minor is not None:
+            cost = minor
+        elif price is not None and amount is not None:
+            cost = amount * price
+        else:
+            cost = None
+
+        with self._lock:
+            if cost is None:
+                self.stale.add(spent)
+            elif order_type == 'limit':
+                self.available[spent] = self.available.get(spent, Decimal(0)) - cost
+                self.locked[spent] = self.locked.get(spent, Decimal(0)) + cost
+            else:
+                self.available[spent] = self.available.get(spent, Decimal(0)) - cost
+            # ...what it gives back depends on the fill price and fees
+            self.stale.add(received)
+        return cost is None
+
+    def as_json(self):
+        return {
+            'available': {currency: format(value, 'f') for currency, value in self.available.items()},
+            'locked': {currency: format(value, 'f') for currency, value in self.locked.items()},
+            'reconciled_at': self.reconciled_at,
+            'stale': sorted(self.stale),
+        }
+
+
+class BitsoOpenOrders:
+    """
+    Local index of open orders (oid -> order, book -> oids). Replaced wholesale by the
+    background poller and kept current in between from the orders we place and cancel.
+    """
+
+    def __init__(self):
+        self.orders = {}
+        self.by_book = {}
+        self.updated_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.updated_at is not None
+
+    def replace(self, orders: list):
+        """Swaps in a full open-orders listing"""
+        by_oid = {order['oid']: order for order in orders}
+        by_book = {}
+        for oid, order in by_oid.items():
+            by_book.setdefault(order.get('book'), set()).add(oid)
+        with self._lock:
+            self.orders, self.by_book = by_oid, by_book
+            self.updated_at = time.time()
+
+    def add(self, order: dict):
+        with self._lock:
+            self.orders[order['oid']] = order
+            self.by_book.setdefault(order.get('book'), set()).add(order['oid'])
+
+    def discard(self, oids):
+        with self._lock:
+            for oid in oids:
+                order = self.orders.pop(oid, None)
+                if order is not None:
+                    self.by_book.get(order.get('book'), set()).discard(oid)
+
+    def get(self, oid: str):
+        return self.orders.get(oid)
+
+    def for_book(self, book: str = None) -> list:
+        """
+        :return: open order ids for a book, or all of them
+        """
+        with self._lock:
+            if book is None:
+                return list(self.orders)
+            return list(self.by_book.get(book, ()))
+
+    def as_json(self):
+        return {
+            'updated_at': self.updated_at,
+            'books': {book: len(oids) for book, oids in self.by_book.items() if oids},
+            'orders': list(self.orders.values()),
+        }
+
 
 class BitsoSpot(Action):
+    schema = BitsoOrder
     def __init__(self):
         logger.info(f"BitsoSpot.__init__() called with config: {bitso_config}")
         super().__init__()
 
         self.config = bitso_config
-        self.authenticator = create_hmac_authenticator(self.config.api_key, self.config.api_secret)
+        # one authenticator serves both the sync and async paths so they share the nonce sequence
+        self.authenticator = create_async_hmac_authenticator(self.config.api_key, self.config.api_secret)
+
+        # nothing below touches the network here: registration must not block on (or fail with) Bitso.
+        # markets and balances are loaded by the first background tick, or on first use if that hasn't run yet
+
+        # available_books metadata, kept fresh in the background
+        refresh = self.config.markets_refresh_interval
+        self.markets = CachedValue('bitso available_books', self._fetch_available_books, ttl=(refresh or 300) * 3)
+        self._markets_task = PeriodicTask(
+            'bitso-markets', refresh, self.markets.refresh, run_immediately=True
+        ).start()
+
+        # balances, adjusted from our own orders and reconciled in the background
+        self.balances = BitsoBalances()
+        self._balance_task = PeriodicTask(
+            'bitso-balance', self.config.balance_reconcile_interval, self.reconcile_balances, run_immediately=True
+        ).start()
+
+        # open orders across all books, polled with one batched request per interval
+        self.open_orders = BitsoOpenOrders()
+        # market orders sized in minor, {oid: (book, side)}: the poller reads what they traded
+        self.unresolved_fills = {}
+        self._open_orders_task = PeriodicTask(
+            'bitso-open-orders', self.config.open_orders_poll_interval, self.poll_open_orders, run_immediately=True
+        ).start()
+        # process-wide exposure, market fills are booked as spot holdings
+        self.pnl = get_pnl_engine()
+        self.risk = get_risk_engine()
         logger.info("BitsoSpot: Successfully initialized with authenticator")
 
     def get_account_status(self):
@@ -46,7 +298,42 @@ class BitsoSpot(Action):
             logger.error(f"Error getting balance: {e}")
             return None
 
-    def get_available_books(self):
+    def reconcile_balances(self):
+        """
+        Reload cached balances from the exchange
+        """
+        balance = self.get_balance()
+        if balance:
+            self.balances.load(balance)
+            logger.info(f"BitsoSpot: Balances reconciled for {len(self.balances.available)} currencies")
+        return balance
+
+    def _apply_order_to_balances(self, book, side, order_type, amount, minor, price):
+        if self.balances.loaded and self.balances.apply_order(book, side, order_type, amount, minor, price):
+            self._balance_task.wake()
+
+    def size_from_balance(self, book: str, side: str, percent: str):
+        """
+        Turns a percent-of-balance size into order arguments using only cached balances.
+        Buys spend a share of the quote currency (minor), sells a share of the base currency (major).
+        :return: dict with 'amount' or 'minor'
+        """
+        percent = Decimal(str(percent).rstrip('%'))
+        if not 0 < percent <= 100:
+            raise ValueError(f"Percent size must be in (0, 100], got {percent}")
+        base, quote = book.lower().split('_')
+        currency = quote if side == 'buy' else base
+        if not self.balances.loaded:
+            # first order before the background reconcile ran (or with it disabled)
+            self.reconcile_balances()
+        available = self.balances.get_available(currency)
+        if available is None:
+            raise ValueError("Balances are not loaded, cannot size order from balance")
+        size = format(available * percent / 100, 'f')
+        logger.info(f"BitsoSpot: {percent}% of {available} {currency} available -> {size}")
+        return {'minor': size} if side == 'buy' else {'amount': size}
+
+    def _fetch_available_books(self):
         """
         Get available trading books (pairs) from Bitso API
         """
@@ -56,12 +343,149 @@ class BitsoSpot(Action):
                 method='GET'
             )
             response.raise_for_status()
-            return response.json()
+            books = response.json()
+            rules = {payload['book']: BitsoBookRules(payload) for payload in books.get('payload', [])}
+            logger.info(f"BitsoSpot: Loaded order limits for {len(rules)} books")
+            return books, rules
         except Exception as e:
             logger.error(f"Error getting available books: {e}")
             return None
 
-    def place_order(self, book: str, side: str, order_type: str = 'market', amount: str = None, price: str = None):
+    def get_available_books(self):
+        """
+        Get available trading books (pairs), served from the cached metadata
+        """
+        markets = self.markets.get()
+        return markets[0] if markets else None
+
+    def get_book_rules(self, book: str):
+        """
+        Get cached order limits for a book
+        :return: BitsoBookRules() or None if metadata could not be loaded
+        :raises ValueError: if metadata is loaded and the book does not exist
+        """
+        markets = self.markets.get()
+        if not markets:
+            return None
+        rules = markets[1].get(book)
+        if rules is None:
+            raise ValueError(f"Unknown Bitso book: {book}")
+        return rules
+
+    def _validate_order(self, book: str, amount: str, price: str = None, minor: str = None):
+        """
+        Validate and round an order locally before it is signed and sent
+        :return: (amount, price, minor)
+        """
+        rules = self.get_book_rules(book)
+        if rules is None:
+            logger.warning(f"BitsoSpot: No market metadata for {book}, sending order unvalidated")
+            return amount, price, minor
+        if minor is not None:
+            return amount, price, rules.validate_minor(minor)
+        return rules.validate(amount, price if price else None) + (minor,)
+
+    @staticmethod
+    def _build_order_payload(book: str, side: str, order_type: str = 'market', amount: str = None, price: str = None,
+                             minor: str = None):
+        """
+        Build the /v3/orders payload (shared by place_order and place_order_async)
+        """
+        order_payload = {
+            'book': book,
+            'side': side,
+            'type': order_type,
+        }
+        # orders are sized in the base currency (major), or the quote currency (minor)
+        if minor is not None and amount is None:
+            order_payload['minor'] = minor
+        else:
+            order_payload['major'] = amount
+
+        if order_type == 'limit' and price:
+            order_payload['price'] = price
+
+        return order_payload
+
+    def _orders_url(self, book: str = None, status: str = None):
+        """
+        Build the /v3/orders query URL (shared by get_orders and get_orders_async)
+        """
+        params = {key: value for key, value in (('book', book), ('status', status)) if value}
+        url = f"{self.config.base_url}/v3/orders"
+        return f"{url}?{urlencode(params)}" if params else url
+
+    def _cancel_url(self, order_ids: list = None):
+        """
+        Build the bulk cancel URL: the given order ids, or every open order when None
+        """
+        if order_ids is None:
+            return f"{self.config.base_url}/v3/orders/all"
+        return f"{self.config.base_url}/v3/orders?{urlencode({'oids': ','.join(order_ids)}, safe=',')}"
+
+    def _track_placed_order(self, result: dict, book, side, order_type, amount, minor, price):
+        # market orders fill immediately; limit orders stay open until the poller says otherwise
+        oid = (result or {}).get('payload', {}).get('oid')
+        if oid and order_type == 'limit':
+            self.open_orders.add({
+                'oid': oid, 'book': book, 'side': side, 'type': order_type,
+                'original_amount': amount, 'original_value': minor, 'price': price, 'status': 'queued',
+            })
+
+    @staticmethod
+    def _traded_major(response) -> Optional[Decimal]:
+        # /v3/order_trades: one entry per trade, major is signed by side
+        trades = response.json().get('payload')
+        if not isinstance(trades, list) or not trades:
+            return None
+        return sum((abs(Decimal(str(trade['major']))) for trade in trades), Decimal(0))
+
+    def _filled_url(self, oid: str):
+        return f"{self.config.base_url}/v3/order_trades/{oid}"
+
+    def get_filled_amount(self, oid: str):
+        """
+        Amount of the base currency an order traded, as reported by the exchange
+        :return: Decimal, or None if it can't be read
+        """
+        try:
+            response = self.authenticator.authenticated_request(url=self._filled_url(oid), method='GET')
+            response.raise_for_status()
+            return self._traded_major(response)
+        except Exception as e:
+            logger.error(f"Error getting trades of order {oid}: {e}")
+            return None
+
+    def _record_fill(self, result: dict, book, side, order_type, amount):
+        # limit orders rest on the book; only market orders are known to have filled here
+        if order_type != 'market':
+            return
+        if amount is None:
+            # sized in minor: the traded amount is read off the order path by the open-orders poller
+            oid = (result or {}).get('payload', {}).get('oid')
+            if not oid:
+                logger.warning(f"BitsoSpot: {side} {book} order has no oid, exposure not updated")
+                return
+            self.unresolved_fills[oid] = (book, side)
+            self._open_orders_task.wake()
+            return
+        self.pnl.trade(book, side, float(amount))
+        self.risk.record_fill(book)
+
+    def resolve_fills(self):
+        """
+        Records the traded amount of market orders sized in minor; orders whose trades can't be
+        read yet are retried on the next poll
+        """
+        for oid, (book, side) in list(self.unresolved_fills.items()):
+            amount = self.get_filled_amount(oid)
+            if amount is None:
+                continue
+            del self.unresolved_fills[oid]
+            self._record_fill(None, book, side, 'market', amount)
+
+    def place_order(self, book: str, side: str, order_type: str = 'market', amount: str = None, price: str = None,
+                    minor: str = None):
         """
         Place an order on Bitso
 
@@ -71,20 +495,13 @@ class BitsoSpot(Action):
             order_type: 'market' or 'limit'
             amount: Amount to buy/sell
             price: Price for limit orders
+            minor: Amount of the quote currency to spend/receive, instead of amount
         """
         try:
             logger.info(f"BitsoSpot: place_order called with book={book}, side={side}, type={order_type}, amount={amount}, price={price}")
 
-            # Build order payload
-            order_payload = {
-                'book': book,
-                'side': side,
-                'type': order_type,
-                'major': amount
-            }
-
-            if order_type == 'limit' and price:
-                order_payload['price'] = price
+            amount, price, minor = self._validate_order(book, amount, price, minor)
+            order_payload = self._build_order_payload(book, side, order_type, amount, price, minor)
 
             logger.info(f"BitsoSpot: Order payload: {order_payload}")
             logger.info(f"BitsoSpot: Making API call to {self.config.base_url}/v3/orders")
@@ -102,6 +519,10 @@ class BitsoSpot(Action):
             response.raise_for_status()
             result = response.json()
             logger.info(f"Order placed successfully: {result}")
+            self._apply_order_to_balances(book, side, order_type, amount, minor, price)
+            self._track_placed_order(result, book, side, order_type, amount, minor, price)
+            # exposure moves by the rounded amount sent; orders sized in minor are resolved in the background
+            self._record_fill(result, book, side, order_type, amount)
             return result
 
         except Exception as e:
@@ -128,6 +549,81 @@ class BitsoSpot(Action):
             logger.error(f"Error cancelling order: {e}")
             return None
 
+    def _cancelled(self, response) -> list:
+        response.raise_for_status()
+        cancelled = response.json().get('payload') or []
+        self.open_orders.discard(cancelled)
+        return cancelled
+
+    def cancel_orders(self, order_ids: list):
+        """
+        Cancel many orders, CANCEL_BATCH_SIZE order ids per request
+        :return: list of cancelled order ids
+        """
+        cancelled = []
+        for batch in _batches(order_ids, CANCEL_BATCH_SIZE):
+            try:
+                response = self.authenticator.authenticated_request(url=self._cancel_url(batch), method='DELETE')
+                cancelled += self._cancelled(response)
+            except Exception as e:
+                logger.error(f"Error cancelling orders {batch}: {e}")
+        logger.info(f"BitsoSpot: Cancelled {len(cancelled)}/{len(order_ids)} orders")
+        return cancelled
+
+    def cancel_all_orders(self, book: str = None):
+        """
+        Cancel every open order (one request), or every open order on a book (ids from the open-orders index)
+        :return: list of cancelled order ids
+        """
+        if book is not None:
+            if not self.open_orders.loaded:
+                self.poll_open_orders()
+            return self.cancel_orders(self.open_orders.for_book(book))
+        try:
+            response = self.authenticator.authenticated_request(url=self._cancel_url(), method='DELETE')
+            cancelled = self._cancelled(response)
+            logger.info(f"BitsoSpot: Cancelled all {len(cancelled)} open orders")
+            return cancelled
+        except Exception as e:
+            logger.error(f"Error cancelling all orders: {e}")
+            return []
+
+    def _open_orders_url(self, marker: str = None):
+        params = {'limit': OPEN_ORDERS_PAGE_SIZE}
+        if marker:
+            params['marker'] = marker
+        return f"{self.config.base_url}/v3/open_orders?{urlencode(params)}"
+
+    def get_open_orders(self):
+        """
+        Get open orders on every book, one request per OPEN_ORDERS_PAGE_SIZE orders
+        :return: list of orders, or None on error
+        """
+        orders, marker = [], None
+        try:
+            while True:
+                response = self.authenticator.authenticated_request(url=self._open_orders_url(marker), method='GET')
+                response.raise_for_status()
+                page = response.json().get('payload') or []
+                orders += page
+                if len(page) < OPEN_ORDERS_PAGE_SIZE:
+                    return orders
+                marker = page[-1]['oid']
+        except Exception as e:
+            logger.error(f"Error getting open orders: {e}")
+            return None
+
+    def poll_open_orders(self):
+        """
+        Refresh the open-orders index and resolve the fills of market orders sized in minor
+        """
+        orders = self.get_open_orders()
+        if orders is not None:
+            self.open_orders.replace(orders)
+            logger.debug(f"BitsoSpot: {len(orders)} open orders")
+        self.resolve_fills()
+        return orders
+
     def get_orders(self, book: str = None, status: str = None):
         """
         Get orders from Bitso
@@ -137,28 +633,136 @@ class BitsoSpot(Action):
             status: Order status to filter by ('open', 'partial-fill', 'completed', 'cancelled')
         """
         try:
-            params = {}
-            if book:
-                params['book'] = book
-            if status:
-                params['status'] = status
+            response = self.authenticator.authenticated_request(url=self._orders_url(book, status), method='GET')
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Error getting orders: {e}")
+            return None
+
+    async def get_balance_async(self):
+        """
+        Get account balance from Bitso API (asyncio)
+        """
+        try:
+            response = await self.authenticator.authenticated_request_async(
+                url=f"{self.config.base_url}/v3/balance",
+                method='GET'
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Error getting balance: {e}")
+            return None
 
-            query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-            url = f"{self.config.base_url}/v3/orders"
-            if query_string:
-                url += f"?{query_string}"
+    async def place_order_async(self, book: str, side: str, order_type: str = 'market', amount: str = None,
+                                price: str = None, minor: str = None):
+        """
+        Place an order on Bitso (asyncio). Same arguments as place_order.
+        """
+        try:
+            amount, price, minor = self._validate_order(book, amount, price, minor)
+            order_payload = self._build_order_payload(book, side, order_type, amount, price, minor)
+            logger.info(f"BitsoSpot: Order payload (async): {order_payload}")
 
-            response = self.authenticator.authenticated_request(url=url, method='GET')
+            response = await self.authenticator.authenticated_request_async(
+                url=f"{self.config.base_url}/v3/orders",
+                method='POST',
+                body=order_payload
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.info(f"Order placed successfully: {result}")
+            self._apply_order_to_balances(book, side, order_type, amount, minor, price)
+            self._track_placed_order(result, book, side, order_type, amount, minor, price)
+            self._record_fill(result, book, side, order_type, amount)
+            return result
+        except Exception as e:
+            logger.error(f"Error placing order: {e}")
+            return None
+
+    async def cancel_order_async(self, order_id: str):
+        """
+        Cancel an order on Bitso (asyncio)
+        """
+        try:
+            response = await self.authenticator.authenticated_request_async(
+                url=f"{self.config.base_url}/v3/orders/{order_id}",
+                method='DELETE'
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.info(f"Order cancelled successfully: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"Error cancelling order: {e}")
+            return None
+
+    async def _cancel_batch_async(self, batch: list) -> list:
+        try:
+            response = await self.authenticator.authenticated_request_async(url=self._cancel_url(batch), method='DELETE')
+            return self._cancelled(response)
+        except Exception as e:
+            logger.error(f"Error cancelling orders {batch}: {e}")
+            return []
+
+    async def cancel_orders_async(self, order_ids: list):
+        """
+        Cancel many orders (asyncio), sending the batches concurrently. Same arguments as cancel_orders.
+        """
+        results = await asyncio.gather(*(self._cancel_batch_async(batch)
+                                         for batch in _batches(order_ids, CANCEL_BATCH_SIZE)))
+        cancelled = [oid for batch in results for oid in batch]
+        logger.info(f"BitsoSpot: Cancelled {len(cancelled)}/{len(order_ids)} orders")
+        return cancelled
+
+    async def cancel_all_orders_async(self, book: str = None):
+        """
+        Cancel every open order, or every open order on a book (asyncio). Same arguments as cancel_all_orders.
+        """
+        if book is not None:
+            return await self.cancel_orders_async(self.open_orders.for_book(book))
+        try:
+            response = await self.authenticator.authenticated_request_async(url=self._cancel_url(), method='DELETE')
+            return self._cancelled(response)
+        except Exception as e:
+            logger.error(f"Error cancelling all orders: {e}")
+            return []
+
+    async def get_orders_async(self, book: str = None, status: str = None):
+        """
+        Get orders from Bitso (asyncio). Same arguments as get_orders.
+        """
+        try:
+            response = await self.authenticator.authenticated_request_async(url=self._orders_url(book, status), method='GET')
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"Error getting orders: {e}")
             return None
 
+    def order_intent(self, data: dict, strategy: str):
+        """
+        The market order a run would place, for the pre-trade risk checks.
+        Percent sizes are resolved against balances at order time, so their size is None here.
+        """
+        side = data.get('side')
+        size = str(data.get('size') or '').strip()
+        if side not in ('buy', 'sell') or not size:
+            return None
+        try:
+            amount = None if size.endswith('%') else float(size)
+        except ValueError:
+            return None
+        return OrderIntent(strategy, data.get('book', 'btc_mxn'), side, amount)
+
     def run(self, *args, **kwargs):
         """
         Main run method called by the webhook system
-        Expected data format: {"action": "buy/sell", "order_size": "amount"}
+        Expected data format: {"side": "buy/sell", "size": "amount", "book": "btc_mxn"}
+        size may also be a percent of the cached balance, e.g. "25%"
+        (buys spend 25% of the quote currency, sells sell 25% of the base currency)
+        {"side": "cancel", "book": "btc_mxn"} cancels every open order on the book
         """
         logger.info("==================== BitsoSpot.run() START ====================")
         logger.info(f"BitsoSpot.run() called with args: {args}, kwargs: {kwargs}")
@@ -175,6 +779,11 @@ class BitsoSpot(Action):
             size = data.get('size')
             logger.info(f"BitsoSpot: Extracted side='{side}', size='{size}'")
 
+            if side == 'cancel':
+                cancelled = self.cancel_all_orders(data.get('book', 'btc_mxn'))
+                logger.info(f"BitsoSpot: Cancelled orders {cancelled}")
+                return
+
             if not side or not size:
                 raise ValueError("Both 'action' and 'order_size' are required in webhook data")
 
@@ -182,16 +791,22 @@ class BitsoSpot(Action):
             book = data.get('book', 'btc_mxn')  # Default to BTC/MXN
             logger.info(f"BitsoSpot: Using book='{book}' for {side} order of size {size}")
 
+            if str(size).strip().endswith('%'):
+                sizing = self.size_from_balance(book, side, str(size).strip())
+            else:
+                sizing = {'amount': str(size)}
+
             # Place the order
             logger.info("BitsoSpot: Attempting to place order...")
             result = self.place_order(
                 book=book,
                 side=side,
                 order_type='market',
-                amount=str(size)
+                **sizing
             )
 
             if result:
+                # place_order already recorded the fill with the rounded amount
                 logger.info(f"Bitso order executed successfully: {result}")
             else:
                 logger.error("Failed to execute Bitso order")
@@ -1,52 +1,130 @@
+import threading
+
 from components.actions.base.action import Action
+from utils.background import PeriodicTask
+from utils.cache import CachedValue
+from utils.log import get_logger
 import ccxt as ccxt
 
+logger = get_logger(__name__)
+
+
 class BinanceSpot(Action):
     #Add your API_KEY from Binance Testnet or Mainnet
     API_KEY = ''
     #Add your API_SECRET from Binance Testnet or Mainnet
     API_SECRET = ''
+    #set to True to use the sandbox/testnet api
+    SANDBOX = False
 
-    exchange = ccxt.binance({
-            'rateLimit': 2000,
-            'enableRateLimit': True,
-            'apiKey': API_KEY,
-            'secret': API_SECRET,
-            'id': 'binance',
-        })
+    # seconds between background market (symbol filters / precision) reloads
+    MARKETS_REFRESH = 3600
+    # seconds between background balance reloads; fills also trigger one
+    BALANCE_REFRESH = 60
+    # seconds a fetched balance is trusted, a few missed reloads before orders stop sizing from it
+    BALANCE_TTL = BALANCE_REFRESH * 3
 
     def __init__(self):
         super().__init__()
-        #uncomment the below line to use sandbox/testnet api
-        # exchange = self.exchange.set_sandbox_mode(True)
+        self._exchange = None
+        self._exchange_lock = threading.Lock()
+
+        self.markets = CachedValue('binance markets', self._load_markets, ttl=self.MARKETS_REFRESH * 3)
+        self.balance = CachedValue('binance balance', self._fetch_balance, ttl=self.BALANCE_TTL)
+        # both are loaded off the order path: markets once and then periodically, balances after every fill
+        self._markets_task = PeriodicTask(
+            'binance-markets', self.MARKETS_REFRESH, self.markets.refresh, run_immediately=True
+        ).start()
+        self._balance_task = PeriodicTask(
+            'binance-balance', self.BALANCE_REFRESH, self.balance.refresh, run_immediately=True
+        ).start()
+
+    @property
+    def exchange(self):
+        """
+        The ccxt client, created on first use rather than when the module is imported
+        """
+        if self._exchange is None:
+            with self._exchange_lock:
+                if self._exchange is None:
+                    exchange = ccxt.binance({
+                        'rateLimit': 2000,
+                        'enableRateLimit': True,
+                        'apiKey': self.API_KEY,
+                        'secret': self.API_SECRET,
+                        'id': 'binance',
+                    })
+                    if self.SANDBOX:
+                        exchange.set_sandbox_mode(True)
+                    self._exchange = exchange
+        return self._exchange
+
+    def _load_markets(self):
+        return self.exchange.load_markets(reload=True)
+
+    def _fetch_balance(self):
+        return self.exchange.fetch_balance()
+
+    def _on_order(self, order):
+        """
+        Applies a fill to the cached balance, so the next order doesn't size from funds already spent,
+        and reloads the exact balance in the background. A fill without amounts marks the balance
+        stale instead, and orders are refused until the reload lands.
+        """
+        if not order or not (order.get('filled') or order.get('status') == 'closed'):
+            return
+        balance, filled, cost = self.balance.value, order.get('filled'), order.get('cost')
+        if balance is None or not filled or cost is None:
+            self.balance.invalidate()
+        else:
+            market = self.exchange.market(order['symbol'])
+            if order.get('side') == 'buy':
+                spent, spent_amount, received, received_amount = market['quote'], cost, market['base'], filled
+            else:
+                spent, spent_amount, received, received_amount = market['base'], filled, market['quote'], cost
+            fee = order.get('fee') or {}
+            if fee.get('currency') == received:
+                received_amount -= fee.get('cost') or 0
+            elif fee.get('currency') == spent:
+                spent_amount += fee.get('cost') or 0
+            free = dict(balance['free'])
+            free[spent] = max(0.0, (free.get(spent) or 0) - spent_amount)
+            free[received] = (free.get(received) or 0) + received_amount
+            self.balance.set(dict(balance, free=free))
+        self._balance_task.wake()
 
     def place_order(self, symbol, side, price=None):
+        """
+        Places a market order for the whole free balance: buys spend the quote currency, sells sell the base.
+        Markets and balances are read as cached (only the background tasks reload them),
+        so the only request on this path is the order itself.
+        """
         try:
+            if self.markets.value is None:
+                raise ValueError('Binance markets are not loaded yet')
+            balance = self.balance.value
+            if balance is None or self.balance.stale:
+                raise ValueError(f'Binance balance is not available or older than {self.BALANCE_TTL}s')
 
-            # Get the balance of the base currency
-            balance = self.exchange.fetch_balance()
-            if side == 'buy':
-                base_balance = balance['free'][symbol[-4:]]
-            elif side == 'sell':
-                base_balance = balance['free'][symbol[:-4]]
-            
-            # Calculate the amount of asset to buy or sell
+            market = self.exchange.market(symbol)
             if side == 'buy':
-                amount = base_balance / price
+                cost = self.exchange.cost_to_precision(market['symbol'], balance['free'][market['quote']])
+                order = self.exchange.create_market_buy_order_with_cost(market['symbol'], cost)
             elif side == 'sell':
-                amount = base_balance
+                amount = self.exchange.amount_to_precision(market['symbol'], balance['free'][market['base']])
+                order = self.exchange.create_order(market['symbol'], 'market', side, amount)
+            else:
+                raise ValueError(f'Unknown side: {side}')
 
-            markets = self.exchange.load_markets()
-            formatted_amount = self.exchange.amount_to_precision(symbol, amount)
-            order = self.exchange.create_market_order(symbol, side, quoteOrderQty=formatted_amount)
-            print(order)
-            # Print the order details
+            self._on_order(order)
+            logger.info(f'BinanceSpot: Order placed: {order}')
+            return order
         except ccxt.BaseError as e:
             # Handle the exception
-            print("An error occurred while placing the order:", e)
-        except ValueError as e:
+            logger.error(f'An error occurred while placing the order: {e}')
+        except (KeyError, ValueError) as e:
             # Handle the exception
-            print("An error occurred while checking the filters or calculating the amount:", e)
+            logger.error(f'An error occurred while checking the filters or calculating the amount: {e}')
 
     def run(self, *args, **kwargs):
         super().run(*args, **kwargs)  # this is required
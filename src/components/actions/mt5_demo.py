@@ -1,58 +1,66 @@
 from components.actions.base.action import Action
+from components.schemas.trading import MT5Order
+from utils.background import PeriodicTask
 from utils.log import get_logger
+from utils.mt5_gateway import MT5Gateway
+from utils.pnl_engine import BUY, SELL, get_pnl_engine
+from utils.position_book import PositionBook
+from utils.risk import OrderIntent, get_risk_engine
 from config import mt5_config
-import MetaTrader5 as mt5
 import pandas as pd
 from datetime import datetime
 import json
 
 logger = get_logger(__name__)
 
+try:
+    import MetaTrader5 as mt5
+except ImportError:  # Windows only; Mt5DemoMock supplies a stand-in terminal elsewhere
+    mt5 = None
+
 
 class MT5Demo(Action):
-    def __init__(self):
+    schema = MT5Order
+
+    def __init__(self, terminal=None):
         logger.info(f"MT5Demo.__init__() called with config: {mt5_config}")
         super().__init__()
 
         self.config = mt5_config
-        self.connected = False
+        # the MetaTrader5 module (or a stand-in with the same functions), only ever used on the gateway thread
+        self.mt5 = terminal or mt5
+        if self.mt5 is None:
+            raise ImportError("The MetaTrader5 package is not installed (it is Windows only), use Mt5DemoMock")
+        self.gateway = MT5Gateway(self.mt5, self.config.login, self.config.password, self.config.server)
+        # last known open positions, indexed by ticket and symbol
+        self.positions = PositionBook()
+        # process-wide mark-to-market and exposure, positions keyed by (action name, ticket)
+        self.pnl = get_pnl_engine()
+        # pre-trade checks, reading exposure and open PnL from the PnL engine
+        self.risk = get_risk_engine()
         self._initialize_connection()
-        logger.info("MT5Demo: Successfully initialized")
+        self._mark_task = PeriodicTask('mt5-marks', self.config.mark_interval, self.mark_to_market).start()
+        logger.info(f"{type(self).__name__}: Successfully initialized")
+
+    @property
+    def connected(self):
+        return self.gateway.connected
 
     def _initialize_connection(self):
         """
-        Initialize MetaTrader 5 connection to demo account
+        Start the gateway thread, which owns the MetaTrader 5 connection to the demo account
         """
         try:
-            # Initialize MT5 connection
-            if not mt5.initialize():
-                error_code = mt5.last_error()
-                logger.error(f"MT5 initialize failed, error code = {error_code}")
-                raise Exception(f"MT5 initialization failed: {error_code}")
-
-            # Connect to demo account
-            authorized = mt5.login(
-                login=self.config.login,
-                password=self.config.password,
-                server=self.config.server
-            )
-
-            if authorized:
-                self.connected = True
-                account_info = mt5.account_info()
-                logger.info(f"Connected to MT5 demo account")
-                logger.info(f"Login: {account_info.login}")
-                logger.info(f"Balance: {account_info.balance}")
-                logger.info(f"Server: {account_info.server}")
-                logger.info(f"Currency: {account_info.currency}")
-            else:
-                error_code = mt5.last_error()
-                logger.error(f"Failed to connect to demo account, error code: {error_code}")
-                raise Exception(f"MT5 login failed: {error_code}")
+            self.gateway.start()
+            account_info = self.gateway.account_info()
+            logger.info(f"Connected to MT5 demo account")
+            logger.info(f"Login: {account_info.login}")
+            logger.info(f"Balance: {account_info.balance}")
+            logger.info(f"Server: {account_info.server}")
+            logger.info(f"Currency: {account_info.currency}")
 
         except Exception as e:
             logger.error(f"Error initializing MT5 connection: {e}")
-            self.connected = False
             raise
 
     def get_account_info(self):
@@ -60,12 +68,9 @@ class MT5Demo(Action):
         Get account information from MetaTrader 5
         """
         try:
-            if not self.connected:
-                self._initialize_connection()
-
-            account_info = mt5.account_info()
+            account_info = self.gateway.account_info()
             if account_info is None:
-                error_code = mt5.last_error()
+                error_code = self.gateway.last_error()
                 logger.error(f"Failed to get account info, error code: {error_code}")
                 return None
 
@@ -100,19 +105,54 @@ class MT5Demo(Action):
             logger.error(f"Error getting account info: {e}")
             return None
 
+    def _symbol_quote(self, terminal, symbol: str):
+        # runs on the gateway thread: cached specification and quote in one queued job
+        symbol_info = self.gateway.symbol_info(symbol)
+        if symbol_info is None:
+            return None
+        return symbol_info, self.gateway.symbol_info_tick(symbol)
+
+    def _contract_size(self, symbol: str):
+        spec = self.gateway.cache.specs.get(symbol)
+        return spec.trade_contract_size if spec is not None else None
+
+    def _profit_currency(self, symbol: str):
+        spec = self.gateway.cache.specs.get(symbol)
+        return spec.currency_profit if spec is not None else None
+
+    def mark_to_market(self):
+        """
+        Revalues this action's open positions at fresh quotes
+        """
+        if not self.gateway.running:
+            return
+        quotes = {}
+        for symbol in self.positions.symbols:
+            tick = self.gateway.symbol_info_tick(symbol)
+            if tick is not None:
+                quotes[symbol] = (tick.bid, tick.ask)
+        if quotes:
+            self.pnl.update_prices(quotes)
+
+    def get_stats(self):
+        """
+        Run statistics plus the gateway's queue, reconnect and symbol cache figures
+        """
+        stats = super().get_stats()
+        stats['gateway'] = self.gateway.as_json()
+        return stats
+
     def get_symbol_info(self, symbol: str):
         """
         Get symbol information (currency pair details)
         """
         try:
-            if not self.connected:
-                self._initialize_connection()
-
-            symbol_info = mt5.symbol_info(symbol)
-            if symbol_info is None:
-                error_code = mt5.last_error()
+            quote = self.gateway.call(self._symbol_quote, symbol, retry=True)
+            if quote is None:
+                error_code = self.gateway.last_error()
                 logger.error(f"Failed to get symbol info for {symbol}, error code: {error_code}")
                 return None
+            symbol_info, tick = quote
 
             # Convert to dict
             symbol_dict = {
@@ -131,8 +171,8 @@ class MT5Demo(Action):
                 'volume_max': symbol_info.volume_max,
                 'volume_step': symbol_info.volume_step,
                 'spread': symbol_info.spread,
-                'bid': symbol_info.bid,
-                'ask': symbol_info.ask
+                'bid': tick.bid if tick else symbol_info.bid,
+                'ask': tick.ask if tick else symbol_info.ask
             }
 
             logger.info(f"Symbol info for {symbol}: bid={symbol_dict['bid']}, ask={symbol_dict['ask']}")
@@ -157,74 +197,18 @@ class MT5Demo(Action):
             comment: Order comment
         """
         try:
-            if not self.connected:
-                self._initialize_connection()
-
-            # Get symbol info for proper lot size
-            symbol_info = self.get_symbol_info(symbol)
-            if not symbol_info:
-                raise ValueError(f"Could not get symbol info for {symbol}")
-
-            # Validate volume
-            volume = max(symbol_info['volume_min'], min(volume, symbol_info['volume_max']))
-
-            # Round volume to step
-            volume_step = symbol_info['volume_step']
-            volume = round(volume / volume_step) * volume_step
-
-            # Map order types
-            order_type_map = {
-                'buy': mt5.ORDER_TYPE_BUY,
-                'sell': mt5.ORDER_TYPE_SELL,
-                'buy_limit': mt5.ORDER_TYPE_BUY_LIMIT,
-                'sell_limit': mt5.ORDER_TYPE_SELL_LIMIT,
-                'buy_stop': mt5.ORDER_TYPE_BUY_STOP,
-                'sell_stop': mt5.ORDER_TYPE_SELL_STOP
-            }
-
-            if order_type not in order_type_map:
-                raise ValueError(f"Invalid order type: {order_type}")
-
-            mt5_order_type = order_type_map[order_type]
-
-            # For market orders, use current market price
-            if order_type in ['buy', 'sell'] and price is None:
-                if order_type == 'buy':
-                    price = symbol_info['ask']
-                else:
-                    price = symbol_info['bid']
-
-            # Create order request
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": symbol,
-                "volume": volume,
-                "type": mt5_order_type,
-                "price": price,
-                "deviation": 20,  # Allowed price deviation in points
-                "magic": 234000,  # Expert Advisor ID
-                "comment": comment,
-                "type_time": mt5.ORDER_TIME_GTC,  # Good Till Cancelled
-                "type_filling": mt5.ORDER_FILLING_IOC,  # Immediate or Cancel
-            }
-
-            # Add stop loss and take profit if specified
-            if stop_loss:
-                request["sl"] = stop_loss
-            if take_profit:
-                request["tp"] = take_profit
-
-            logger.info(f"MT5Demo: Placing order: {request}")
-
-            # Send order
-            result = mt5.order_send(request)
-
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                logger.error(f"Order failed, return code: {result.retcode}")
-                logger.error(f"Error details: {result}")
+            result = self.gateway.call(self._send_order, symbol, order_type, volume, price, stop_loss, take_profit,
+                                       comment)
+            if result is None:
                 return None
 
             logger.info(f"Order placed successfully: ticket={result.order}, volume={result.volume}")
+            if order_type in ('buy', 'sell'):
+                # market orders open a position right away (its ticket is the order's)
+                self.pnl.open((self.name, result.order), symbol, order_type, result.volume, result.price,
+                              stop_loss, take_profit, self._contract_size(symbol), self._profit_currency(symbol))
+                self.pnl.update_prices({symbol: (result.bid, result.ask)})
+                self.risk.record_fill(symbol)
 
             # Convert result to dict
             result_dict = {
@@ -247,46 +231,124 @@ class MT5Demo(Action):
             traceback.print_exc()
             return None
 
+    def _send_order(self, terminal, symbol: str, order_type: str, volume: float, price: float = None,
+                    stop_loss: float = None, take_profit: float = None, comment: str = "Webhook order"):
+        """
+        Builds and sends an order on the gateway thread, so the symbol lookup, quote and
+        order_send happen back to back in one queued job
+        """
+        # Clamp to the symbol's volume limits and round to its volume step (cached specification)
+        volume = self.gateway.round_volume(symbol, volume)
+
+        # Map order types
+        order_type_map = {
+            'buy': terminal.ORDER_TYPE_BUY,
+            'sell': terminal.ORDER_TYPE_SELL,
+            'buy_limit': terminal.ORDER_TYPE_BUY_LIMIT,
+            'sell_limit': terminal.ORDER_TYPE_SELL_LIMIT,
+            'buy_stop': terminal.ORDER_TYPE_BUY_STOP,
+            'sell_stop': terminal.ORDER_TYPE_SELL_STOP
+        }
+
+        if order_type not in order_type_map:
+            raise ValueError(f"Invalid order type: {order_type}")
+
+        mt5_order_type = order_type_map[order_type]
+
+        # For market orders, use current market price
+        if order_type in ['buy', 'sell'] and price is None:
+            tick = self.gateway.symbol_info_tick(symbol)
+            if tick is None:
+                raise ValueError(f"No quote for {symbol}")
+            price = tick.ask if order_type == 'buy' else tick.bid
+
+        # Create order request
+        request = {
+            "action": terminal.TRADE_ACTION_DEAL,
+            "symbol": symbol,
+            "volume": volume,
+            "type": mt5_order_type,
+            "price": price,
+            "deviation": 20,  # Allowed price deviation in points
+            "magic": 234000,  # Expert Advisor ID
+            "comment": comment,
+            "type_time": terminal.ORDER_TIME_GTC,  # Good Till Cancelled
+            "type_filling": terminal.ORDER_FILLING_IOC,  # Immediate or Cancel
+        }
+
+        # Add stop loss and take profit if specified
+        if stop_loss:
+            request["sl"] = stop_loss
+        if take_profit:
+            request["tp"] = take_profit
+
+        logger.info(f"MT5Demo: Placing order: {request}")
+
+        # Send order
+        result = terminal.order_send(request)
+        if result is None:
+            logger.error(f"Order failed, error code: {terminal.last_error()}")
+            return None
+
+        if result.retcode != terminal.TRADE_RETCODE_DONE:
+            logger.error(f"Order failed, return code: {result.retcode}")
+            logger.error(f"Error details: {result}")
+            return None
+
+        return result
+
+    @staticmethod
+    def _position_dict(pos):
+        return {
+            'ticket': pos.ticket,
+            'time': pos.time,
+            'type': pos.type,
+            'magic': pos.magic,
+            'identifier': pos.identifier,
+            'reason': pos.reason,
+            'volume': pos.volume,
+            'price_open': pos.price_open,
+            'stop_loss': pos.sl,
+            'take_profit': pos.tp,
+            'price_current': pos.price_current,
+            'swap': pos.swap,
+            'profit': pos.profit,
+            'symbol': pos.symbol,
+            'comment': pos.comment,
+            'external_id': pos.external_id
+        }
+
+    def get_exposure(self, symbol: str = None):
+        """
+        Net open lots (buys minus sells) per symbol, from the positions last retrieved
+        """
+        return self.positions.net_exposure(symbol)
+
     def get_positions(self, symbol: str = None):
         """
         Get open positions
         """
         try:
-            if not self.connected:
-                self._initialize_connection()
-
             if symbol:
-                positions = mt5.positions_get(symbol=symbol)
+                positions = self.gateway.positions_get(symbol=symbol)
             else:
-                positions = mt5.positions_get()
+                positions = self.gateway.positions_get()
 
             if positions is None:
-                error_code = mt5.last_error()
+                error_code = self.gateway.last_error()
                 logger.error(f"Failed to get positions, error code: {error_code}")
                 return []
 
+            # Refresh the local book (all positions, or only this symbol's) and the PnL engine
+            self.positions.replace(positions, symbol=symbol or None)
+            self.pnl.replace(self.name, [
+                (pos.ticket, pos.symbol, BUY if pos.type == 0 else SELL, pos.volume, pos.price_open, pos.sl, pos.tp,
+                 self._contract_size(pos.symbol), self._profit_currency(pos.symbol))
+                for pos in positions
+            ], symbol=symbol or None)
+
             # Convert to list of dicts
-            positions_list = []
-            for pos in positions:
-                pos_dict = {
-                    'ticket': pos.ticket,
-                    'time': pos.time,
-                    'type': pos.type,
-                    'magic': pos.magic,
-                    'identifier': pos.identifier,
-                    'reason': pos.reason,
-                    'volume': pos.volume,
-                    'price_open': pos.price_open,
-                    'stop_loss': pos.sl,
-                    'take_profit': pos.tp,
-                    'price_current': pos.price_current,
-                    'swap': pos.swap,
-                    'profit': pos.profit,
-                    'symbol': pos.symbol,
-                    'comment': pos.comment,
-                    'external_id': pos.external_id
-                }
-                positions_list.append(pos_dict)
+            positions_list = [self._position_dict(pos) for pos in positions]
 
             logger.info(f"Retrieved {len(positions_list)} positions")
             return positions_list
@@ -300,56 +362,76 @@ class MT5Demo(Action):
         Close a position by ticket
         """
         try:
-            if not self.connected:
-                self._initialize_connection()
+            return self.gateway.call(self._send_close, ticket)
 
-            # Get position info
-            positions = mt5.positions_get(ticket=ticket)
-            if not positions:
-                logger.error(f"Position with ticket {ticket} not found")
-                return None
+        except Exception as e:
+            logger.error(f"Error closing position {ticket}: {e}")
+            return None
 
-            position = positions[0]
+    def _send_close(self, terminal, ticket: int):
+        # runs on the gateway thread
+        # Get position info
+        positions = terminal.positions_get(ticket=ticket)
+        if not positions:
+            logger.error(f"Position with ticket {ticket} not found")
+            return None
 
-            # Determine opposite order type
-            if position.type == mt5.POSITION_TYPE_BUY:
-                order_type = mt5.ORDER_TYPE_SELL
-                price = mt5.symbol_info_tick(position.symbol).bid
-            else:
-                order_type = mt5.ORDER_TYPE_BUY
-                price = mt5.symbol_info_tick(position.symbol).ask
-
-            # Create close request
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": position.symbol,
-                "volume": position.volume,
-                "type": order_type,
-                "position": ticket,
-                "price": price,
-                "deviation": 20,
-                "magic": 234000,
-                "comment": "Close position",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
+        position = positions[0]
+
+        # Determine opposite order type
+        tick = self.gateway.symbol_info_tick(position.symbol)
+        if tick is None:
+            raise ValueError(f"No quote for {position.symbol}")
+        if position.type == terminal.POSITION_TYPE_BUY:
+            order_type = terminal.ORDER_TYPE_SELL
+            price = tick.bid
+        else:
+            order_type = terminal.ORDER_TYPE_BUY
+            price = tick.ask
+
+        # Create close request
+        request = {
+            "action": terminal.TRADE_ACTION_DEAL,
+            "symbol": position.symbol,
+            "volume": position.volume,
+            "type": order_type,
+            "position": ticket,
+            "price": price,
+            "deviation": 20,
+            "magic": 234000,
+            "comment": "Close position",
+            "type_time": terminal.ORDER_TIME_GTC,
+            "type_filling": terminal.ORDER_FILLING_IOC,
+        }
 
-            logger.info(f"MT5Demo: Closing position: {request}")
+        logger.info(f"MT5Demo: Closing position: {request}")
 
-            # Send close order
-            result = mt5.order_send(request)
+        # Send close order
+        result = terminal.order_send(request)
 
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                logger.error(f"Position close failed, return code: {result.retcode}")
-                logger.error(f"Error details: {result}")
-                return None
+        if result is None or result.retcode != terminal.TRADE_RETCODE_DONE:
+            logger.error(f"Position close failed, return code: {getattr(result, 'retcode', None)}")
+            logger.error(f"Error details: {result if result is not None else terminal.last_error()}")
+            return None
 
-            logger.info(f"Position closed successfully: ticket={ticket}")
-            return result
+        logger.info(f"Position closed successfully: ticket={ticket}")
+        self.positions.remove(ticket)
+        realized = self.pnl.close((self.name, ticket), result.price)
+        self.risk.record_fill(position.symbol, realized or 0.0, self._profit_currency(position.symbol))
+        return result
 
-        except Exception as e:
-            logger.error(f"Error closing position {ticket}: {e}")
+    def order_intent(self, data: dict, strategy: str):
+        """
+        The buy/sell order a run would place, for the pre-trade risk checks
+        """
+        action = str(data.get('action', '')).lower()
+        if action not in ('buy', 'sell'):
+            return None
+        try:
+            volume = float(data.get('volume', '0.01'))
+        except (TypeError, ValueError):
             return None
+        return OrderIntent(strategy, str(data.get('symbol', 'EURUSD')).upper(), action, volume)
 
     def run(self, *args, **kwargs):
         """
@@ -458,8 +540,7 @@ class MT5Demo(Action):
         Clean up MT5 connection when object is destroyed
         """
         try:
-            if self.connected:
-                mt5.shutdown()
-                logger.info("MT5 connection closed")
+            self._mark_task.stop()
+            self.gateway.stop()
         except:
             pass
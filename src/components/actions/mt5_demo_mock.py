@@ -3,42 +3,83 @@ Mock version of MT5Demo for development and testing on non-Windows systems.
 This allows the webhook bot to run without MetaTrader 5 installed.
 """
 
-from components.actions.base.action import Action
+from collections import namedtuple
+
+from components.actions.mt5_demo import MT5Demo
 from utils.log import get_logger
+from utils.position_book import PositionBook
+from utils.price_feed import PriceFeed
 from config import mt5_config
-import json
 import time
-from datetime import datetime
 
 logger = get_logger(__name__)
 
-
-class Mt5DemoMock(Action):
+AccountInfo = namedtuple('AccountInfo', [
+    'login', 'trade_mode', 'name', 'server', 'currency', 'leverage', 'limit_orders', 'margin_so_mode',
+    'trade_allowed', 'trade_expert', 'margin_mode', 'currency_digits', 'fifo_close', 'balance', 'credit',
+    'profit', 'equity', 'margin', 'margin_free', 'margin_level'
+])
+SymbolInfo = namedtuple('SymbolInfo', [
+    'name', 'basis', 'category', 'currency_base', 'currency_profit', 'currency_margin', 'digits',
+    'trade_tick_value', 'trade_tick_size', 'trade_contract_size', 'trade_mode', 'volume_min', 'volume_max',
+    'volume_step', 'spread', 'bid', 'ask'
+])
+Tick = namedtuple('Tick', ['time', 'bid', 'ask', 'last', 'volume'])
+TradePosition = namedtuple('TradePosition', [
+    'ticket', 'time', 'type', 'magic', 'identifier', 'reason', 'volume', 'price_open', 'sl', 'tp',
+    'price_current', 'swap', 'profit', 'symbol', 'comment', 'external_id'
+])
+OrderSendResult = namedtuple('OrderSendResult', [
+    'retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask', 'comment', 'request_id'
+])
+
+CONTRACT_SIZE = 100000.0
+
+# Mock symbol data for common pairs
+MOCK_SYMBOLS = {
+    'EURUSD': {'bid': 1.0850, 'ask': 1.0852, 'digits': 5, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
+    'GBPUSD': {'bid': 1.2650, 'ask': 1.2652, 'digits': 5, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
+    'USDJPY': {'bid': 149.85, 'ask': 149.87, 'digits': 3, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
+    'USDCHF': {'bid': 0.8750, 'ask': 0.8752, 'digits': 5, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
+}
+
+
+class MockTerminal:
     """
-    Mock implementation of MT5Demo for development/testing on systems
-    where MetaTrader5 Python package is not available (macOS, Linux)
+    Stand-in for the MetaTrader5 module: the same functions, constants and result shapes,
+    backed by in-memory account and position state. disconnect() simulates a lost terminal.
     """
 
-    def __init__(self):
-        logger.info(f"Mt5DemoMock.__init__() called with config: {mt5_config}")
-        super().__init__()
-
-        self.config = mt5_config
-        self.connected = True  # Always "connected" in mock mode
-        logger.info("Mt5DemoMock: Successfully initialized (MOCK MODE)")
-
-        # Mock account data
-        self.mock_account = {
-            'login': self.config.login,
-            'balance': 10000.0,
-            'equity': 10000.0,
-            'margin': 0.0,
-            'margin_free': 10000.0,
-            'margin_level': 0.0,
-            'currency': 'USD',
-            'server': self.config.server,
-            'name': 'Demo Account',
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    ORDER_TYPE_BUY_LIMIT = 2
+    ORDER_TYPE_SELL_LIMIT = 3
+    ORDER_TYPE_BUY_STOP = 4
+    ORDER_TYPE_SELL_STOP = 5
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_IOC = 1
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID_STOPS = 10016
+
+    RES_S_OK = (1, 'Success')
+    RES_E_NOT_FOUND = (-4, 'Not found')
+    RES_E_INVALID_STOPS = (10016, 'Invalid stops')
+    RES_E_INTERNAL_FAIL_CONNECT = (-10004, 'No IPC connection')
+
+    def __init__(self, login: int, server: str):
+        self.connected = False
+        self.error = self.RES_S_OK
+        self.calls = 0
+        self.account = {
+            'login': login,
             'trade_mode': 0,
+            'name': 'Demo Account',
+            'server': server,
+            'currency': 'USD',
+            'leverage': 100,
             'limit_orders': 200,
             'margin_so_mode': 0,
             'trade_allowed': True,
@@ -46,217 +87,425 @@ class Mt5DemoMock(Action):
             'margin_mode': 0,
             'currency_digits': 2,
             'fifo_close': False,
+            'balance': 10000.0,
             'credit': 0.0,
-            'profit': 0.0
+            'profit': 0.0,
+            'equity': 10000.0,
+            'margin': 0.0,
+            'margin_free': 10000.0,
+            'margin_level': 0.0
         }
-
-        # Mock positions storage
-        self.mock_positions = []
+        self.positions = PositionBook()
         self.next_ticket = 1000
 
-    def get_account_info(self):
-        """Mock account information"""
-        logger.info("Mt5DemoMock: Getting mock account information")
-        return self.mock_account.copy()
-
-    def get_symbol_info(self, symbol: str):
-        """Mock symbol information"""
-        logger.info(f"Mt5DemoMock: Getting mock symbol info for {symbol}")
-
-        # Mock symbol data for common pairs
-        mock_symbols = {
-            'EURUSD': {'bid': 1.0850, 'ask': 1.0852, 'digits': 5, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
-            'GBPUSD': {'bid': 1.2650, 'ask': 1.2652, 'digits': 5, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
-            'USDJPY': {'bid': 149.85, 'ask': 149.87, 'digits': 3, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
-            'USDCHF': {'bid': 0.8750, 'ask': 0.8752, 'digits': 5, 'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01},
-        }
+    def _online(self) -> bool:
+        self.calls += 1
+        self.error = self.RES_S_OK if self.connected else self.RES_E_INTERNAL_FAIL_CONNECT
+        return self.connected
+
+    def initialize(self, *args, **kwargs):
+        self.connected = True
+        self.error = self.RES_S_OK
+        return True
 
-        if symbol in mock_symbols:
-            base_info = mock_symbols[symbol]
-            return {
-                'name': symbol,
-                'basis': 0,
-                'category': 'Forex',
-                'currency_base': symbol[:3],
-                'currency_profit': symbol[3:],
-                'currency_margin': symbol[3:],
-                'digits': base_info['digits'],
-                'trade_tick_value': 1.0,
-                'trade_tick_size': 0.00001,
-                'trade_contract_size': 100000.0,
-                'trade_mode': 4,
-                'volume_min': base_info['volume_min'],
-                'volume_max': base_info['volume_max'],
-                'volume_step': base_info['volume_step'],
-                'spread': 2,
-                'bid': base_info['bid'],
-                'ask': base_info['ask']
-            }
+    def login(self, login=None, password=None, server=None):
+        return self.connected
+
+    def shutdown(self):
+        self.connected = False
+
+    def disconnect(self):
+        """Drops the connection, as if the terminal had closed"""
+        self.connected = False
+
+    def last_error(self):
+        return self.error
+
+    def account_info(self):
+        if not self._online():
+            return None
+        return AccountInfo(**self.account)
+
+    def symbol_info(self, symbol: str):
+        if not self._online():
+            return None
+        if symbol in MOCK_SYMBOLS:
+            base_info = MOCK_SYMBOLS[symbol]
         else:
             logger.warning(f"Mt5DemoMock: Unknown symbol {symbol}, returning default")
-            return {
-                'name': symbol,
-                'bid': 1.0000,
-                'ask': 1.0002,
-                'digits': 5,
-                'volume_min': 0.01,
-                'volume_max': 100.0,
-                'volume_step': 0.01
-            }
-
-    def place_order(self, symbol: str, order_type: str, volume: float, price: float = None,
-                   stop_loss: float = None, take_profit: float = None, comment: str = "Mock order"):
-        """Mock order placement"""
-        logger.info(f"Mt5DemoMock: Placing mock {order_type} order for {symbol}, volume={volume}")
-
-        symbol_info = self.get_symbol_info(symbol)
-
-        # Generate mock order result
+            base_info = {'bid': 1.0000, 'ask': 1.0002, 'digits': 5, 'volume_min': 0.01, 'volume_max': 100.0,
+                         'volume_step': 0.01}
+        return SymbolInfo(
+            name=symbol,
+            basis=0,
+            category='Forex',
+            currency_base=symbol[:3],
+            currency_profit=symbol[3:],
+            currency_margin=symbol[3:],
+            digits=base_info['digits'],
+            trade_tick_value=1.0,
+            trade_tick_size=0.00001,
+            trade_contract_size=CONTRACT_SIZE,
+            trade_mode=4,
+            volume_min=base_info['volume_min'],
+            volume_max=base_info['volume_max'],
+            volume_step=base_info['volume_step'],
+            spread=2,
+            bid=base_info['bid'],
+            ask=base_info['ask']
+        )
+
+    def symbol_info_tick(self, symbol: str):
+        if not self._online():
+            return None
+        base_info = MOCK_SYMBOLS.get(symbol, {'bid': 1.0000, 'ask': 1.0002})
+        return Tick(time=int(time.time()), bid=base_info['bid'], ask=base_info['ask'], last=0.0, volume=0)
+
+    def positions_get(self, symbol: str = None, ticket: int = None):
+        if not self._online():
+            return None
+        if ticket is not None:
+            position = self.positions.get(ticket)
+            return (position,) if position is not None and symbol in (None, position.symbol) else ()
+        return tuple(self.positions.for_symbol(symbol))
+
+    def order_send(self, request: dict):
+        if not self._online():
+            return None
         ticket = self.next_ticket
         self.next_ticket += 1
+        tick = self.symbol_info_tick(request['symbol'])
 
-        # Use current market price if not specified
-        if price is None:
-            if order_type in ['buy']:
-                price = symbol_info['ask']
-            else:
-                price = symbol_info['bid']
-
-        # Create mock position
-        position = {
-            'ticket': ticket,
-            'time': int(time.time()),
-            'type': 0 if order_type == 'buy' else 1,  # 0=buy, 1=sell
-            'magic': 234000,
-            'identifier': ticket,
-            'reason': 0,
-            'volume': volume,
-            'price_open': price,
-            'sl': stop_loss or 0.0,
-            'tp': take_profit or 0.0,
-            'price_current': price,
-            'swap': 0.0,
-            'profit': 0.0,
-            'symbol': symbol,
-            'comment': comment,
-            'external_id': ''
-        }
-
-        self.mock_positions.append(position)
-
-        result = {
-            'retcode': 10009,  # TRADE_RETCODE_DONE
-            'deal': ticket,
-            'order': ticket,
-            'volume': volume,
-            'price': price,
-            'bid': symbol_info['bid'],
-            'ask': symbol_info['ask'],
-            'comment': comment,
-            'request_id': ticket
-        }
+        if request.get('position'):
+            # closing an existing position
+            if self.positions.remove(request['position']) is None:
+                self.error = self.RES_E_NOT_FOUND
+                return None
+        else:
+            self.positions.add(TradePosition(
+                ticket=ticket,
+                time=int(time.time()),
+                type=self.POSITION_TYPE_BUY if request['type'] % 2 == 0 else self.POSITION_TYPE_SELL,
+                magic=request.get('magic', 0),
+                identifier=ticket,
+                reason=0,
+                volume=request['volume'],
+                price_open=request['price'],
+                sl=request.get('sl', 0.0),
+                tp=request.get('tp', 0.0),
+                price_current=request['price'],
+                swap=0.0,
+                profit=0.0,
+                symbol=request['symbol'],
+                comment=request.get('comment', ''),
+                external_id=''
+            ))
+
+        return OrderSendResult(
+            retcode=self.TRADE_RETCODE_DONE,
+            deal=ticket,
+            order=ticket,
+            volume=request['volume'],
+            price=request['price'],
+            bid=tick.bid,
+            ask=tick.ask,
+            comment=request.get('comment', ''),
+            request_id=ticket
+        )
+
+
+class SimulatedTerminal(MockTerminal):
+    """
+    MockTerminal driven by a replayed PriceFeed on a virtual clock.
 
-        logger.info(f"Mt5DemoMock: Mock order placed successfully: ticket={ticket}")
-        return result
+    advance(until) replays the feed up to a point in simulated time, triggering stop loss and
+    take profit on the way (checked against bar high/low, so intrabar hits are caught). Market
+    orders fill at the simulated bid/ask `latency` simulated seconds after they are sent, moved
+    `slippage_points` against the trader. Positions and the account are marked to market on
+    every read. Nothing sleeps, so replay runs as fast as the feed can be read.
 
-    def get_positions(self, symbol: str = None):
-        """Get mock positions"""
-        logger.info(f"Mt5DemoMock: Getting mock positions for symbol={symbol}")
+    Profit is in the symbol's quote currency; pending order types fill like market orders.
+    """
 
-        if symbol:
-            positions = [pos for pos in self.mock_positions if pos['symbol'] == symbol]
+    def __init__(self, login: int, server: str, feed: PriceFeed, slippage_points: float = 0, latency: float = 0.0):
+        super().__init__(login, server)
+        self.feed = feed
+        self.slippage_points = slippage_points
+        self.latency = latency
+        self.now = feed.start or 0.0
+        self.quotes = {}
+        self.stops = {}
+        self.deals = []
+        self.advance(self.now)
+
+    @staticmethod
+    def _point(symbol: str) -> float:
+        return 10 ** -MOCK_SYMBOLS.get(symbol, {'digits': 5})['digits']
+
+    @staticmethod
+    def _profit(position, price: float) -> float:
+        move = price - position.price_open if position.type == MockTerminal.POSITION_TYPE_BUY \
+            else position.price_open - price
+        return round(move * position.volume * CONTRACT_SIZE, 2)
+
+    def advance(self, until: float):
+        """
+        Replays the feed up to `until` (epoch seconds of simulated time)
+        :return: number of feed rows consumed
+        """
+        feed = self.feed
+        times, symbols, bids, asks, highs, lows = feed.times, feed.symbols, feed.bids, feed.asks, feed.highs, feed.lows
+        stops, quotes = self.stops, self.quotes
+        start = i = feed.position
+        end = len(times)
+        while i < end and times[i] <= until:
+            symbol = symbols[i]
+            quotes[symbol] = (times[i], bids[i], asks[i])
+            thresholds = stops.get(symbol)
+            if thresholds is not None:
+                spread = asks[i] - bids[i]
+                high, low = highs[i], lows[i]
+                if (low <= thresholds[0] or high >= thresholds[1]
+                        or high + spread >= thresholds[2] or low + spread <= thresholds[3]):
+                    self.now = times[i]
+                    self._trigger_stops(symbol, high, low, spread)
+            i += 1
+        feed.position = i
+        self.now = max(self.now, until)
+        return i - start
+
+    def run_to_end(self):
+        """Replays the rest of the feed"""
+        return self.advance(float('inf')) if not self.feed.exhausted else 0
+
+    def _update_stops(self, symbol: str):
+        # tightest levels per side, so a quote only needs four comparisons to know nothing triggers
+        inf = float('inf')
+        buy_sl, buy_tp, sell_sl, sell_tp = -inf, inf, inf, -inf
+        for position in self.positions.for_symbol(symbol):
+            if position.type == self.POSITION_TYPE_BUY:
+                if position.sl:
+                    buy_sl = max(buy_sl, position.sl)
+                if position.tp:
+                    buy_tp = min(buy_tp, position.tp)
+            else:
+                if position.sl:
+                    sell_sl = min(sell_sl, position.sl)
+                if position.tp:
+                    sell_tp = max(sell_tp, position.tp)
+        if (buy_sl, buy_tp, sell_sl, sell_tp) == (-inf, inf, inf, -inf):
+            self.stops.pop(symbol, None)
         else:
-            positions = self.mock_positions.copy()
-
-        logger.info(f"Mt5DemoMock: Retrieved {len(positions)} mock positions")
-        return positions
-
-    def close_position(self, ticket: int):
-        """Mock position closing"""
-        logger.info(f"Mt5DemoMock: Closing mock position with ticket={ticket}")
+            self.stops[symbol] = (buy_sl, buy_tp, sell_sl, sell_tp)
+
+    def _trigger_stops(self, symbol: str, high: float, low: float, spread: float):
+        for position in self.positions.for_symbol(symbol):
+            if position.type == self.POSITION_TYPE_BUY:
+                # buys close on the bid; when both levels are inside one bar assume the stop loss hit first
+                if position.sl and low <= position.sl:
+                    self._close(position, min(position.sl, high), 'sl')
+                elif position.tp and high >= position.tp:
+                    self._close(position, position.tp, 'tp')
+            else:
+                # sells close on the ask
+                if position.sl and high + spread >= position.sl:
+                    self._close(position, max(position.sl, low + spread), 'sl')
+                elif position.tp and low + spread <= position.tp:
+                    self._close(position, position.tp, 'tp')
+        self._update_stops(symbol)
+
+    def _close(self, position, price: float, reason: str):
+        profit = self._profit(position, price)
+        self.positions.remove(position.ticket)
+        self.account['balance'] = round(self.account['balance'] + profit, 2)
+        self.deals.append({
+            'ticket': position.ticket,
+            'symbol': position.symbol,
+            'type': position.type,
+            'volume': position.volume,
+            'price_open': position.price_open,
+            'price_close': price,
+            'time_open': position.time,
+            'time_close': self.now,
+            'profit': profit,
+            'reason': reason,
+        })
+        return profit
+
+    def _valid_stops(self, request: dict, bid: float, ask: float) -> bool:
+        # like the terminal: a buy (closed on the bid) needs sl below and tp above the bid,
+        # a sell (closed on the ask) sl above and tp below the ask
+        sl, tp = request.get('sl') or 0.0, request.get('tp') or 0.0
+        if request['type'] % 2 == 0:
+            return (not sl or sl < bid) and (not tp or tp > bid)
+        return (not sl or sl > ask) and (not tp or tp < ask)
+
+    def _marked(self, position):
+        quote = self.quotes.get(position.symbol)
+        if quote is None:
+            return position
+        price = quote[1] if position.type == self.POSITION_TYPE_BUY else quote[2]
+        return position._replace(price_current=price, profit=self._profit(position, price))
+
+    def account_info(self):
+        if not self._online():
+            return None
+        floating = round(sum(self._marked(position).profit for position in self.positions), 2)
+        balance = self.account['balance']
+        return AccountInfo(**dict(self.account, profit=floating, equity=round(balance + floating, 2),
+                                  margin_free=round(balance + floating, 2)))
+
+    def symbol_info_tick(self, symbol: str):
+        if not self._online():
+            return None
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            self.error = self.RES_E_NOT_FOUND
+            return None
+        return Tick(time=int(quote[0]), bid=quote[1], ask=quote[2], last=0.0, volume=0)
+
+    def positions_get(self, symbol: str = None, ticket: int = None):
+        positions = super().positions_get(symbol=symbol, ticket=ticket)
+        return positions if positions is None else tuple(self._marked(position) for position in positions)
+
+    def order_send(self, request: dict):
+        if not self._online():
+            return None
+        if self.latency:
+            self.advance(self.now + self.latency)
+        symbol = request['symbol']
+        quote = self.quotes.get(symbol)
+        if quote is None:
+            self.error = self.RES_E_NOT_FOUND
+            return None
+        _, bid, ask = quote
+        point = self._point(symbol)
+        slippage = self.slippage_points * point
+        digits = MOCK_SYMBOLS.get(symbol, {'digits': 5})['digits']
+        if not request.get('position') and not self._valid_stops(request, bid, ask):
+            self.error = self.RES_E_INVALID_STOPS
+            return OrderSendResult(retcode=self.TRADE_RETCODE_INVALID_STOPS, deal=0, order=0, volume=0.0, price=0.0,
+                                   bid=bid, ask=ask, comment='Invalid stops', request_id=0)
+        ticket = self.next_ticket
+        self.next_ticket += 1
 
-        # Find and remove position
-        for i, pos in enumerate(self.mock_positions):
-            if pos['ticket'] == ticket:
-                del self.mock_positions[i]
-                logger.info(f"Mt5DemoMock: Mock position {ticket} closed successfully")
-                return {'retcode': 10009, 'deal': ticket}
+        if request.get('position'):
+            position = self.positions.get(request['position'])
+            if position is None:
+                self.error = self.RES_E_NOT_FOUND
+                return None
+            price = round(bid - slippage if position.type == self.POSITION_TYPE_BUY else ask + slippage, digits)
+            self._close(position, price, 'close')
+        else:
+            buy = request['type'] % 2 == 0
+            price = round(ask + slippage if buy else bid - slippage, digits)
+            self.positions.add(TradePosition(
+                ticket=ticket,
+                time=int(self.now),
+                type=self.POSITION_TYPE_BUY if buy else self.POSITION_TYPE_SELL,
+                magic=request.get('magic', 0),
+                identifier=ticket,
+                reason=0,
+                volume=request['volume'],
+                price_open=price,
+                sl=request.get('sl', 0.0),
+                tp=request.get('tp', 0.0),
+                price_current=price,
+                swap=0.0,
+                profit=0.0,
+                symbol=symbol,
+                comment=request.get('comment', ''),
+                external_id=''
+            ))
+        self._update_stops(symbol)
+
+        return OrderSendResult(
+            retcode=self.TRADE_RETCODE_DONE,
+            deal=ticket,
+            order=ticket,
+            volume=request['volume'],
+            price=price,
+            bid=bid,
+            ask=ask,
+            comment=request.get('comment', ''),
+            request_id=ticket
+        )
+
+
+class Mt5DemoMock(MT5Demo):
+    """
+    Mock implementation of MT5Demo for development/testing on systems
+    where MetaTrader5 Python package is not available (macOS, Linux).
+    Runs the real MT5Demo code and gateway against a MockTerminal, or a SimulatedTerminal
+    replaying MT5_SIM_FEED when it is set.
+    """
 
-        logger.error(f"Mt5DemoMock: Position {ticket} not found")
-        return None
+    def __init__(self, terminal=None):
+        logger.info(f"Mt5DemoMock.__init__() called with config: {mt5_config} (MOCK MODE)")
+        if terminal is None and mt5_config.sim_feed:
+            feed = PriceFeed.load(mt5_config.sim_feed, symbol=mt5_config.sim_symbol,
+                                  spread_points=mt5_config.sim_spread)
+            terminal = SimulatedTerminal(mt5_config.login, mt5_config.server, feed,
+                                         slippage_points=mt5_config.sim_slippage, latency=mt5_config.sim_latency)
+        # terminal deals already reconciled into the position book, PnL and risk engines
+        self._deals_seen = 0
+        super().__init__(terminal=terminal or MockTerminal(mt5_config.login, mt5_config.server))
+        if isinstance(self.mt5, SimulatedTerminal):
+            # simulated time moves faster than the wall clock, so quotes must not be reused
+            self.gateway.cache.tick_ttl = 0
+
+    @property
+    def simulated(self) -> bool:
+        return isinstance(self.mt5, SimulatedTerminal)
+
+    def advance(self, until: float):
+        """
+        Moves simulated time forward to `until` (epoch seconds), on the gateway thread
+        :return: number of feed rows replayed (always 0 without a price feed)
+        """
+        if not self.simulated:
+            return 0
+        rows = self.gateway.call(lambda terminal: terminal.advance(until))
+        self.reconcile_stops()
+        return rows
 
-    def run(self, *args, **kwargs):
+    def reconcile_stops(self):
         """
-        Main run method - same interface as real MT5Demo
+        Books positions the simulated terminal closed on its own (stop loss / take profit) the way
+        a close we sent is booked: dropped from the position book, realized in the PnL engine and
+        recorded as an opposite fill with the terminal's profit in the risk engine
+        :return: the reconciled deals
         """
-        logger.info("==================== Mt5DemoMock.run() START ====================")
-        logger.info(f"Mt5DemoMock.run() called with args: {args}, kwargs: {kwargs}")
-        super().run(*args, **kwargs)
-        logger.info("==================== Mt5DemoMock.run() AFTER SUPER ====================")
-
-        try:
-            logger.info("Mt5DemoMock: Validating data...")
-            data = self.validate_data()
-            logger.info(f"Mt5DemoMock: Validated data: {data}")
-
-            action = data.get('action', '').lower()
-            symbol = data.get('symbol', 'EURUSD').upper()
-
-            if action == 'info':
-                logger.info("Mt5DemoMock: Getting mock account information...")
-                account_info = self.get_account_info()
-                logger.info(f"Mock account info: {account_info}")
-
-            elif action == 'positions':
-                logger.info("Mt5DemoMock: Getting mock positions...")
-                positions = self.get_positions(symbol if symbol != 'ALL' else None)
-                logger.info(f"Mock positions: {len(positions)} positions")
-                for pos in positions:
-                    logger.info(f"Position: {pos['symbol']} {pos['type']} {pos['volume']} @ {pos['price_open']}")
-
-            elif action in ['buy', 'sell']:
-                volume = float(data.get('volume', '0.01'))
-                order_type = data.get('order_type', 'market').lower()
-                price = float(data.get('price', 0)) if data.get('price') else None
-                stop_loss = float(data.get('stop_loss', 0)) if data.get('stop_loss') else None
-                take_profit = float(data.get('take_profit', 0)) if data.get('take_profit') else None
-                comment = data.get('comment', 'Mock webhook trade')
-
-                logger.info(f"Mt5DemoMock: Placing mock {action} order for {symbol}, volume={volume}")
-
-                result = self.place_order(
-                    symbol=symbol,
-                    order_type=action,
-                    volume=volume,
-                    price=price,
-                    stop_loss=stop_loss,
-                    take_profit=take_profit,
-                    comment=comment
-                )
-
-                if result:
-                    logger.info(f"Mt5DemoMock: Mock order executed successfully: {result}")
-                else:
-                    logger.error("Mt5DemoMock: Failed to execute mock order")
-
-            elif action == 'close':
-                ticket = int(data.get('ticket', 0))
-                if not ticket:
-                    raise ValueError("Ticket number is required for close action")
-
-                logger.info(f"Mt5DemoMock: Closing mock position with ticket={ticket}")
-                result = self.close_position(ticket)
-
-                if result:
-                    logger.info(f"Mt5DemoMock: Mock position closed successfully: ticket={ticket}")
-                else:
-                    logger.error(f"Mt5DemoMock: Failed to close mock position: ticket={ticket}")
+        if not self.simulated:
+            return []
+        deals = self.gateway.call(lambda terminal: terminal.deals[self._deals_seen:])
+        self._deals_seen += len(deals)
+        # our own closes were booked by close_position already
+        stopped = [deal for deal in deals if deal['reason'] != 'close']
+        for deal in stopped:
+            self.positions.remove(deal['ticket'])
+            self.pnl.close((self.name, deal['ticket']), deal['price_close'])
+            self.risk.record_fill(deal['symbol'], realized=deal['profit'],
+                                  currency=self._profit_currency(deal['symbol']))
+            logger.info(f"Mt5DemoMock: {deal['symbol']} position {deal['ticket']} closed by {deal['reason']} "
+                        f"at {deal['price_close']}, profit {deal['profit']}")
+        return stopped
+
+    def place_order(self, *args, **kwargs):
+        result = super().place_order(*args, **kwargs)
+        # the fill latency moves simulated time, which can trigger other positions' stops
+        self.reconcile_stops()
+        return result
 
-            else:
-                raise ValueError(f"Invalid action: {action}")
+    def close_position(self, ticket: int):
+        result = super().close_position(ticket)
+        self.reconcile_stops()
+        return result
+
+    @property
+    def mock_account(self):
+        return self.mt5.account
 
-        except Exception as e:
-            logger.error(f"Error in Mt5DemoMock action run: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
+    @property
+    def mock_positions(self):
+        return self.mt5.positions.for_symbol()
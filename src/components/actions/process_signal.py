@@ -3,11 +3,17 @@ import json
 
 from components.actions.base.action import Action
 from components.logs.log_event import LogEvent
+from utils.replay import parse_time
+from utils.signal_analytics import get_signal_analytics
+
+# signals a (strategy, symbol) needs before its own statistics replace the fixed thresholds
+MIN_HISTORY = 20
 
 
 class ProcessSignal(Action):
     def __init__(self):
         super().__init__()
+        self.analytics = get_signal_analytics()
 
     def run(self, *args, **kwargs):
         super().run(*args, **kwargs)  # this is required
@@ -20,8 +26,9 @@ class ProcessSignal(Action):
         # Extract signal information
         signal_info = self._extract_signal_data(data)
 
-        # Process and analyze the signal
-        analysis = self._analyze_signal(signal_info)
+        # Update the strategy's rolling statistics, then analyze the signal against them
+        stats = self._record_signal(signal_info)
+        analysis = self._analyze_signal(signal_info, stats)
 
         # Log the processed signal
         self._log_signal(signal_info, analysis)
@@ -62,9 +69,26 @@ class ProcessSignal(Action):
                 'confidence': 0
             }
 
-    def _analyze_signal(self, signal_info):
+    def _record_signal(self, signal_info):
+        """
+        Adds the signal to its (strategy, symbol) rolling window
+        :return: the window's statistics, including this signal
         """
-        Analyze the trading signal and provide insights
+        try:
+            price = float(signal_info.get('price') or 0)
+            confidence = float(signal_info.get('confidence') or 0)
+        except (TypeError, ValueError):
+            price, confidence = 0.0, 0.0
+        return self.analytics.record(signal_info['strategy'], signal_info['symbol'], signal_info['action'],
+                                     price=price, confidence=confidence,
+                                     timestamp=parse_time(signal_info.get('timestamp')))
+
+    def _analyze_signal(self, signal_info, stats=None):
+        """
+        Analyze the trading signal and provide insights.
+        With enough history the thresholds come from the strategy's own recent signals:
+        confidence is compared to its median / 75th percentile, and a low hit rate or
+        frequent direction flips raise the risk level.
         """
         analysis = {
             'signal_strength': 'Weak',
@@ -72,8 +96,27 @@ class ProcessSignal(Action):
             'risk_level': 'Medium'
         }
 
-        # Simple analysis based on confidence level
-        confidence = signal_info.get('confidence', 0)
+        try:
+            confidence = float(signal_info.get('confidence', 0) or 0)
+        except (TypeError, ValueError):
+            confidence = 0.0
+
+        if stats and stats.get('count', 0) >= MIN_HISTORY:
+            hit_rate = stats['hit_rate'] if stats['hit_rate'] is not None else 0.5
+            if confidence >= stats['confidence_p75'] and hit_rate >= 0.55:
+                analysis['signal_strength'] = 'Strong'
+                analysis['recommendation'] = 'Execute'
+            elif confidence >= stats['confidence_median'] and hit_rate >= 0.45:
+                analysis['signal_strength'] = 'Moderate'
+                analysis['recommendation'] = 'Consider'
+            if hit_rate < 0.45 or (stats['flip_rate'] or 0) > 0.5:
+                analysis['risk_level'] = 'High'
+            elif hit_rate >= 0.55:
+                analysis['risk_level'] = 'Low'
+            analysis['hit_rate'] = stats['hit_rate']
+            return analysis
+
+        # Not enough history yet: simple analysis based on confidence level
         if confidence >= 80:
             analysis['signal_strength'] = 'Strong'
             analysis['recommendation'] = 'Execute'
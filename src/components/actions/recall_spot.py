@@ -1,11 +1,314 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
 from components.actions.base.action import Action
-from utils.bearer_auth import create_bearer_authenticator
+from utils.background import PeriodicTask
+from utils.bearer_auth import create_async_bearer_authenticator
 from utils.log import get_logger
+from utils.shared_state import SharedState
 from config import recall_config
 import json
 
 logger = get_logger(__name__)
 
+# seed mappings, used until the first portfolio refresh (live data wins over these)
+KNOWN_TOKENS = [
+    {"token": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", "symbol": "WETH", "chain": "evm"},
+    {"token": "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", "symbol": "USDC", "chain": "evm"},
+    {"token": "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174", "symbol": "USDC", "chain": "evm"},  # Polygon USDC
+    {"token": "0xd9aAEc86B65D86f6A7B5B1b0c42FFA531710b6CA", "symbol": "USDbC", "chain": "evm"},
+    {"token": "0xaf88d065e77c8cc2239327c5edb3a432268e5831", "symbol": "USDC", "chain": "evm"},  # Arbitrum USDC
+    {"token": "0x7f5c764cbc14f9669b88837ca1490cca17c31607", "symbol": "USDC", "chain": "evm"},  # Optimism USDC
+    {"token": "So11111111111111111111111111111111111111112", "symbol": "SOL", "chain": "svm", "specificChain": "svm"},
+    {"token": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v", "symbol": "USDC", "chain": "svm", "specificChain": "svm"}
+]
+
+
+def normalize_address(address: str) -> str:
+    """
+    EVM addresses are case-insensitive (mixed case is only a checksum) so they are lowercased;
+    Solana base58 addresses are case-sensitive and kept as-is
+    """
+    address = address.strip()
+    return address.lower() if address[:2].lower() == '0x' else address
+
+
+def build_token_mappings(tokens: list, first_wins: bool = False) -> dict:
+    """
+    Builds {chain: {SYMBOL: address}} from a token list, keyed by specificChain.
+    :param first_wins: keep the first address listed for a symbol on a chain instead of the last;
+        the portfolio is read last-wins, the seeded list first-wins (it lists mainnet USDC first)
+    """
+    mappings = {}
+    for token_info in tokens:
+        chain_type = token_info.get('chain', 'evm')
+        chain = token_info.get('specificChain', 'mainnet' if chain_type == 'evm' else chain_type)
+        symbol = token_info.get('symbol', '').upper()
+        address = token_info.get('token', '') or token_info.get('address', '')
+        if not symbol or not address:
+            continue
+        symbols = mappings.setdefault(chain, {})
+        if first_wins:
+            symbols.setdefault(symbol, normalize_address(address))
+        else:
+            symbols[symbol] = normalize_address(address)
+
+    # ETH is an alias for WETH on mainnet
+    mainnet = mappings.get('mainnet', {})
+    if 'WETH' in mainnet:
+        mainnet.setdefault('ETH', mainnet['WETH'])
+    return mappings
+
+
+class RecallTokenResolver:
+    """
+    In-memory symbol -> address lookups for the order path.
+
+    Mappings are refreshed from the portfolio in the background and persisted to `path`, so
+    workers share one refresh per `ttl` (coordinated through a locked timestamp file) and a
+    restarted worker starts from the last known mappings. Unknown (chain, symbol) pairs are
+    remembered for `negative_ttl` seconds; the first miss schedules a refresh through `on_miss`
+    instead of blocking the caller on the API.
+    """
+
+    def __init__(self, loader, path: str, ttl: float, negative_ttl: float):
+        self.loader = loader
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.on_miss = None
+        self.mappings = build_token_mappings(KNOWN_TOKENS, first_wins=True)
+        self.symbols = {}
+        self.updated_at = 0.0
+        self.misses = {}
+        self._refresh_requested = False
+        self._lock = threading.Lock()
+        self._refreshed = SharedState(f'{path}.lock', '<d')
+        self._swap(self.mappings, 0.0)
+        self.load_file()
+
+    def _swap(self, mappings: dict, updated_at: float):
+        symbols = {}
+        for chain, tokens in mappings.items():
+            for symbol, address in tokens.items():
+                # aliases come after the symbol they point at
+                symbols.setdefault((chain, address), symbol)
+        with self._lock:
+            self.mappings, self.symbols, self.updated_at = mappings, symbols, updated_at
+            self.misses = {key: expiry for key, expiry in self.misses.items()
+                           if key[1] not in mappings.get(key[0], {})}
+
+    def load_file(self) -> bool:
+        """
+        Loads mappings another worker (or a previous run) saved, if they are newer than ours
+        :return: True if mappings were loaded
+        """
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token cache {self.path}: {e}")
+            return False
+        if saved.get('updated_at', 0) <= self.updated_at:
+            return False
+        self._swap(saved['mappings'], saved['updated_at'])
+        return True
+
+    def _save_file(self):
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'updated_at': self.updated_at, 'mappings': self.mappings}, f)
+        os.replace(tmp, self.path)
+
+    def refresh(self, force: bool = False):
+        """
+        Reloads mappings from the API when they are older than ttl (or a miss asked for it),
+        unless another worker already did
+        :return: the current mappings
+        """
+        force = force or self._refresh_requested
+        with self._refreshed.locked() as refreshed:
+            last_refresh, = refreshed.read()
+            self.load_file()
+            if not force and time.time() - last_refresh < self.ttl:
+                return self.mappings
+            self._refresh_requested = False
+            tokens = self.loader()
+            if tokens is None:
+                logger.warning("Token refresh failed, keeping current mappings")
+                return self.mappings
+
+            mappings = build_token_mappings(KNOWN_TOKENS, first_wins=True)
+            for chain, symbols in build_token_mappings(tokens).items():
+                mappings.setdefault(chain, {}).update(symbols)
+            now = time.time()
+            self._swap(mappings, now)
+            self._save_file()
+            refreshed.write(now)
+        logger.info(f"Updated token mappings for {len(mappings)} chains "
+                    f"with {sum(len(symbols) for symbols in mappings.values())} total tokens")
+        return mappings
+
+    def resolve(self, symbol: str, chain: str = 'mainnet'):
+        """
+        :return: the token address, or None if the pair is unknown
+        """
+        symbol = symbol.upper()
+        address = self.mappings.get(chain, {}).get(symbol)
+        if address:
+            return address
+
+        key = (chain, symbol)
+        now = time.monotonic()
+        if self.misses.get(key, 0) > now:
+            return None
+        self.misses[key] = now + self.negative_ttl
+        logger.error(f"No address found for symbol '{symbol}' on chain '{chain}', "
+                     f"available: {list(self.mappings.get(chain, {}))}")
+        self._refresh_requested = True
+        if self.on_miss is not None:
+            self.on_miss()
+        return None
+
+    def symbol_for(self, address: str, chain: str = 'mainnet'):
+        """
+        Reverse lookup, ignoring the case of EVM addresses
+        """
+        return self.symbols.get((chain, normalize_address(address)))
+
+    def as_json(self):
+        return {
+            'updated_at': self.updated_at,
+            'chains': {chain: sorted(symbols) for chain, symbols in self.mappings.items()},
+            'negative': sorted(f'{chain}.{symbol}' for chain, symbol in self.misses),
+        }
+
+
+def _chain_of(item: dict, chain_field: str = 'chain', specific_field: str = 'specificChain'):
+    chain_type = item.get(chain_field) or 'evm'
+    return item.get(specific_field) or ('mainnet' if chain_type == 'evm' else chain_type), chain_type
+
+
+class RecallChainSnapshot:
+    """
+    Portfolio tokens, balances and trades for one chain (mainnet, polygon, arbitrum, optimism, base, svm...)
+    """
+
+    __slots__ = ('chain', 'chain_type', 'tokens', 'balances', 'trades', 'value')
+
+    def __init__(self, chain: str, chain_type: str):
+        self.chain = chain
+        self.chain_type = chain_type
+        self.tokens = {}
+        self.balances = {}
+        self.trades = []
+        self.value = 0.0
+
+    def as_json(self):
+        return {
+            'chain_type': self.chain_type,
+            'value': self.value,
+            'tokens': self.tokens,
+            'balances': self.balances,
+            'trades': len(self.trades),
+        }
+
+
+class RecallSnapshot:
+    """
+    Portfolio, balances and trade history merged per chain. Built off the order path and swapped
+    in as a whole, so readers always see one consistent refresh. A resource that failed to load
+    is carried over from the previous snapshot.
+    """
+
+    __slots__ = ('taken_at', 'chains', 'loaded')
+
+    def __init__(self, portfolio=None, balances=None, trades=None, previous: 'RecallSnapshot' = None,
+                 taken_at: float = None):
+        # when the fetches started: anything that happened before then is in the snapshot
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self.chains = {}
+        self.loaded = {}
+
+        for name, data in (('portfolio', portfolio), ('balances', balances), ('trades', trades)):
+            if data is None and previous is not None and previous.loaded.get(name):
+                self._carry_over(name, previous)
+                self.loaded[name] = previous.loaded[name]
+            elif data is not None:
+                getattr(self, f'_load_{name}')(data)
+                self.loaded[name] = self.taken_at
+
+    def _chain(self, chain: str, chain_type: str) -> RecallChainSnapshot:
+        snapshot = self.chains.get(chain)
+        if snapshot is None:
+            snapshot = self.chains[chain] = RecallChainSnapshot(chain, chain_type)
+        return snapshot
+
+    def _load_portfolio(self, portfolio: dict):
+        for token in portfolio.get('tokens', []):
+            chain = self._chain(*_chain_of(token))
+            chain.tokens[token.get('symbol', '').upper()] = token
+            chain.value += float(token.get('value') or 0)
+
+    def _load_balances(self, response: dict):
+        for balance in response.get('balances', []):
+            chain = self._chain(*_chain_of(balance))
+            chain.balances[balance.get('symbol', '').upper()] = float(balance.get('amount') or 0)
+
+    def _load_trades(self, response: dict):
+        for trade in response.get('trades', []):
+            self._chain(*_chain_of(trade, 'fromChain', 'fromSpecificChain')).trades.append(trade)
+
+    def _carry_over(self, name: str, previous: 'RecallSnapshot'):
+        for old in previous.chains.values():
+            chain = self._chain(old.chain, old.chain_type)
+            if name == 'portfolio':
+                chain.tokens, chain.value = old.tokens, old.value
+            elif name == 'balances':
+                chain.balances = old.balances
+            else:
+                chain.trades = old.trades
+
+    def chain(self, chain: str):
+        return self.chains.get(chain)
+
+    def chains_of(self, chain_type: str) -> list:
+        """
+        :return: the snapshots of every chain of a type ('evm' or 'svm')
+        """
+        return [chain for chain in self.chains.values() if chain.chain_type == chain_type]
+
+    def balance(self, symbol: str, chain: str = 'mainnet'):
+        """
+        :return: available amount of a token on a chain (balances, else portfolio amount), or None if unknown
+        """
+        snapshot = self.chains.get(chain)
+        if snapshot is None:
+            return None
+        symbol = symbol.upper()
+        if symbol in snapshot.balances:
+            return snapshot.balances[symbol]
+        token = snapshot.tokens.get(symbol)
+        return float(token.get('amount') or 0) if token else None
+
+    @property
+    def value(self) -> float:
+        return sum(chain.value for chain in self.chains.values())
+
+    def as_json(self):
+        return {
+            'taken_at': self.taken_at,
+            'loaded': self.loaded,
+            'value': self.value,
+            'chains': {name: chain.as_json() for name, chain in self.chains.items()},
+        }
+
 
 class RecallSpot(Action):
     def __init__(self):
@@ -13,64 +316,30 @@ class RecallSpot(Action):
         super().__init__()
 
         self.config = recall_config
-        self.authenticator = create_bearer_authenticator(self.config.api_key)
-        self._token_mappings = {}  # Cache for symbol -> address mappings
-        self._initialize_token_mappings()  # Pre-populate with known tokens
+        self.authenticator = create_async_bearer_authenticator(self.config.api_key, exchange='recall')
+        # symbol -> address mappings, shared on disk by all workers and refreshed in the background
+        self.tokens = RecallTokenResolver(
+            self._fetch_tokens,
+            path=self.config.token_cache_file,
+            ttl=self.config.token_refresh_interval,
+            negative_ttl=self.config.token_negative_ttl
+        )
+        self._tokens_task = PeriodicTask(
+            'recall-tokens', self.config.token_refresh_interval, self.tokens.refresh, run_immediately=True
+        ).start()
+        self.tokens.on_miss = self._tokens_task.wake
+
+        # portfolio / balance / trade history snapshot, refreshed concurrently in the background after
+        # each of our trades and on a slow poll (every refresh is 3 reads from the shared recall bucket)
+        self.snapshot = RecallSnapshot()
+        # when our last trade was accepted; percent sizes need a snapshot taken after it
+        self.last_trade_at = 0.0
+        self._snapshot_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='recall-snapshot')
+        self._snapshot_task = PeriodicTask(
+            'recall-snapshot', self.config.snapshot_refresh_interval, self.refresh_snapshot, run_immediately=True
+        ).start()
         logger.info("RecallSpot: Successfully initialized with authenticator")
 
-    def _initialize_token_mappings(self):
-        """
-        Pre-populate token mappings with known tokens from portfolio
-        """
-        # Pre-populated token data from Recall portfolio
-        portfolio_data = {
-            "tokens": [
-                {"token": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", "symbol": "WETH", "chain": "evm"},
-                {"token": "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", "symbol": "USDC", "chain": "evm"},
-                {"token": "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174", "symbol": "USDC", "chain": "evm"},  # Polygon USDC
-                {"token": "0xd9aAEc86B65D86f6A7B5B1b0c42FFA531710b6CA", "symbol": "USDbC", "chain": "evm"},
-                {"token": "0xaf88d065e77c8cc2239327c5edb3a432268e5831", "symbol": "USDC", "chain": "evm"},  # Arbitrum USDC
-                {"token": "0x7f5c764cbc14f9669b88837ca1490cca17c31607", "symbol": "USDC", "chain": "evm"},  # Optimism USDC
-                {"token": "So11111111111111111111111111111111111111112", "symbol": "SOL", "chain": "svm", "specificChain": "svm"},
-                {"token": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v", "symbol": "USDC", "chain": "svm", "specificChain": "svm"}
-            ]
-        }
-
-        mappings = {}
-
-        for token_info in portfolio_data["tokens"]:
-            chain_type = token_info.get('chain', 'evm')
-            specific_chain = token_info.get('specificChain', 'mainnet' if chain_type == 'evm' else chain_type)
-            symbol = token_info.get('symbol', '').upper()
-            address = token_info.get('token', '')
-
-            # Use specificChain as the key for mapping
-            chain_key = specific_chain
-
-            if chain_key not in mappings:
-                mappings[chain_key] = {}
-
-            if symbol and address:
-                # For multiple USDC addresses, prefer mainnet (first one in our list)
-                if symbol not in mappings[chain_key]:
-                    mappings[chain_key][symbol] = address
-                    logger.debug(f"Added mapping: {chain_key}.{symbol} -> {address}")
-                else:
-                    logger.debug(f"Skipped duplicate mapping for {chain_key}.{symbol}")
-
-        # Add some common aliases
-        if 'mainnet' in mappings:
-            # Add ETH as alias for WETH on mainnet
-            if 'WETH' in mappings['mainnet'] and 'ETH' not in mappings['mainnet']:
-                mappings['mainnet']['ETH'] = mappings['mainnet']['WETH']
-                logger.debug(f"Added ETH alias for WETH on mainnet")
-
-        self._token_mappings = mappings
-        logger.info(f"Pre-populated token mappings for {len(mappings)} chains with {sum(len(tokens) for tokens in mappings.values())} total tokens")
-        logger.info(f"Available chains: {list(mappings.keys())}")
-        for chain, tokens in mappings.items():
-            logger.info(f"  {chain}: {list(tokens.keys())}")
-
     def get_portfolio(self):
         """
         Get portfolio information from Recall API including available tokens
@@ -88,77 +357,53 @@ class RecallSpot(Action):
             logger.error(f"Error getting portfolio: {e}")
             return None
 
-    def build_token_mappings(self):
+    def _fetch_tokens(self):
         """
-        Build symbol -> address mappings from portfolio data, organized by chain
-        This will refresh mappings from the live API (fallback to pre-populated data)
+        Loads the token list for the resolver from the portfolio endpoint
+        :return: list of token dicts, or None if the portfolio is unavailable
         """
-        try:
-            portfolio = self.get_portfolio()
-            if not portfolio:
-                logger.warning("Failed to retrieve portfolio, using pre-populated mappings")
-                return self._token_mappings
-
-            mappings = {}
-
-            # Extract token information from portfolio
-            if 'tokens' in portfolio:
-                for token_info in portfolio['tokens']:
-                    chain_type = token_info.get('chain', 'evm')
-                    specific_chain = token_info.get('specificChain', 'mainnet' if chain_type == 'evm' else chain_type)
-                    symbol = token_info.get('symbol', '').upper()
-                    address = token_info.get('token', '') or token_info.get('address', '')
-
-                    # Use specificChain as the key
-                    chain_key = specific_chain
-
-                    if chain_key not in mappings:
-                        mappings[chain_key] = {}
-
-                    if symbol and address:
-                        mappings[chain_key][symbol] = address
-                        logger.debug(f"Updated mapping: {chain_key}.{symbol} -> {address}")
-
-            # Add common aliases
-            if 'mainnet' in mappings:
-                if 'WETH' in mappings['mainnet'] and 'ETH' not in mappings['mainnet']:
-                    mappings['mainnet']['ETH'] = mappings['mainnet']['WETH']
+        portfolio = self.get_portfolio()
+        if not portfolio:
+            return None
+        return portfolio.get('tokens', [])
 
-            self._token_mappings = mappings
-            logger.info(f"Updated token mappings from API for {len(mappings)} chains")
-            return mappings
+    @property
+    def _token_mappings(self):
+        return self.tokens.mappings
 
-        except Exception as e:
-            logger.error(f"Error building token mappings from API: {e}")
-            logger.info("Falling back to pre-populated mappings")
-            return self._token_mappings
+    def build_token_mappings(self):
+        """
+        Refresh symbol -> address mappings from the live API now, organized by chain
+        (keeps the current mappings if the API is unavailable)
+        """
+        return self.tokens.refresh(force=True)
 
     def get_token_address(self, symbol: str, chain: str = 'mainnet'):
         """
-        Get token address for a given symbol and chain
+        Get token address for a given symbol and chain. Never calls the API: unknown pairs
+        return None and schedule a background refresh.
         """
-        symbol = symbol.upper()
+        address = self.tokens.resolve(symbol, chain)
+        if address:
+            logger.info(f"Found address for {symbol.upper()} on {chain}: {address}")
+        return address
 
-        if chain in self._token_mappings and symbol in self._token_mappings[chain]:
-            address = self._token_mappings[chain][symbol]
-            logger.info(f"Found address for {symbol} on {chain}: {address}")
-            return address
-        else:
-            # Try to refresh mappings from API if symbol not found
-            logger.info(f"Symbol '{symbol}' not found on {chain}, trying to refresh from API...")
-            self.build_token_mappings()
-
-            # Try again after refresh
-            if chain in self._token_mappings and symbol in self._token_mappings[chain]:
-                address = self._token_mappings[chain][symbol]
-                logger.info(f"Found address for {symbol} on {chain} after refresh: {address}")
-                return address
-            else:
-                logger.error(f"No address found for symbol '{symbol}' on chain '{chain}'")
-                logger.info(f"Available chains: {list(self._token_mappings.keys())}")
-                if chain in self._token_mappings:
-                    logger.info(f"Available symbols on {chain}: {list(self._token_mappings[chain].keys())}")
-                return None
+    @staticmethod
+    def _build_trade_payload(from_token: str, to_token: str, amount: str, reason: str = "Webhook trade execution"):
+        """
+        Build trade payload according to Recall API schema (shared by execute_trade and execute_trade_async)
+        """
+        return {
+            'fromToken': from_token,
+            'toToken': to_token,
+            'amount': amount,
+            'reason': reason,
+            # 'slippageTolerance': slippage_tolerance,
+            # 'fromChain': from_chain,
+            # 'fromSpecificChain': from_specific_chain,
+            # 'toChain': to_chain,
+            # 'toSpecificChain': to_specific_chain
+        }
 
     def execute_trade(self, from_token: str, to_token: str, amount: str, reason: str = "Webhook trade execution",
                      slippage_tolerance: str = "0.5", from_chain: str = "evm", from_specific_chain: str = "mainnet",
@@ -180,37 +425,17 @@ class RecallSpot(Action):
         try:
             logger.info(f"RecallSpot: execute_trade called with from_token={from_token}, to_token={to_token}, amount={amount}")
 
-            # Build trade payload according to Recall API schema
-            trade_payload = {
-                'fromToken': from_token,
-                'toToken': to_token,
-                'amount': amount,
-                'reason': reason,
-                # 'slippageTolerance': slippage_tolerance,
-                # 'fromChain': from_chain,
-                # 'fromSpecificChain': from_specific_chain,
-                # 'toChain': to_chain,
-                # 'toSpecificChain': to_specific_chain
-            }
+            trade_payload = self._build_trade_payload(from_token, to_token, amount, reason)
 
             endpoint = f"{self.config.base_url}/api/trade/execute"
             logger.info(f"RecallSpot: Trade payload: {trade_payload}")
             logger.info(f"RecallSpot: Making API call to {endpoint}")
 
-            # DEBUG: Let's manually make the request to see what's different
-            import requests
-            import json
-
-            headers = {
-                'Authorization': f'Bearer {self.config.api_key}',
-                'Content-Type': 'application/json'
-            }
-
-            logger.info(f"DEBUG: Headers being sent: {headers}")
-            logger.info(f"DEBUG: Raw JSON payload: {json.dumps(trade_payload)}")
-
-            # Make request manually for debugging
-            response = requests.post(endpoint, json=trade_payload, headers=headers, timeout=30)
+            response = self.authenticator.authenticated_request(
+                url=endpoint,
+                method='POST',
+                body=trade_payload
+            )
 
             logger.info(f"RecallSpot: API response status: {response.status_code}")
             logger.info(f"RecallSpot: API response headers: {dict(response.headers)}")
@@ -219,6 +444,7 @@ class RecallSpot(Action):
             response.raise_for_status()
             result = response.json()
             logger.info(f"Trade executed successfully: {result}")
+            self._traded()
             return result
 
         except Exception as e:
@@ -228,6 +454,52 @@ class RecallSpot(Action):
             traceback.print_exc()
             return None
 
+    async def get_portfolio_async(self):
+        """
+        Get portfolio information from Recall API (asyncio)
+        """
+        try:
+            response = await self.authenticator.authenticated_request_async(
+                url=f"{self.config.base_url}/api/agent/portfolio",
+                method='GET'
+            )
+            response.raise_for_status()
+            portfolio = response.json()
+            logger.info(f"Portfolio retrieved successfully")
+            return portfolio
+        except Exception as e:
+            logger.error(f"Error getting portfolio: {e}")
+            return None
+
+    async def execute_trade_async(self, from_token: str, to_token: str, amount: str,
+                                  reason: str = "Webhook trade execution"):
+        """
+        Execute a token swap trade on Recall (asyncio)
+
+        Args:
+            from_token: Source token contract address
+            to_token: Destination token contract address
+            amount: Amount to swap (in human units)
+            reason: Reason for the trade
+        """
+        try:
+            trade_payload = self._build_trade_payload(from_token, to_token, amount, reason)
+            logger.info(f"RecallSpot: Trade payload (async): {trade_payload}")
+
+            response = await self.authenticator.authenticated_request_async(
+                url=f"{self.config.base_url}/api/trade/execute",
+                method='POST',
+                body=trade_payload
+            )
+            response.raise_for_status()
+            result = response.json()
+            logger.info(f"Trade executed successfully: {result}")
+            self._traded()
+            return result
+        except Exception as e:
+            logger.error(f"Error executing trade: {e}")
+            return None
+
     def get_balance(self):
         """
         Get account balance (if supported by Recall API)
@@ -262,6 +534,83 @@ class RecallSpot(Action):
             logger.error(f"Error getting trade history: {e}")
             return None
 
+    async def get_balance_async(self):
+        """
+        Get account balance (asyncio). Same placeholder endpoint as get_balance.
+        """
+        try:
+            response = await self.authenticator.authenticated_request_async(
+                url=f"{self.config.base_url}/api/account/balance",
+                method='GET'
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Error getting balance: {e}")
+            return None
+
+    async def get_trade_history_async(self):
+        """
+        Get trade history (asyncio). Same placeholder endpoint as get_trade_history.
+        """
+        try:
+            response = await self.authenticator.authenticated_request_async(
+                url=f"{self.config.base_url}/api/account/trades",
+                method='GET'
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Error getting trade history: {e}")
+            return None
+
+    def _traded(self):
+        # the snapshot's balances are out of date until a refresh started after this trade lands
+        self.last_trade_at = time.time()
+        self._snapshot_task.wake()
+
+    def _swap_snapshot(self, portfolio, balances, trades, taken_at: float):
+        snapshot = RecallSnapshot(portfolio, balances, trades, previous=self.snapshot, taken_at=taken_at)
+        self.snapshot = snapshot
+        logger.info(f"RecallSpot: Snapshot refreshed for {len(snapshot.chains)} chains "
+                    f"(portfolio value {snapshot.value:.2f})")
+        return snapshot
+
+    def refresh_snapshot(self):
+        """
+        Fetch portfolio, balances and trade history concurrently and swap in a new snapshot
+        :return: RecallSnapshot()
+        """
+        taken_at = time.time()
+        futures = [self._snapshot_pool.submit(fetch)
+                   for fetch in (self.get_portfolio, self.get_balance, self.get_trade_history)]
+        return self._swap_snapshot(*(future.result() for future in futures), taken_at=taken_at)
+
+    async def refresh_snapshot_async(self):
+        """
+        Same as refresh_snapshot, for callers already running an event loop
+        """
+        taken_at = time.time()
+        results = await asyncio.gather(self.get_portfolio_async(), self.get_balance_async(),
+                                       self.get_trade_history_async())
+        return self._swap_snapshot(*results, taken_at=taken_at)
+
+    def size_from_snapshot(self, symbol: str, chain: str, percent: str) -> str:
+        """
+        Turns a percent-of-balance size into an amount using the latest snapshot (no API calls).
+        Refused until a snapshot taken after our last trade is in, so back-to-back signals
+        don't both size from the balance before the first one traded.
+        """
+        percent = Decimal(str(percent).rstrip('%'))
+        if not 0 < percent <= 100:
+            raise ValueError(f"Percent size must be in (0, 100], got {percent}")
+        if self.snapshot.taken_at <= self.last_trade_at:
+            raise ValueError("Portfolio snapshot predates the last trade, cannot size from balance until it refreshes")
+        available = self.snapshot.balance(symbol, chain)
+        if available is None:
+            raise ValueError(f"No balance for {symbol} on {chain} in the portfolio snapshot")
+        return format(Decimal(str(available)) * percent / 100, 'f')
+
     def run(self, *args, **kwargs):
         """
         Main run method called by the webhook system
@@ -269,7 +618,7 @@ class RecallSpot(Action):
             "side": "buy",  # "buy" or "sell"
             "base": "ETH",    # Symbol of token being bought/sold (e.g., "ETH", "BTC", "SOL")
             "quote": "USDC",  # Symbol of quote token (e.g., "USDC", "USDT")
-            "size": "1.5",    # Amount to trade
+            "size": "1.5",    # Amount to trade, or a percent of the token sold, e.g. "50%"
             "reason": "Optional reason for trade",
             "slippageTolerance": "0.5",  # Optional, defaults to 0.5%
             "fromChain": "evm",  # Optional, defaults to evm
@@ -325,11 +674,19 @@ class RecallSpot(Action):
                 logger.info(f"RecallSpot: OUT - {base_symbol}: {from_token}")
                 logger.info(f"RecallSpot: IN - {quote_symbol}: {to_token}")
 
-            # if not base_token_address:
-            #     raise ValueError(f"Could not find address for base token '{base_symbol}' on {from_specific_chain}")
+            # unknown symbols resolve to None (a refresh is scheduled), never send a trade without both tokens
+            if not from_token:
+                sold = quote_symbol if side == 'buy' else base_symbol
+                raise ValueError(f"Could not find address for token '{sold}' on {from_specific_chain}")
+
+            if not to_token:
+                bought = base_symbol if side == 'buy' else quote_symbol
+                raise ValueError(f"Could not find address for token '{bought}' on {to_specific_chain}")
 
-            # if not quote_token_address:
-            #     raise ValueError(f"Could not find address for quote token '{quote_symbol}' on {from_specific_chain}")
+            if str(amount).strip().endswith('%'):
+                sold = quote_symbol if side == 'buy' else base_symbol
+                amount = self.size_from_snapshot(sold, from_specific_chain, str(amount).strip())
+                logger.info(f"RecallSpot: Sized trade from snapshot: {amount} {sold}")
 
             logger.info("RecallSpot: Attempting to execute trade...")
             result = self.execute_trade(
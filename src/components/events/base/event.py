@@ -1,11 +1,18 @@
 # configure logging
+import threading
+from collections import deque
 from datetime import datetime
 from hashlib import md5
 from logging import getLogger, DEBUG
+from time import perf_counter
 
-from commons import LOG_LOCATION, UNIQUE_KEY
+from commons import LOG_LOCATION, UNIQUE_KEY, EVENT_LOG_CAPACITY
 from components.logs.log_event import LogEvent
+from components.schemas.base.schema import SchemaError
 from utils.log import get_logger
+from utils.registry_cache import registry_version
+from utils.risk import RiskRejected, get_risk_engine
+from utils.routing import RoutingIndex
 
 logger = get_logger(__name__)
 
@@ -13,12 +20,49 @@ logger = get_logger(__name__)
 class EventManager:
     def __init__(self):
         self._events = []
+        self._by_name = {}
+        # event tables (see components.events.base.table), whose events are loaded on first use
+        self._tables = []
+        self._lock = threading.Lock()
+
+    def add(self, event):
+        self._events.append(event)
+        # the first event registered under a name wins, as with a linear search
+        self._by_name.setdefault(event.name, event)
+        registry_version.bump()
+
+    def add_table(self, table):
+        self._tables.append(table)
+
+    def _load(self, event_name: str):
+        if not self._tables:
+            return None
+        with self._lock:
+            event = self._by_name.get(event_name)
+            if event is not None:
+                return event
+            for table in self._tables:
+                event = table.load(event_name)
+                if event is not None:
+                    self.add(event)
+                    return event
+
+    def get_loaded(self):
+        """
+        Gets the events registered or loaded from event tables so far
+        :return: list of Event()
+        """
+        return self._events
 
     def get_all(self):
         """
-        Gets all events from manager
+        Gets all events from manager, loading every event of the event tables
         :return: list of Event()
         """
+        for table in self._tables:
+            for name in table.names():
+                if name not in self._by_name:
+                    self._load(name)
         return self._events
 
     def get(self, event_name: str):
@@ -27,35 +71,81 @@ class EventManager:
         :param event_name: name of event
         :return: Event()
         """
-        for event in self._events:
-            if event.name == event_name:
-                return event
+        event = self._by_name.get(event_name) or self._load(event_name)
+        if event is not None:
+            return event
 
         raise ValueError(f'Cannot find event with name {event_name}')
 
+    def find(self, key) -> list:
+        """
+        Gets the events a webhook key belongs to, without scanning every event
+        :param key: webhook key ("<event name>:<hash>")
+        :return: list of Event()
+        """
+        if not isinstance(key, str):
+            return []
+        name = key.rpartition(':')[0]
+        event = self._by_name.get(name) or self._load(name)
+        return [event] if event is not None and event.key == key else []
+
 
 em = EventManager()
 
 
 class Event:
+    __slots__ = ('name', '_active', 'webhook', 'key', '_actions', 'routes', '_logs')
+
     objects = em
+    # Schema every payload must match before any linked action runs (None accepts anything)
+    schema = None
 
-    def __init__(self):
-        self.name = self.get_name()
-        self.active = True
+    def __init__(self, name: str = None):
+        self.name = name or self.get_name()
+        self._active = True
         self.webhook = True  # all events are webhooks by default
         self.key = f'{self.name}:{md5(f"{self.name + UNIQUE_KEY}".encode()).hexdigest()[:6]}'
         self._actions = []
-        self.logs = [LogEvent().from_line(line) for line in open(LOG_LOCATION, 'r') if line.split(',')[0] == self.name]
+        # routing rules of the linked actions, see utils.routing
+        self.routes = RoutingIndex()
+        self._logs = None
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @active.setter
+    def active(self, active: bool):
+        if active != self._active:
+            self._active = active
+            registry_version.bump()
+
+    @property
+    def logs(self):
+        # history is read from the log file on first use, not for every event at startup
+        if self._logs is None:
+            self._logs = deque(
+                (LogEvent().from_line(line) for line in open(LOG_LOCATION, 'r') if line.split(',')[0] == self.name),
+                maxlen=EVENT_LOG_CAPACITY
+            )
+        return self._logs
 
     def get_name(self):
         return type(self).__name__
 
-    def add_action(self, action):
-        self._actions.append(action)
+    def add_action(self, action, rule: str = None):
+        """
+        Links an action to the event
+        :param rule: routing rule on payload fields (e.g. "symbol in {EURUSD, GBPUSD}"), None runs it for every payload
+        :raises RouteError: if the rule can't be parsed
+        """
+        self.routes.add(action, rule)
+        if action not in self._actions:
+            self._actions.append(action)
+        registry_version.bump()
 
     def register(self):
-        self.objects._events.append(self)
+        self.objects.add(self)
 
     def __str__(self):
         return f'{self.name}'
@@ -68,23 +158,66 @@ class Event:
         Will implement checking here eventually (tm)
         :param action: Action() to register
         """
-        self._actions.append(action)
+        self.add_action(action)
+
+    def validate(self, data):
+        """
+        Validates a payload against the event's schema, then routes it and checks it against
+        the schema of each action whose rule matches
+        :return: list of (action, normalized data) for the actions that accept it
+        :raises SchemaError: if the event's schema rejects it, or every routed action's does
+        """
+        if data is None:
+            return [(action, data) for action in self._actions]
+        if self.schema is not None:
+            data = self.schema.validate(data)
+
+        accepted, rejected = [], []
+        for action in self.routes.match(data):
+            try:
+                accepted.append((action, action.schema.validate(data) if action.schema is not None else data))
+            except SchemaError as e:
+                rejected.append((action, e))
+        if rejected and not accepted:
+            raise SchemaError([str(e) for _, e in rejected], self.name)
+        for action, error in rejected:
+            action.record_rejection(error)
+        return accepted
 
     def trigger(self, *args, **kwargs):
         if self.active:
+            # pass data, checked against the schemas before anything runs
+            data = kwargs.get('data')
+            prepared = self.validate(data)
+
             logger.info(f'EVENT TRIGGERED --->\t{str(self)}')
             log_event = LogEvent(self.name, 'triggered', datetime.now(), f'{self.name} was triggered')
             log_event.write()
-
-            # pass data
-            data = kwargs.get('data')
             logger.info(f"DEBUG: Event {self.name} has {len(self._actions)} actions registered")
 
             self.logs.append(log_event)
-            for i, action in enumerate(self._actions):
+            risk = get_risk_engine()
+            strategy = (data or {}).get('strategy') or self.name
+            for i, (action, action_data) in enumerate(prepared):
                 logger.info(f"DEBUG: Triggering action {i}: {action} (type: {type(action)})")
-                action.set_data(data)
-                action.run()
+                action.set_data(action_data)
+
+                # pre-trade risk: a rejected order never reaches the exchange
+                intent = action.order_intent(action_data, strategy) if action_data else None
+                if intent is not None:
+                    try:
+                        risk.check(intent)
+                    except RiskRejected as e:
+                        action.record_rejection(e)
+                        continue
+
+                start = perf_counter()
+                try:
+                    action.run()
+                except Exception as e:
+                    action.record_run(perf_counter() - start, e)
+                    raise
+                action.record_run(perf_counter() - start)
                 logger.info(f"DEBUG: Completed action {i}: {action}")
         else:
             logger.info(f'EVENT NOT TRIGGERED (event is inactive) --->\t{str(self)}')
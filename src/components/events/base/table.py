@@ -0,0 +1,188 @@
+import csv
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from components.events.base.event import Event
+from utils.log import get_logger
+from utils.routing import RoutingIndex
+
+logger = get_logger(__name__)
+
+# columns of an event table; only name is required
+COLUMNS = ('name', 'actions', 'rule', 'active')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+class EventTableConfig:
+    """Data-driven events"""
+
+    def __init__(self):
+        # CSV file or SQLite database (table "events") with one row per event (unset disables)
+        self.path = os.getenv('EVENTS_TABLE')
+
+    def __str__(self):
+        return f"EventTableConfig(path={self.path})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class TableEvent(Event):
+    """
+    An event defined by a row of an event table instead of a subclass. Events with the same
+    actions and rule share one action list and routing index, copied the first time one of
+    them is linked to anything else.
+    """
+
+    __slots__ = ('_shared',)
+
+    def __init__(self, name: str, actions: list, routes: RoutingIndex, active: bool = True):
+        super().__init__(name)
+        self._actions = actions
+        self.routes = routes
+        self._active = active
+        self._shared = True
+
+    def add_action(self, action, rule: str = None):
+        if self._shared:
+            routes = RoutingIndex()
+            for target, target_rule in self.routes.rules():
+                routes.add(target, target_rule)
+            self._actions, self.routes, self._shared = list(self._actions), routes, False
+        super().add_action(action, rule)
+
+
+class EventTable:
+    """
+    Rows of events, turned into TableEvent()s one at a time when the event manager first asks
+    for them (a webhook with their key, the dashboard, ...).
+    :param action_manager: resolves the action names of each row
+    """
+
+    def __init__(self, action_manager):
+        self.action_manager = action_manager
+        # (actions, rule) -> (action list, routing index) shared by every event with those links
+        self._links: Dict[Tuple[str, str], Tuple[list, RoutingIndex]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def names(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def row(self, name: str) -> Optional[Tuple[str, str, bool]]:
+        """
+        :return: (actions, rule, active), or None if the table has no such event
+        """
+        raise NotImplementedError
+
+    def _shared_links(self, actions: str, rule: str) -> Tuple[list, RoutingIndex]:
+        links = self._links.get((actions, rule))
+        if links is None:
+            linked, routes = [], RoutingIndex()
+            for action_name in actions.replace(';', ' ').split():
+                try:
+                    action = self.action_manager.get(action_name)
+                except ValueError:
+                    logger.warning(f'Event table links unregistered action {action_name}, skipped')
+                    continue
+                routes.add(action, rule or None)
+                linked.append(action)
+            links = self._links[(actions, rule)] = (linked, routes)
+        return links
+
+    def load(self, name: str) -> Optional[TableEvent]:
+        row = self.row(name) if name else None
+        if row is None:
+            return None
+        actions, rule, active = row
+        with self._lock:
+            linked, routes = self._shared_links(actions, rule)
+        return TableEvent(name, linked, routes, active)
+
+
+def _active(value) -> bool:
+    return str(value).strip().lower() not in FALSE_VALUES if value not in (None, '') else True
+
+
+class CsvEventTable(EventTable):
+    """
+    A CSV file with a header of name[,actions][,rule][,active]; actions are separated by ";".
+    Rows are read once and kept as (name -> shared links tuple), about one dict entry per event.
+    """
+
+    def __init__(self, path: str, action_manager):
+        super().__init__(action_manager)
+        self.path = path
+        self._rows: Dict[str, Tuple[str, str]] = {}
+        self._inactive = set()
+        specs = {}
+        with open(path, 'r', newline='') as table:
+            for number, record in enumerate(csv.DictReader(table), 2):
+                name = (record.get('name') or '').strip()
+                if not name or ',' in name:
+                    logger.warning(f'{path}:{number}: invalid event name {name!r}, skipped')
+                    continue
+                spec = ((record.get('actions') or '').strip(), (record.get('rule') or '').strip())
+                # rows with the same links point at one tuple
+                self._rows[name] = specs.setdefault(spec, spec)
+                if not _active(record.get('active')):
+                    self._inactive.add(name)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def names(self):
+        return iter(list(self._rows))
+
+    def row(self, name):
+        spec = self._rows.get(name)
+        if spec is None:
+            return None
+        return spec[0], spec[1], name not in self._inactive
+
+
+class SqliteEventTable(EventTable):
+    """
+    A SQLite database with an "events" table (name primary key, actions, rule, active).
+    Nothing is read at startup; each event is one indexed query the first time it's used.
+    """
+
+    def __init__(self, path: str, action_manager):
+        super().__init__(action_manager)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(events)')}
+        if 'name' not in columns:
+            raise ValueError(f'{path} has no events table with a name column')
+        self._select = ', '.join(column if column in columns else 'NULL' for column in COLUMNS[1:])
+
+    def __len__(self):
+        with self._db_lock:
+            return self._db.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+    def names(self):
+        with self._db_lock:
+            return iter([row[0] for row in self._db.execute('SELECT name FROM events ORDER BY rowid')])
+
+    def row(self, name):
+        with self._db_lock:
+            row = self._db.execute(f'SELECT {self._select} FROM events WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            return None
+        actions, rule, active = row
+        return (actions or '').strip(), (rule or '').strip(), _active(active)
+
+
+def open_event_table(path: str, action_manager) -> EventTable:
+    """
+    Opens a CSV (.csv) or SQLite (anything else) event table
+    :return: EventTable()
+    """
+    if path.lower().endswith('.csv'):
+        return CsvEventTable(path, action_manager)
+    return SqliteEventTable(path, action_manager)
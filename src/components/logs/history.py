@@ -0,0 +1,66 @@
+import time
+from collections import deque
+from datetime import datetime
+
+
+class RunStats:
+    """
+    Rolling run aggregates for an action. Every update is O(1) (amortized for the window max),
+    so stats can be kept for the lifetime of a worker without growing.
+    """
+
+    __slots__ = ('window', 'count', 'error_count', 'last_run', 'last_error', '_latencies', '_latency_sum', '_max_queue')
+
+    def __init__(self, window: int = 100):
+        self.window = window
+        self.count = 0
+        self.error_count = 0
+        self.last_run = None
+        self.last_error = None
+        self._latencies = deque()
+        self._latency_sum = 0.0
+        # monotonic (decreasing) queue of latencies, the window max is always at the front
+        self._max_queue = deque()
+
+    def record(self, latency: float, error: Exception = None):
+        """
+        Records a single run
+        :param latency: run time in seconds
+        :param error: exception raised by the run, if any
+        """
+        self.count += 1
+        self.last_run = time.time()
+        if error is not None:
+            self.error_count += 1
+            self.last_error = str(error)
+
+        self._latencies.append(latency)
+        self._latency_sum += latency
+        if len(self._latencies) > self.window:
+            expired = self._latencies.popleft()
+            self._latency_sum -= expired
+            if self._max_queue[0] == expired:
+                self._max_queue.popleft()
+
+        while self._max_queue and self._max_queue[-1] < latency:
+            self._max_queue.pop()
+        self._max_queue.append(latency)
+
+    @property
+    def latency_mean(self) -> float:
+        return self._latency_sum / len(self._latencies) if self._latencies else 0.0
+
+    @property
+    def latency_max(self) -> float:
+        return self._max_queue[0] if self._max_queue else 0.0
+
+    def as_json(self):
+        return {
+            'count': self.count,
+            'error_count': self.error_count,
+            'last_run': datetime.fromtimestamp(self.last_run).strftime("%Y-%m-%d %H:%M:%S") if self.last_run else None,
+            'last_error': self.last_error,
+            'window': len(self._latencies),
+            'latency_mean_ms': round(self.latency_mean * 1000, 3),
+            'latency_max_ms': round(self.latency_max * 1000, 3),
+        }
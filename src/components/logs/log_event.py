@@ -1,17 +1,55 @@
+import time
 from datetime import datetime
 
 from commons import LOG_LOCATION, LOG_LIMIT
 
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_epoch_us(event_time) -> int:
+    """
+    Converts a datetime, epoch-microsecond int or formatted time string to epoch microseconds
+    :param event_time: datetime, int or str
+    :return: int
+    """
+    if isinstance(event_time, int):
+        return event_time
+    if isinstance(event_time, datetime):
+        return int(event_time.timestamp()) * 1_000_000 + event_time.microsecond
+    event_time = event_time.strip()
+    if event_time.isdigit():
+        return int(event_time)
+    # legacy log lines store the formatted time string
+    return to_epoch_us(datetime.strptime(event_time, TIME_FORMAT))
+
 
 class LogEvent:
+    __slots__ = ('parent', 'event_type', 'timestamp_us', 'event_data', '_event_dt')
+
     def __init__(self, parent=None, event_type=None, event_time=None, event_data=None):
         self.parent = parent
         self.event_type = event_type
-        self.event_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.timestamp_us = time.time_ns() // 1000 if event_time is None else to_epoch_us(event_time)
         self.event_data = event_data.replace(',', ' ') if event_data else None
+        self._event_dt = None
 
     def __str__(self):
-        return "Event Type: " + self.event_type + " Event Time: " + self.event_time + " Event Data: " + self.event_data
+        return "Event Type: " + self.event_type + " Event Time: " + self.format_time() + " Event Data: " + self.event_data
+
+    @property
+    def event_time(self) -> datetime:
+        # datetime objects are only built (and then cached) when something asks for them
+        if self._event_dt is None:
+            self._event_dt = datetime.fromtimestamp(self.timestamp_us / 1_000_000)
+        return self._event_dt
+
+    @event_time.setter
+    def event_time(self, event_time):
+        self.timestamp_us = to_epoch_us(event_time)
+        self._event_dt = None
+
+    def format_time(self) -> str:
+        return self.event_time.strftime(TIME_FORMAT)
 
     def get_event_type(self):
         return self.event_type
@@ -32,19 +70,19 @@ class LogEvent:
         self.event_data = event_data
 
     def to_line(self):
-        return self.parent + "," + self.event_type + "," + self.event_time + "," + self.event_data + "\n"
+        return self.parent + "," + self.event_type + "," + str(self.timestamp_us) + "," + self.event_data + "\n"
 
     def as_json(self):
         return {
             "parent": self.parent,
             "event_type": self.event_type,
-            "event_time": self.event_time,
+            "event_time": self.format_time(),
             "event_data": self.event_data.strip()
         }
 
     def from_line(self, line):
-        self.parent, self.event_type, self.event_time, self.event_data = line.split(',')
-        self.event_time = datetime.strptime(self.event_time, "%Y-%m-%d %H:%M:%S")
+        self.parent, self.event_type, event_time, self.event_data = line.split(',', 3)
+        self.event_time = event_time
         return self
 
     def write(self):
@@ -55,4 +93,4 @@ class LogEvent:
         else:
             log_file = open(LOG_LOCATION, 'a')
         log_file.write(self.to_line())
-        log_file.close()
\ No newline at end of file
+        log_file.close()
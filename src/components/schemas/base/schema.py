@@ -1,7 +1,195 @@
+import json
+from typing import Callable, Dict, List
+
+MISSING = object()
+
+
+class SchemaError(ValueError):
+    """Raised when a payload doesn't match a schema; `errors` lists every problem found"""
+
+    def __init__(self, errors: List[str], schema: str = None):
+        self.errors = errors
+        self.schema = schema
+        super().__init__(f"{schema + ': ' if schema else ''}{'; '.join(errors)}")
+
+
+def to_str(value) -> str:
+    return str(value).strip()
+
+
+def to_float(value) -> float:
+    # TradingView sends numbers as strings ("0.10", " 1.2e-3 ")
+    if isinstance(value, bool):
+        raise ValueError(value)
+    number = float(value.strip() if isinstance(value, str) else value)
+    if number != number or number in (float('inf'), float('-inf')):
+        raise ValueError(value)
+    return number
+
+
+def to_int(value) -> int:
+    number = to_float(value)
+    if not number.is_integer():
+        raise ValueError(value)
+    return int(number)
+
+
+def to_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'on'):
+        return True
+    if text in ('false', '0', 'no', 'off'):
+        return False
+    raise ValueError(value)
+
+
+def to_amount(value):
+    """A number, or a percent string such as "25%" (kept as a normalized string)"""
+    if isinstance(value, str) and value.strip().endswith('%'):
+        percent = to_float(value.strip()[:-1])
+        if not 0 < percent <= 100:
+            raise ValueError(value)
+        return f'{percent:g}%'
+    return to_float(value)
+
+
+COERCERS = {str: to_str, float: to_float, int: to_int, bool: to_bool}
+TYPE_NAMES = {to_str: 'string', to_float: 'number', to_int: 'integer', to_bool: 'boolean', to_amount: 'amount'}
+
+
+class Field:
+    """
+    A declared payload field.
+    :param type: str, float, int, bool or a coercion function (e.g. to_amount)
+    :param required: reject payloads without it (missing, null or "")
+    :param default: value used when it is missing
+    :param choices: allowed values, compared after coercion and case folding
+    :param aliases: other payload keys accepted for it, tried in order
+    :param case: 'lower' or 'upper' to fold strings
+    :param minimum: smallest allowed value (exclusive if `exclusive`)
+    :param example: value shown in the dashboard's example JSON
+    """
+
+    def __init__(self, type=str, required: bool = False, default=MISSING, choices=None, aliases=(),
+                 case: str = None, minimum: float = None, exclusive: bool = False, example=MISSING):
+        self.type = type
+        self.required = required
+        self.default = default
+        self.choices = choices
+        self.aliases = tuple(aliases)
+        self.case = case
+        self.minimum = minimum
+        self.exclusive = exclusive
+        self.example = example
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def compile(self) -> Callable:
+        """
+        Specializes this field into a function(data, out, errors); every option is resolved here, once
+        """
+        name, keys = self.name, (self.name,) + self.aliases
+        required, default = self.required, self.default
+        coerce = COERCERS.get(self.type, self.type)
+        type_name = TYPE_NAMES.get(coerce, getattr(self.type, '__name__', 'value'))
+        fold = {'lower': str.lower, 'upper': str.upper}.get(self.case)
+        choices = frozenset(self.choices) if self.choices else None
+        minimum, exclusive = self.minimum, self.exclusive
+
+        def validate(data: dict, out: dict, errors: list):
+            for key in keys:
+                raw = data.get(key)
+                if raw is not None and raw != '':
+                    break
+            else:
+                if required:
+                    errors.append(f'{name} is required')
+                elif default is not MISSING:
+                    out[name] = default
+                else:
+                    # an empty value ("" or null) is the same as leaving the field out
+                    out.pop(name, None)
+                return
+            try:
+                value = coerce(raw)
+            except (TypeError, ValueError):
+                errors.append(f'{name} must be a {type_name}, got {raw!r}')
+                return
+            if fold is not None and isinstance(value, str):
+                value = fold(value)
+            if choices is not None and value not in choices:
+                errors.append(f'{name} must be one of {sorted(choices)}, got {raw!r}')
+                return
+            if minimum is not None and isinstance(value, (int, float)) and (
+                    value <= minimum if exclusive else value < minimum):
+                errors.append(f"{name} must be {'>' if exclusive else '>='} {minimum}, got {raw!r}")
+                return
+            out[name] = value
+
+        return validate
+
 
 class Schema:
+    """
+    A declarative payload schema: fields are class attributes (Field), inherited from parent
+    schemas. The first validate() compiles the fields into one list of specialized functions,
+    kept on the class. Validated payloads keep their undeclared keys (e.g. the webhook key),
+    with declared fields replaced by their coerced values.
+
+    Override `clean` for rules across fields.
+    """
+
     def __init__(self):
         pass
 
+    @classmethod
+    def fields(cls) -> Dict[str, Field]:
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Field):
+                    fields[name] = value
+        return fields
+
+    @classmethod
+    def compile(cls):
+        cls._compiled = tuple(field.compile() for field in cls.fields().values())
+        return cls._compiled
+
+    @classmethod
+    def validate(cls, data) -> dict:
+        """
+        :return: normalized copy of the payload
+        :raises SchemaError: listing every invalid field
+        """
+        if not isinstance(data, dict):
+            raise SchemaError([f'payload must be a JSON object, got {type(data).__name__}'], cls.__name__)
+        validators = cls.__dict__.get('_compiled') or cls.compile()
+        out = dict(data)
+        errors = []
+        for validate in validators:
+            validate(data, out, errors)
+        if not errors:
+            cls.clean(out, errors)
+        if errors:
+            raise SchemaError(errors, cls.__name__)
+        return out
+
+    @classmethod
+    def clean(cls, data: dict, errors: list):
+        """Checks rules spanning several fields, appending messages to `errors`"""
+
     def as_json(self):
-        raise NotImplementedError
\ No newline at end of file
+        """
+        Example payload, from each field's example (or default)
+        """
+        example = {}
+        for name, field in self.fields().items():
+            value = field.example if field.example is not MISSING else field.default
+            if value is not MISSING:
+                example[name] = value
+        return json.dumps(example)
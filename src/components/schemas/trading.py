@@ -1,42 +1,56 @@
-import json
+from components.schemas.base.schema import Field, Schema, to_amount
 
-from components.schemas.base.schema import Schema
+SIDES = ('buy', 'sell')
+ORDER_TYPES = ('market', 'limit', 'stop')
 
 
 class Order(Schema):
-    def __init__(self):
-        super().__init__()
-        self.order_type: str = 'market'
-        self.side: str = 'buy'
-        self.quantity: float = 0.0
-        self.symbol: str = 'XBTUSD'
-        self.price: float = 0.0
-
-    def as_json(self):
-        as_dict = {
-            'order_type': self.order_type,
-            'side': self.side,
-            'quantity': self.quantity,
-            'symbol': self.symbol,
-            'price': self.price
-        }
-        return json.dumps(as_dict)
+    order_type = Field(str, default='market', choices=ORDER_TYPES, case='lower')
+    side = Field(str, required=True, choices=SIDES, case='lower', example='buy')
+    quantity = Field(float, required=True, minimum=0, exclusive=True, example=0.01)
+    symbol = Field(str, required=True, case='upper', example='XBTUSD')
+    price = Field(float, minimum=0, example=65000.0)
+
+    @classmethod
+    def clean(cls, data, errors):
+        if data['order_type'] != 'market' and not data.get('price'):
+            errors.append(f"price is required for {data['order_type']} orders")
+
 
 class Position(Schema):
-    def __init__(self):
-        super().__init__()
-        self.symbol: str = 'XBTUSD'
-        self.quantity: float = 0.0
-        self.entry_price: float = 0.0
-        self.take_profit: float = 0.0
-        self.take_loss: float = 0.0
-
-    def as_json(self):
-        as_dict = {
-            'symbol': self.symbol,
-            'quantity': self.quantity,
-            'entry_price': self.entry_price,
-            'take_profit': self.take_profit,
-            'take_loss': self.take_loss
-        }
-        return json.dumps(as_dict)
+    symbol = Field(str, required=True, case='upper', example='XBTUSD')
+    quantity = Field(float, required=True, example=0.01)
+    entry_price = Field(float, minimum=0, example=65000.0)
+    take_profit = Field(float, minimum=0, example=70000.0)
+    take_loss = Field(float, minimum=0, example=60000.0)
+
+
+class BitsoOrder(Schema):
+    """BitsoSpot payload: a market order sized in major currency or as a percent of the balance, or a cancel"""
+    side = Field(str, required=True, choices=SIDES + ('cancel',), case='lower', example='buy')
+    size = Field(to_amount, minimum=0, exclusive=True, example='0.001')
+    book = Field(str, default='btc_mxn', case='lower')
+
+    @classmethod
+    def clean(cls, data, errors):
+        if data['side'] != 'cancel' and 'size' not in data:
+            errors.append('size is required for buy and sell orders')
+
+
+class MT5Order(Schema):
+    """MT5Demo payload: an order, a position close or an account/positions query"""
+    action = Field(str, required=True, choices=SIDES + ('close', 'info', 'positions'), case='lower', example='buy')
+    symbol = Field(str, default='EURUSD', case='upper')
+    volume = Field(float, default=0.01, minimum=0, exclusive=True, example=0.1)
+    order_type = Field(str, default='market', choices=ORDER_TYPES, case='lower')
+    price = Field(float, minimum=0)
+    stop_loss = Field(float, minimum=0)
+    take_profit = Field(float, minimum=0)
+    ticket = Field(int, minimum=1)
+
+    @classmethod
+    def clean(cls, data, errors):
+        if data['action'] == 'close' and 'ticket' not in data:
+            errors.append('ticket is required to close a position')
+        elif data['action'] in SIDES and data['order_type'] != 'market' and 'price' not in data:
+            errors.append(f"price is required for {data['order_type']} orders")
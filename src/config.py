@@ -18,6 +18,13 @@ class BitsoConfig:
         else:
             self.base_url = os.getenv('BITSO_STAGE_BASE_URL', 'https://stage.bitso.com/api')
 
+        # how often (seconds) available_books metadata is refreshed in the background (0 disables)
+        self.markets_refresh_interval = float(os.getenv('BITSO_MARKETS_REFRESH', '300'))
+        # how often (seconds) cached balances are reconciled with /v3/balance (0 disables)
+        self.balance_reconcile_interval = float(os.getenv('BITSO_BALANCE_RECONCILE', '60'))
+        # how often (seconds) open orders on every book are polled into the local index (0 disables)
+        self.open_orders_poll_interval = float(os.getenv('BITSO_OPEN_ORDERS_POLL', '10'))
+
         # Validate required credentials
         if not self.api_key or not self.api_secret:
             raise ValueError(
@@ -45,6 +52,16 @@ class RecallConfig:
         else:
             self.base_url = os.getenv('RECALL_SANDBOX_BASE_URL', 'https://api.sandbox.competitions.recall.network')
 
+        # token symbol -> address mappings, cached on disk and shared by all workers
+        self.token_cache_file = os.getenv('RECALL_TOKEN_CACHE', '.recall_tokens.json')
+        # how often (seconds) mappings are refreshed from the portfolio (0 disables)
+        self.token_refresh_interval = float(os.getenv('RECALL_TOKEN_REFRESH', '3600'))
+        # how long (seconds) an unknown symbol is remembered as unknown
+        self.token_negative_ttl = float(os.getenv('RECALL_TOKEN_NEGATIVE_TTL', '300'))
+        # how often (seconds) the portfolio / balance / trade history snapshot is polled (0 disables);
+        # our own trades refresh it right away, the poll only catches changes made elsewhere
+        self.snapshot_refresh_interval = float(os.getenv('RECALL_SNAPSHOT_REFRESH', '900'))
+
         # Validate required credentials
         if not self.api_key:
             raise ValueError(
@@ -68,6 +85,19 @@ class MT5Config:
         self.password = os.getenv('MT5_PASSWORD')
         self.server = os.getenv('MT5_SERVER', 'MetaQuotes-Demo')  # Demo server
         self.environment = os.getenv('MT5_ENVIRONMENT', 'demo')
+        # seconds between revaluing open positions at fresh quotes (0 disables)
+        self.mark_interval = float(os.getenv('MT5_MARK_INTERVAL', '5'))
+
+        # Mt5DemoMock simulation: replay a CSV/Parquet price feed instead of fixed quotes
+        self.sim_feed = os.getenv('MT5_SIM_FEED')
+        # symbol of a feed without a symbol column
+        self.sim_symbol = os.getenv('MT5_SIM_SYMBOL', 'EURUSD')
+        # fills move this many points against the order
+        self.sim_slippage = float(os.getenv('MT5_SIM_SLIPPAGE', '0'))
+        # simulated seconds between sending an order and its fill
+        self.sim_latency = float(os.getenv('MT5_SIM_LATENCY', '0'))
+        # spread in points for bar feeds without a spread column
+        self.sim_spread = float(os.getenv('MT5_SIM_SPREAD', '0'))
 
         # Validate required credentials
         if not login_str:
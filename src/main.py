@@ -1,4 +1,6 @@
 # initialize our Flask application
+import hmac
+import json
 from logging import getLogger, DEBUG
 
 from flask import Flask, request, jsonify, render_template, Response
@@ -7,10 +9,18 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 from commons import VERSION_NUMBER, LOG_LOCATION
 from components.actions.base.action import am
 from components.events.base.event import em
+from components.events.base.table import EventTableConfig
 from components.logs.log_event import LogEvent
-from components.schemas.trading import Order, Position
+from components.schemas.base.schema import SchemaError
+from components.schemas.trading import BitsoOrder, MT5Order, Order, Position
 from utils.log import get_logger
-from utils.register import register_action, register_event, register_link
+from utils.pnl_engine import get_pnl_engine
+from utils.registry_cache import VersionedCache
+from utils.resilience import get_resilience
+from utils.risk import get_risk_engine
+from utils.signal_analytics import get_signal_analytics
+from utils.register import register_action, register_event, register_event_table, register_link
+from utils.replay import PayloadRecorder, ReplayConfig
 
 # register actions, events, links
 from settings import REGISTERED_ACTIONS, REGISTERED_EVENTS, REGISTERED_LINKS
@@ -19,6 +29,10 @@ registered_actions = [register_action(action) for action in REGISTERED_ACTIONS]
 registered_events = [register_event(event) for event in REGISTERED_EVENTS]
 registered_links = [register_link(link, em, am) for link in REGISTERED_LINKS]
 
+# data-driven events, one table row per event instead of a module each
+event_table_config = EventTableConfig()
+event_table = register_event_table(event_table_config.path, em, am) if event_table_config.path else None
+
 app = Flask(__name__)
 
 # Configure Flask to work behind a reverse proxy
@@ -29,39 +43,103 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
 # configure logging
 logger = get_logger(__name__)
 
+# optional NDJSON recording of received payloads, replayed with `tvwb replay`
+replay_config = ReplayConfig()
+recorder = PayloadRecorder(replay_config.record_file) if replay_config.record_file else None
+
 schema_list = {
     'order': Order().as_json(),
-    'position': Position().as_json()
+    'position': Position().as_json(),
+    'bitso_order': BitsoOrder().as_json(),
+    'mt5_order': MT5Order().as_json()
 }
 
 
+def load_gui_key():
+    """
+    Reads the GUI key once; tvwb.py writes it before the server starts, in closed GUI mode only
+    :return: str, or None in open GUI mode
+    """
+    try:
+        with open('.gui_key', 'r') as key_file:
+            return key_file.read().strip()
+    # if gui key file does not exist, the tvwb.py did not start gui in closed mode
+    except FileNotFoundError:
+        logger.warning('GUI key file not found. Open GUI mode detected.')
+        return None
+
+
+gui_key = load_gui_key()
+
+# dashboard and registry views, rebuilt only when an action/event/link/activation changes
+registry_views = VersionedCache()
+
+
+def gui_access_allowed() -> bool:
+    if gui_key is None:
+        return True
+    # constant-time comparison, the key is the only thing guarding the dashboard
+    return hmac.compare_digest(gui_key.encode(), request.args.get('guiKey', '').encode())
+
+
+def cached_response(body, etag: str, mimetype: str):
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    # browsers revalidate every time and get a 304 until the registry changes
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+def render_dashboard():
+    # action stats and positions change on every run, the page loads them from /metrics
+    return render_template(
+        template_name_or_list='dashboard.html',
+        schema_list=schema_list,
+        action_list=am.get_all(),
+        event_list=em.get_loaded(),
+        version=VERSION_NUMBER
+    )
+
+
+def registry_json():
+    return json.dumps({
+        'actions': [
+            {'name': action.name, 'schema': action.schema.__name__ if action.schema else None}
+            for action in am.get_all()
+        ],
+        'events': [
+            {
+                'name': event.name,
+                'key': event.key,
+                'active': event.active,
+                'webhook': event.webhook,
+                'links': [{'action': action.name, 'rule': rule} for action, rule in event.routes.rules()],
+            }
+            for event in em.get_loaded()
+        ],
+        'schemas': {name: json.loads(example) for name, example in schema_list.items()},
+    })
+
+
 @app.route("/", methods=["GET"])
 def dashboard():
     if request.method == 'GET':
-
-        # check if gui key file exists
-        try:
-            with open('.gui_key', 'r') as key_file:
-                gui_key = key_file.read().strip()
-                # check that the gui key from file matches the gui key from request
-                if gui_key == request.args.get('guiKey', None):
-                    pass
-                else:
-                    return 'Access Denied', 401
-
-        # if gui key file does not exist, the tvwb.py did not start gui in closed mode
-        except FileNotFoundError:
-            logger.warning('GUI key file not found. Open GUI mode detected.')
+        if not gui_access_allowed():
+            return 'Access Denied', 401
 
         # serve the dashboard
-        action_list = am.get_all()
-        return render_template(
-            template_name_or_list='dashboard.html',
-            schema_list=schema_list,
-            action_list=action_list,
-            event_list=registered_events,
-            version=VERSION_NUMBER
-        )
+        body, etag = registry_views.get('dashboard', render_dashboard)
+        return cached_response(body, etag, 'text/html')
+
+
+@app.route("/registry", methods=["GET"])
+def get_registry():
+    if request.method == 'GET':
+        # event keys are secrets, same access as the dashboard
+        if not gui_access_allowed():
+            return 'Access Denied', 401
+        body, etag = registry_views.get('registry', registry_json)
+        return cached_response(body, etag, 'application/json')
 
 
 @app.route("/webhook", methods=["POST"])
@@ -75,13 +153,24 @@ async def webhook():
             return 'Error getting JSON data from request', 400
 
         logger.info(f'Request Data: {data}')
+        if recorder is not None:
+            recorder.write(data)
         triggered_events = []
-        for event in em.get_all():
+        rejections = []
+        # events are looked up by key, not scanned (there can be thousands of table events)
+        for event in em.find(data['key']):
             if event.webhook:
-                if event.key == data['key']:
+                try:
                     event.trigger(data=data)
-                    triggered_events.append(event.name)
-
+                except SchemaError as e:
+                    # malformed payload, rejected before any action ran
+                    logger.warning(f'Payload rejected by {event.name}: {e}')
+                    rejections.append(str(e))
+                    continue
+                triggered_events.append(event.name)
+
+        if rejections and not triggered_events:
+            return jsonify({'errors': rejections}), 400
         if not triggered_events:
             logger.warning(f'No events triggered for webhook request {request.get_json()}')
         else:
@@ -98,6 +187,33 @@ def get_logs():
         return jsonify([log.as_json() for log in logs])
 
 
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    if request.method == 'GET':
+        # positions, PnL and risk limits, same access as the dashboard
+        if not gui_access_allowed():
+            return 'Access Denied', 401
+        return jsonify({
+            'actions': {action.name: action.get_stats() for action in am.get_all()},
+            'exchange': get_resilience().as_json(),
+            'positions': get_pnl_engine().as_json(),
+            'risk': get_risk_engine().as_json()
+        })
+
+
+@app.route("/signals", methods=["GET"])
+def get_signals():
+    if request.method == 'GET':
+        # strategy performance, same access as the dashboard
+        if not gui_access_allowed():
+            return 'Access Denied', 401
+        # rolling statistics per strategy and symbol, optionally filtered
+        return jsonify(get_signal_analytics().as_json(
+            strategy=request.args.get('strategy', None),
+            symbol=request.args.get('symbol', None)
+        ))
+
+
 @app.route("/event/active", methods=["POST"])
 def activate_event():
     if request.method == 'POST':
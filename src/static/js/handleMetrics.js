@@ -0,0 +1,99 @@
+$(document).ready(function () {
+    function getMetrics() {
+        $.ajax({
+            url: '/metrics',
+            type: 'GET',
+            // the dashboard's own key, /metrics is guarded like the dashboard
+            data: {guiKey: new URLSearchParams(window.location.search).get('guiKey') || ''},
+            success: function (data) {
+                updateActionStats(data.actions);
+                updatePositions(data.positions);
+            },
+            error: function (error) {
+                console.log(error)
+            }
+        })
+    }
+
+    function updateActionStats(actions) {
+        $('.action-stats').each(function () {
+            const stats = actions[$(this).data('action')];
+            if (!stats) {
+                return;
+            }
+            $(this).text(
+                `runs: ${stats.count} | errors: ${stats.error_count} | last: ${stats.last_run || '-'}` +
+                ` | latency (last ${stats.window}): ${stats.latency_mean_ms}ms avg / ${stats.latency_max_ms}ms max`
+            );
+        });
+        $('.action-status').each(function () {
+            const stats = actions[$(this).data('action')];
+            if (!stats) {
+                return;
+            }
+            // warning icon with the last error as a tooltip once an action has failed
+            $(this).toggleClass('fa-circle-check text-success', !stats.error_count);
+            $(this).toggleClass('fa-circle-exclamation text-warning', !!stats.error_count);
+            $(this).attr('title', stats.error_count ? stats.last_error : '');
+        });
+    }
+
+    function cell(value, classes) {
+        let td = document.createElement('td');
+        td.className = classes || 'text-end';
+        td.textContent = value;
+        return td;
+    }
+
+    function updatePositions(positions) {
+        let positionsContainer = document.getElementById('positionsContainer');
+        const symbols = Object.keys(positions.symbols);
+        if (symbols.length === 0) {
+            positionsContainer.innerHTML = '<div class="text-muted text-center">No open positions</div>';
+            return;
+        }
+
+        let table = document.createElement('table');
+        table.className = 'table table-sm small mb-0';
+        table.innerHTML = '<thead><tr><th>Symbol</th><th class="text-end">Positions</th>' +
+            '<th class="text-end">Net volume</th><th class="text-end">Notional</th>' +
+            '<th class="text-end">Unrealized</th><th class="text-end">Realized</th></tr></thead>';
+        let body = document.createElement('tbody');
+        symbols.forEach(symbol => {
+            const row = positions.symbols[symbol];
+            let tr = document.createElement('tr');
+            tr.appendChild(cell(symbol + ' (' + row.currency + ')', ''));
+            tr.appendChild(cell(row.positions));
+            tr.appendChild(cell(row.net_volume));
+            tr.appendChild(cell(row.notional));
+            tr.appendChild(cell(row.unrealized, row.unrealized < 0 ? 'text-end text-danger' : 'text-end text-success'));
+            tr.appendChild(cell(row.realized));
+            body.appendChild(tr);
+        })
+        table.appendChild(body);
+
+        // PnL is in each symbol's quote currency, so there is one total per currency
+        let foot = document.createElement('tfoot');
+        const currencies = new Set(Object.keys(positions.unrealized).concat(Object.keys(positions.realized)));
+        Array.from(currencies).sort().forEach(currency => {
+            let total = document.createElement('tr');
+            total.className = 'fw-bold';
+            total.appendChild(cell('Total ' + currency, ''));
+            total.appendChild(cell(''));
+            total.appendChild(cell(''));
+            total.appendChild(cell(positions.gross_notional[currency] || 0));
+            total.appendChild(cell(positions.unrealized[currency] || 0));
+            total.appendChild(cell(positions.realized[currency] || 0));
+            foot.appendChild(total);
+        })
+        table.appendChild(foot);
+
+        positionsContainer.innerHTML = '';
+        positionsContainer.appendChild(table);
+    }
+
+    getMetrics();
+    setInterval(function () {
+        getMetrics()
+    }, 10000);
+});
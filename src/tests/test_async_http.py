@@ -0,0 +1,26 @@
+import asyncio
+from unittest import TestCase
+
+from benchmarks.mock_exchange import MockExchange
+from utils.async_http_client import AsyncHTTPClient
+from utils.hmac_auth import AsyncHMACAuthenticator, HMACAuthConfig
+
+
+class TestAsyncHMACAuthenticator(TestCase):
+    def test_concurrent_orders(self):
+        client = AsyncHTTPClient()
+        auth = AsyncHMACAuthenticator(HMACAuthConfig('key', 'secret'), async_http_client=client, exchange=None)
+        order = {'book': 'btc_mxn', 'side': 'buy', 'type': 'market', 'major': '0.001'}
+
+        async def place_all(url):
+            responses = await asyncio.gather(*(
+                auth.authenticated_request_async(f'{url}/v3/orders', 'POST', order) for _ in range(200)
+            ))
+            await client.close()
+            return responses
+
+        with MockExchange() as url:
+            responses = asyncio.run(place_all(url))
+
+        self.assertTrue(all(response.ok for response in responses))
+        self.assertEqual(len({response.json()['payload']['oid'] for response in responses}), 200)
@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+from components.actions.community_created_actions.crypto.binance_spot import BinanceSpot
+
+BTC_USDT = {
+    'id': 'BTCUSDT', 'symbol': 'BTC/USDT', 'base': 'BTC', 'quote': 'USDT', 'baseId': 'BTC', 'quoteId': 'USDT',
+    'spot': True, 'active': True, 'precision': {'amount': 0.00001, 'price': 0.01}, 'limits': {},
+}
+
+
+class OfflineBinanceSpot(BinanceSpot):
+    # no background reloads, the test sets the cached markets and balance itself
+    MARKETS_REFRESH = 0
+    BALANCE_REFRESH = 0
+
+
+class TestBinanceSpotBalance(TestCase):
+    def setUp(self):
+        self.binance = OfflineBinanceSpot()
+        self.binance.exchange.set_markets([BTC_USDT])
+        self.binance.markets.set(self.binance.exchange.markets)
+        self.binance.balance.set({'free': {'BTC': 0.0, 'USDT': 1000.0}})
+        self.orders = []
+
+    def fill(self, side, filled, cost, fee=None):
+        def create(*args):
+            order = {'symbol': 'BTC/USDT', 'side': side, 'filled': filled, 'cost': cost, 'status': 'closed',
+                     'fee': fee}
+            self.orders.append(args)
+            return order
+        return create
+
+    def test_fill_applied_to_cached_balance(self):
+        self.binance.exchange.create_market_buy_order_with_cost = self.fill(
+            'buy', 0.01, 1000.0, {'currency': 'BTC', 'cost': 0.00001})
+        self.binance.place_order('BTC/USDT', 'buy')
+        free = self.binance.balance.value['free']
+        self.assertEqual(free['USDT'], 0.0)
+        self.assertAlmostEqual(free['BTC'], 0.00999)
+
+        # the sell right after sizes from the bought BTC, not the pre-fill balance
+        self.binance.exchange.create_order = self.fill('sell', 0.00999, 999.0)
+        self.binance.place_order('BTC/USDT', 'sell')
+        self.assertEqual(self.orders[-1][3], '0.00999')
+        self.assertEqual(self.binance.balance.value['free']['USDT'], 999.0)
+
+    def test_fill_without_amounts_blocks_sizing_until_reloaded(self):
+        self.binance.exchange.create_market_buy_order_with_cost = self.fill('buy', None, None)
+        self.binance.place_order('BTC/USDT', 'buy')
+        self.assertTrue(self.binance.balance.stale)
+        self.assertIsNone(self.binance.place_order('BTC/USDT', 'buy'))
+        self.assertEqual(len(self.orders), 1)
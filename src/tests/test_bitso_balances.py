@@ -0,0 +1,98 @@
+import time
+from decimal import Decimal
+from unittest import TestCase
+
+from benchmarks.mock_exchange import MockExchange
+from components.actions.bitso_spot import BitsoBalances, BitsoBookRules, BitsoSpot
+from config import bitso_config
+from utils.pnl_engine import PnLEngine
+from utils.risk import RiskEngine
+from tests.test_bitso_markets import BTC_MXN
+
+BALANCE = {'success': True, 'payload': {'balances': [
+    {'currency': 'btc', 'available': '0.50000000', 'locked': '0', 'total': '0.5'},
+    {'currency': 'mxn', 'available': '10000.00', 'locked': '0', 'total': '10000.00'},
+]}}
+
+
+class TestBitsoBalances(TestCase):
+    def setUp(self):
+        self.balances = BitsoBalances()
+        self.balances.load(BALANCE)
+
+    def test_not_loaded(self):
+        self.assertIsNone(BitsoBalances().get_available('btc'))
+
+    def test_sell_reduces_base(self):
+        reconcile = self.balances.apply_order('btc_mxn', 'sell', 'market', amount='0.1')
+        self.assertFalse(reconcile)
+        self.assertEqual(self.balances.get_available('btc'), Decimal('0.4'))
+        self.assertIn('mxn', self.balances.stale)
+
+    def test_limit_buy_locks_quote(self):
+        self.balances.apply_order('btc_mxn', 'buy', 'limit', amount='0.01', price='500000')
+        self.assertEqual(self.balances.get_available('mxn'), Decimal('5000'))
+        self.assertEqual(self.balances.locked['mxn'], Decimal('5000'))
+
+    def test_market_buy_by_amount_needs_reconcile(self):
+        self.assertTrue(self.balances.apply_order('btc_mxn', 'buy', 'market', amount='0.01'))
+        self.balances.load(BALANCE)
+        self.assertFalse(self.balances.stale)
+
+    def test_minor_validation(self):
+        rules = BitsoBookRules(BTC_MXN)
+        self.assertEqual(rules.validate_minor('2500.129'), '2500.12')
+        with self.assertRaises(ValueError):
+            rules.validate_minor('5')
+
+
+class TestBitsoSpot(TestCase):
+    def setUp(self):
+        self.saved = dict(vars(bitso_config))
+        # background tasks off, so only the lazy first-use loads can reach the exchange
+        bitso_config.markets_refresh_interval = 0
+        bitso_config.balance_reconcile_interval = 0
+        bitso_config.open_orders_poll_interval = 0
+
+    def tearDown(self):
+        vars(bitso_config).update(self.saved)
+
+    def test_init_does_not_call_the_exchange(self):
+        with MockExchange(latency=0.5) as url:
+            bitso_config.base_url = url
+            started = time.perf_counter()
+            bitso = BitsoSpot()
+            self.assertLess(time.perf_counter() - started, 0.4)
+            self.assertFalse(bitso.balances.loaded)
+            self.assertIsNone(bitso.markets.value)
+
+            # loaded on first use instead
+            self.assertEqual(bitso.size_from_balance('btc_mxn', 'sell', '50%'), {'amount': '0.5'})
+            self.assertIsNotNone(bitso.get_book_rules('btc_mxn'))
+
+    def test_init_survives_an_unreachable_exchange(self):
+        bitso_config.base_url = 'http://127.0.0.1:9'
+        bitso = BitsoSpot()
+        with self.assertRaises(ValueError):
+            bitso.size_from_balance('btc_mxn', 'buy', '10%')
+
+    def test_fills_recorded_with_the_amount_sent(self):
+        with MockExchange() as url:
+            bitso_config.base_url = url
+            bitso = BitsoSpot()
+            bitso.pnl = PnLEngine()
+            bitso.risk = RiskEngine(pnl=bitso.pnl)
+            # rounded down to the book's 0.00001 step before sending
+            self.assertIsNotNone(bitso.place_order('btc_mxn', 'sell', amount='0.123456789'))
+            self.assertAlmostEqual(bitso.risk.exposure('btc_mxn'), -0.12345)
+
+            # sized in mxn: the traded btc is read from the exchange by the poller, not on the order path
+            self.assertIsNotNone(bitso.place_order('btc_mxn', 'buy', minor='1000'))
+            self.assertEqual(list(bitso.unresolved_fills.values()), [('btc_mxn', 'buy')])
+            bitso.poll_open_orders()
+            self.assertEqual(bitso.unresolved_fills, {})
+            self.assertAlmostEqual(bitso.risk.exposure('btc_mxn'), -0.12245)
+
+            # resting limit orders haven't filled
+            bitso.place_order('btc_mxn', 'buy', 'limit', amount='0.01', price='900000')
+            self.assertEqual(bitso.risk.fills, 2)
@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from components.actions.bitso_spot import BitsoBookRules
+
+BTC_MXN = {
+    'book': 'btc_mxn', 'minimum_amount': '0.00000020', 'maximum_amount': '500.00000000',
+    'minimum_price': '100.00', 'maximum_price': '10000000.00', 'minimum_value': '10.00',
+    'maximum_value': '10000000.00', 'tick_size': '10'
+}
+
+
+class TestBitsoBookRules(TestCase):
+    def setUp(self):
+        self.rules = BitsoBookRules(BTC_MXN)
+
+    def test_rounds_amount_and_price(self):
+        amount, price = self.rules.validate('0.123456789', '1234567.89')
+        self.assertEqual(amount, '0.12345678')
+        self.assertEqual(price, '1234560')
+
+    def test_rejects_limits(self):
+        with self.assertRaises(ValueError):
+            self.rules.validate('0.0000001')
+        with self.assertRaises(ValueError):
+            self.rules.validate('501')
+        with self.assertRaises(ValueError):
+            self.rules.validate('0.00001', '100000')  # value 1 MXN
@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+from components.actions.bitso_spot import BitsoOpenOrders, _batches
+
+
+def order(oid, book='btc_mxn'):
+    return {'oid': oid, 'book': book, 'side': 'buy', 'status': 'open'}
+
+
+class TestBitsoOpenOrders(TestCase):
+    def setUp(self):
+        self.index = BitsoOpenOrders()
+        self.index.replace([order('a'), order('b'), order('c', 'eth_mxn')])
+
+    def test_index_by_book(self):
+        self.assertTrue(self.index.loaded)
+        self.assertCountEqual(self.index.for_book('btc_mxn'), ['a', 'b'])
+        self.assertCountEqual(self.index.for_book(), ['a', 'b', 'c'])
+        self.assertEqual(self.index.as_json()['books'], {'btc_mxn': 2, 'eth_mxn': 1})
+
+    def test_add_and_discard(self):
+        self.index.add(order('d', 'eth_mxn'))
+        self.index.discard(['a', 'c', 'unknown'])
+        self.assertEqual(self.index.for_book('btc_mxn'), ['b'])
+        self.assertEqual(self.index.for_book('eth_mxn'), ['d'])
+        self.assertIsNone(self.index.get('a'))
+
+    def test_replace_drops_closed_orders(self):
+        self.index.replace([order('b')])
+        self.assertEqual(self.index.for_book(), ['b'])
+        self.assertEqual(self.index.for_book('eth_mxn'), [])
+
+    def test_batches(self):
+        self.assertEqual([len(b) for b in _batches(range(45), 20)], [20, 20, 5])
+        self.assertEqual(_batches([], 20), [])
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from components.actions.base.action import Action, ActionManager
+from components.events.base.event import Event, EventManager
+from components.events.base.table import CsvEventTable, SqliteEventTable, TableEvent, open_event_table
+from components.logs.log_event import LogEvent
+
+
+class RecordingAction(Action):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.payloads = []
+
+    def run(self, *args, **kwargs):
+        self.payloads.append(self.validate_data())
+
+
+class StaticEvent(Event):
+    pass
+
+
+class EventTableTestCase(TestCase):
+    def setUp(self):
+        self.write = patch.object(LogEvent, 'write', lambda self: None)
+        self.write.start()
+        self.dir = tempfile.mkdtemp()
+        self.am = ActionManager()
+        self.fx, self.crypto = RecordingAction('Fx'), RecordingAction('Crypto')
+        self.am._actions.extend([self.fx, self.crypto])
+        self.em = EventManager()
+
+    def tearDown(self):
+        self.write.stop()
+        for name in os.listdir(self.dir):
+            os.remove(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    def csv_table(self, lines):
+        path = os.path.join(self.dir, 'events.csv')
+        with open(path, 'w') as table:
+            table.write('\n'.join(lines) + '\n')
+        return open_event_table(path, self.am)
+
+
+class TestCsvEventTable(EventTableTestCase):
+    def test_events_load_on_first_use(self):
+        table = self.csv_table([
+            'name,actions,rule,active',
+            'ScalperAcct1,Fx;Crypto,"symbol in {EURUSD, BTCMXN}",',
+            'ScalperAcct2,Fx;Crypto,"symbol in {EURUSD, BTCMXN}",no',
+            '"Bad,Name",Fx,,',
+            'Unlinked,Missing,,',
+        ])
+        self.assertIsInstance(table, CsvEventTable)
+        self.em.add_table(table)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(self.em._events, [])
+
+        event = self.em.get('ScalperAcct1')
+        self.assertIsInstance(event, TableEvent)
+        self.assertEqual(self.em.find(event.key), [event])
+        self.assertEqual(self.em.find('ScalperAcct1:000000'), [])
+        self.assertEqual(self.em.find(None), [])
+        self.assertEqual(len(self.em._events), 1)
+
+        self.assertEqual(event.routes.match({'symbol': 'btcmxn'}), [self.fx, self.crypto])
+        self.assertFalse(self.em.get('ScalperAcct2').active)
+        self.assertEqual(self.em.get('Unlinked')._actions, [])
+        self.assertEqual(len(self.em.get_all()), 3)
+        with self.assertRaises(ValueError):
+            self.em.get('Bad,Name')
+
+    def test_shared_links_copied_on_write(self):
+        self.em.add_table(self.csv_table(['name,actions', 'A,Fx', 'B,Fx']))
+        a, b = self.em.get('A'), self.em.get('B')
+        self.assertIs(a._actions, b._actions)
+
+        a.add_action(self.crypto, 'symbol == BTCMXN')
+        self.assertEqual(a._actions, [self.fx, self.crypto])
+        self.assertEqual(b._actions, [self.fx])
+        self.assertFalse(hasattr(a, '__dict__'))
+
+    def test_trigger_routes_by_row_rule(self):
+        self.em.add_table(self.csv_table(['name,actions,rule', 'Acct,Fx,symbol == EURUSD']))
+        event = self.em.find(self.em.get('Acct').key)[0]
+        event.trigger(data={'key': event.key, 'symbol': 'EURUSD'})
+        event.trigger(data={'key': event.key, 'symbol': 'BTCMXN'})
+        self.assertEqual(len(self.fx.payloads), 1)
+
+    def test_registered_events_win(self):
+        static = StaticEvent()
+        self.em.add(static)
+        self.em.add_table(self.csv_table(['name', 'StaticEvent']))
+        self.assertIs(self.em.get('StaticEvent'), static)
+        self.assertEqual(self.em.find(static.key), [static])
+
+
+class TestSqliteEventTable(EventTableTestCase):
+    def test_rows_queried_lazily(self):
+        path = os.path.join(self.dir, 'events.db')
+        db = sqlite3.connect(path)
+        db.execute('CREATE TABLE events (name TEXT PRIMARY KEY, actions TEXT, active INTEGER)')
+        db.executemany('INSERT INTO events VALUES (?, ?, ?)', [('Acct1', 'Crypto', 1), ('Acct2', 'Crypto', 0)])
+        db.commit()
+        db.close()
+
+        table = open_event_table(path, self.am)
+        self.assertIsInstance(table, SqliteEventTable)
+        self.em.add_table(table)
+        self.assertEqual(len(table), 2)
+
+        event = self.em.find(Event('Acct1').key)[0]
+        self.assertEqual(event._actions, [self.crypto])
+        self.assertTrue(event.active)
+        self.assertFalse(self.em.get('Acct2').active)
+        self.assertEqual([event.name for event in self.em.get_all()], ['Acct1', 'Acct2'])
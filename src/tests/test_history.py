@@ -0,0 +1,63 @@
+import logging
+import os
+import tracemalloc
+from unittest import TestCase
+from unittest.mock import patch
+
+from commons import ACTION_LOG_CAPACITY, EVENT_LOG_CAPACITY
+from components.actions.base.action import Action
+from components.events.base.event import Event
+from components.logs.history import RunStats
+from components.logs.log_event import LogEvent
+
+
+class SoakAction(Action):
+    def run(self, *args, **kwargs):
+        super().run(*args, **kwargs)
+
+
+class SoakEvent(Event):
+    pass
+
+
+class TestRunStats(TestCase):
+    def test_rolling_window(self):
+        stats = RunStats(window=3)
+        for latency in [5.0, 1.0, 2.0, 3.0]:
+            stats.record(latency)
+        stats.record(0.5, ValueError('boom'))
+        self.assertEqual(stats.count, 5)
+        self.assertEqual(stats.error_count, 1)
+        self.assertEqual(stats.last_error, 'boom')
+        self.assertEqual(stats.latency_max, 3.0)
+        self.assertAlmostEqual(stats.latency_mean, (2.0 + 3.0 + 0.5) / 3)
+
+
+class TestSoak(TestCase):
+    # set TVWB_SOAK=1 to run the full million-trigger soak
+    TRIGGERS = 1_000_000 if os.getenv('TVWB_SOAK') else 20_000
+
+    def test_memory_stays_flat(self):
+        logging.disable(logging.CRITICAL)
+        try:
+            with patch.object(LogEvent, 'write', lambda self: None):
+                event = SoakEvent()
+                action = SoakAction()
+                event.add_action(action)
+
+                # warm up until both ring buffers hold only traced entries
+                tracemalloc.start()
+                for _ in range(max(EVENT_LOG_CAPACITY, ACTION_LOG_CAPACITY)):
+                    event.trigger(data={'key': event.key})
+                baseline, _ = tracemalloc.get_traced_memory()
+                for _ in range(self.TRIGGERS):
+                    event.trigger(data={'key': event.key})
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.assertEqual(action.stats.count, self.TRIGGERS + max(EVENT_LOG_CAPACITY, ACTION_LOG_CAPACITY))
+        self.assertEqual(len(event.logs), EVENT_LOG_CAPACITY)
+        self.assertEqual(len(action.logs), ACTION_LOG_CAPACITY)
+        self.assertLess(current - baseline, 64 * 1024)
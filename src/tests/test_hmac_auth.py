@@ -0,0 +1,88 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+import requests
+
+from utils.async_http_client import AsyncHTTPClient
+from utils.hmac_auth import AsyncHMACAuthenticator, HMACAuthConfig
+from utils.http_client import HTTPClient
+from utils.nonce import NonceSource
+from utils.rate_limit import ORDERS, RateLimitConfig, RateLimiter, TokenBucket
+
+
+class RecordingSession:
+    """Stands in for the pooled session, recording nonces in the order requests go out"""
+
+    def __init__(self):
+        self.nonces = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, headers=None, **kwargs):
+        with self._lock:
+            self.nonces.append((method, int(headers['Authorization'].split(':')[1])))
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+
+class TestNonceOrdering(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        config = RateLimitConfig()
+        config.enabled = True
+        # one order every 0.3s, reads unlimited
+        self.limiter = RateLimiter(config)
+        self.limiter._buckets[('test', ORDERS)] = TokenBucket('test.orders', 1, 0.3, os.path.join(self.tmp.name, 'o'))
+        self.nonces = NonceSource(os.path.join(self.tmp.name, 'nonce'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_queued_order_signed_after_read(self):
+        client = HTTPClient(rate_limiter=self.limiter)
+        session = RecordingSession()
+        client._session, client._pid = session, os.getpid()
+        auth = AsyncHMACAuthenticator(HMACAuthConfig('key', 'secret'), http_client=client,
+                                      nonce_source=self.nonces, exchange='test')
+
+        auth.authenticated_request('http://exchange/v3/orders', 'POST', {'n': 1})
+        # the second order waits for the orders bucket while a read goes straight out
+        order = threading.Thread(target=auth.authenticated_request, args=('http://exchange/v3/orders', 'POST', {'n': 2}))
+        order.start()
+        time.sleep(0.05)
+        auth.authenticated_request('http://exchange/v3/balance', 'GET')
+        order.join()
+
+        self.assertEqual([method for method, _ in session.nonces], ['POST', 'GET', 'POST'])
+        nonces = [nonce for _, nonce in session.nonces]
+        self.assertEqual(nonces, sorted(nonces))
+
+    def test_async_queued_order_signed_after_read(self):
+        sent = []
+
+        class RecordingAsyncClient(AsyncHTTPClient):
+            async def request(self, method, url, headers=None, **kwargs):
+                sent.append((method, int(headers['Authorization'].split(':')[1])))
+                response = requests.Response()
+                response.status_code = 200
+                return response
+
+        auth = AsyncHMACAuthenticator(HMACAuthConfig('key', 'secret'),
+                                      async_http_client=RecordingAsyncClient(rate_limiter=self.limiter),
+                                      nonce_source=self.nonces, exchange='test')
+
+        async def interleave():
+            await auth.authenticated_request_async('http://exchange/v3/orders', 'POST', {'n': 1})
+            order = asyncio.ensure_future(auth.authenticated_request_async('http://exchange/v3/orders', 'POST', {'n': 2}))
+            await asyncio.sleep(0.05)
+            await auth.authenticated_request_async('http://exchange/v3/balance', 'GET')
+            await order
+
+        asyncio.run(interleave())
+        self.assertEqual([method for method, _ in sent], ['POST', 'GET', 'POST'])
+        nonces = [nonce for _, nonce in sent]
+        self.assertEqual(nonces, sorted(nonces))
@@ -0,0 +1,19 @@
+from datetime import datetime
+from unittest import TestCase
+
+from components.logs.log_event import LogEvent
+
+
+class TestLogEvent(TestCase):
+    def test_round_trip(self):
+        event_time = datetime(2024, 1, 2, 3, 4, 5, 678)
+        log = LogEvent('WebhookReceived', 'triggered', event_time, 'WebhookReceived, was triggered')
+        parsed = LogEvent().from_line(log.to_line())
+        self.assertEqual(parsed.timestamp_us, log.timestamp_us)
+        self.assertEqual(parsed.get_event_time(), event_time)
+        self.assertEqual(parsed.as_json()['event_time'], '2024-01-02 03:04:05')
+
+    def test_legacy_line(self):
+        parsed = LogEvent().from_line('WebhookReceived,triggered,2024-01-02 03:04:05,WebhookReceived was triggered\n')
+        self.assertEqual(parsed.get_event_time(), datetime(2024, 1, 2, 3, 4, 5))
+        self.assertEqual(parsed.as_json()['event_data'], 'WebhookReceived was triggered')
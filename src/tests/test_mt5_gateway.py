@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from components.actions.mt5_demo_mock import MockTerminal, Mt5DemoMock
+
+
+class ThreadCheckingTerminal(MockTerminal):
+    """Records the threads terminal functions are called from"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.threads = set()
+
+    def _online(self):
+        self.threads.add(threading.current_thread().name)
+        return super()._online()
+
+
+class TestMT5Gateway(TestCase):
+    def setUp(self):
+        self.action = Mt5DemoMock()
+        self.terminal = self.action.mt5
+        self.action.gateway.cache.tick_ttl = 60
+
+    def tearDown(self):
+        self.action.gateway.stop()
+
+    def test_concurrent_orders_are_serialized(self):
+        terminal = ThreadCheckingTerminal(1, 'demo')
+        self.action.gateway.terminal = self.action.mt5 = terminal
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: self.action.place_order('EURUSD', 'buy', 0.1), range(40)))
+
+        self.assertTrue(all(results))
+        self.assertEqual(len({result['order'] for result in results}), 40)
+        self.assertEqual(len(self.action.get_positions('EURUSD')), 40)
+        self.assertEqual(terminal.threads, {'mt5-gateway'})
+
+    def test_symbol_spec_fetched_once(self):
+        self.action.place_order('GBPUSD', 'sell', 0.1)
+        calls = self.terminal.calls
+        result = self.action.place_order('GBPUSD', 'sell', 0.123)
+        self.assertEqual(result['volume'], 0.12)
+        self.assertEqual(result['price'], 1.2650)
+        # only order_send (plus the fill quote the mock takes inside it); spec and tick come from the cache
+        self.assertEqual(self.terminal.calls - calls, 2)
+
+        cache = self.action.get_stats()['gateway']['symbol_cache']
+        self.assertEqual(cache['spec_misses'], 1)
+        self.assertEqual(cache['tick_misses'], 1)
+        self.assertEqual(cache['spec_hit_rate'], 0.5)
+
+    def test_round_volume(self):
+        round_volume = self.action.gateway.round_volume
+        self.assertEqual(round_volume('EURUSD', 0.075), 0.08)
+        self.assertEqual(round_volume('EURUSD', 0.001), 0.01)
+        self.assertEqual(round_volume('EURUSD', 250), 100.0)
+        self.assertEqual(round_volume('EURUSD', 0.29), 0.29)
+
+    def test_tick_ttl(self):
+        cache = self.action.gateway.cache
+        cache.tick_ttl = 0
+        self.action.get_symbol_info('USDCHF')
+        self.action.get_symbol_info('USDCHF')
+        self.assertEqual(cache.tick_misses, 2)
+
+    def test_reconnects_after_lost_terminal(self):
+        self.terminal.disconnect()
+        self.assertIsNotNone(self.action.get_account_info())
+        self.assertEqual(self.action.gateway.reconnects, 1)
+
+        self.action.gateway.prefetch(['EURUSD'])[0].result()
+        self.action.gateway.symbol_info_tick('EURUSD')
+        # lookups before the order would reconnect and retry; the order itself must not be resent
+        self.terminal.disconnect()
+        self.assertIsNone(self.action.place_order('EURUSD', 'buy', 0.1))  # orders are not resent
+        self.assertTrue(self.action.connected)
+        self.assertIsNotNone(self.action.place_order('EURUSD', 'buy', 0.1))
+        self.assertEqual(len(self.action.get_positions()), 1)
+
+    def test_close_position(self):
+        ticket = self.action.place_order('USDJPY', 'buy', 1)['order']
+        self.action.place_order('USDJPY', 'sell', 0.25)
+        self.assertEqual(len(self.action.get_positions('USDJPY')), 2)
+        self.assertEqual(self.action.get_exposure('USDJPY'), 0.75)
+        self.assertIsNotNone(self.action.close_position(ticket))
+        self.assertEqual(self.action.get_exposure('USDJPY'), -0.25)
+        self.action.close_position(ticket + 1)
+        self.assertEqual(self.action.get_positions(), [])
+        self.assertIsNone(self.action.close_position(ticket))
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from components.actions.mt5_demo_mock import Mt5DemoMock, SimulatedTerminal
+from utils.pnl_engine import PnLEngine
+from utils.price_feed import PriceFeed
+from utils.risk import RiskConfig, RiskEngine
+
+START = 1700000000
+
+
+class TestMT5Simulation(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        pd.DataFrame({
+            'time': [START, START + 60, START + 120, START + 180, START + 240],
+            'open': [1.1000, 1.1000, 1.1010, 1.1030, 1.1000],
+            'high': [1.1005, 1.1012, 1.1035, 1.1031, 1.1002],
+            'low': [1.0995, 1.0998, 1.1008, 1.0995, 1.0950],
+            'close': [1.1000, 1.1010, 1.1030, 1.1000, 1.0960],
+        }).to_csv(self.path, index=False)
+        feed = PriceFeed.load(self.path, symbol='EURUSD', spread_points=20)
+        self.terminal = SimulatedTerminal(1, 'demo', feed, slippage_points=5, latency=30)
+        self.action = Mt5DemoMock(terminal=self.terminal)
+        self.action.gateway.cache.tick_ttl = 0
+
+    def tearDown(self):
+        self.action.gateway.stop()
+        os.remove(self.path)
+
+    def test_market_order_fills_after_latency_with_slippage(self):
+        result = self.action.place_order('EURUSD', 'buy', 1.0)
+
+        # the first bar is quoted once it has closed, at START + 60; sent then, filled 30s later
+        # on its ask (close + 20 points) plus 5 points
+        self.assertAlmostEqual(result['price'], 1.1000 + 0.0002 + 0.00005)
+        self.assertEqual(self.terminal.now, START + 90)
+
+    def test_bars_quoted_when_they_close(self):
+        feed = self.terminal.feed
+        self.assertEqual(feed.start, START + 60)
+        self.assertEqual(feed.bids[:2], [1.1000, 1.1010])
+        self.assertEqual(PriceFeed(pd.read_csv(self.path), symbol='EURUSD', bar_seconds=30).start, START + 30)
+
+    def test_positions_marked_to_market(self):
+        self.action.place_order('EURUSD', 'buy', 1.0)
+        self.action.advance(START + 180)
+
+        position = self.action.get_positions('EURUSD')[0]
+        self.assertAlmostEqual(position['price_current'], 1.1030)
+        self.assertAlmostEqual(position['profit'], round((1.1030 - 1.10025) * 100000, 2))
+        account = self.action.get_account_info()
+        self.assertAlmostEqual(account['equity'], 10000 + position['profit'])
+
+    def test_take_profit_and_stop_loss_trigger_on_bar_range(self):
+        self.action.place_order('EURUSD', 'buy', 1.0, take_profit=1.1025)
+        self.action.place_order('EURUSD', 'sell', 1.0, stop_loss=1.1020)
+        self.terminal.run_to_end()
+
+        self.assertEqual(len(self.action.get_positions()), 0)
+        deals = {deal['reason']: deal for deal in self.terminal.deals}
+        self.assertEqual(deals['tp']['price_close'], 1.1025)
+        # the third bar (high 1.1035) closes at START + 180
+        self.assertEqual(deals['tp']['time_close'], START + 180)
+        # the sell closes on the ask, which reaches the stop inside the third bar
+        self.assertEqual(deals['sl']['time_close'], START + 180)
+        self.assertEqual(deals['sl']['price_close'], 1.1020)
+        self.assertAlmostEqual(self.action.mock_account['balance'],
+                               10000 + deals['tp']['profit'] + deals['sl']['profit'])
+
+    def test_buy_with_stops_on_the_wrong_side_rejected(self):
+        # bid 1.1000 / ask 1.1002: a buy's stop loss above the bid or take profit below it can't be placed
+        self.assertIsNone(self.action.place_order('EURUSD', 'buy', 1.0, stop_loss=1.1010))
+        self.assertEqual(self.terminal.last_error(), self.terminal.RES_E_INVALID_STOPS)
+        self.assertIsNone(self.action.place_order('EURUSD', 'buy', 1.0, take_profit=1.0990))
+        self.assertEqual(len(self.terminal.positions), 0)
+        self.assertIsNotNone(self.action.place_order('EURUSD', 'buy', 1.0, stop_loss=1.0990, take_profit=1.1100))
+
+    def test_sell_with_stops_on_the_wrong_side_rejected(self):
+        self.assertIsNone(self.action.place_order('EURUSD', 'sell', 1.0, stop_loss=1.0990))
+        self.assertEqual(self.terminal.last_error(), self.terminal.RES_E_INVALID_STOPS)
+        self.assertIsNone(self.action.place_order('EURUSD', 'sell', 1.0, take_profit=1.1100))
+        self.terminal.run_to_end()
+        self.assertEqual(self.terminal.deals, [])
+        self.assertEqual(self.action.mock_account['balance'], 10000)
+
+    def test_stop_loss_booked_in_positions_pnl_and_risk(self):
+        self.action.pnl = PnLEngine()
+        self.action.risk = RiskEngine(RiskConfig(), self.action.pnl)
+        self.action.place_order('EURUSD', 'sell', 1.0, stop_loss=1.1020)
+        self.action.get_positions('EURUSD')
+        self.assertEqual(self.action.get_exposure('EURUSD'), -1.0)
+        self.assertEqual(self.action.risk.exposure('EURUSD'), -1.0)
+
+        self.action.advance(START + 240)
+
+        deal = self.terminal.deals[-1]
+        self.assertEqual(deal['reason'], 'sl')
+        self.assertLess(deal['profit'], 0)
+        # the terminal closed it, and every view of the account agrees without listing positions again
+        self.assertEqual(len(self.action.positions), 0)
+        self.assertEqual(self.action.get_exposure('EURUSD'), 0)
+        self.assertEqual(self.action.pnl.exposure('EURUSD'), 0)
+        self.assertAlmostEqual(self.action.pnl.realized['EURUSD'], deal['profit'], delta=0.01)
+        self.assertEqual(self.action.risk.exposure('EURUSD'), 0)
+        self.assertAlmostEqual(self.action.risk.daily_pnl('USD'), deal['profit'])
+        self.assertEqual(self.action.reconcile_stops(), [])
+
+    def test_replays_a_month_of_minute_bars_faster_than_real_time(self):
+        minutes = 31 * 24 * 60
+        close = 1.1 + np.cumsum(np.random.default_rng(7).normal(0, 0.0001, minutes))
+        frame = pd.DataFrame({'time': START + 60 * np.arange(minutes), 'open': close,
+                              'high': close + 0.0003, 'low': close - 0.0003, 'close': close})
+        terminal = SimulatedTerminal(1, 'demo', PriceFeed(frame, symbol='EURUSD', spread_points=10))
+        terminal.initialize()
+
+        started = time.perf_counter()
+        for hour in range(0, minutes, 60):
+            terminal.advance(START + 60 * hour)
+            tick = terminal.symbol_info_tick('EURUSD')
+            terminal.order_send({'symbol': 'EURUSD', 'type': hour // 60 % 2, 'volume': 0.1,
+                                 'sl': round(tick.bid - 0.002, 5) if hour // 60 % 2 == 0 else 0.0})
+        terminal.run_to_end()
+        elapsed = time.perf_counter() - started
+
+        self.assertTrue(terminal.feed.exhausted)
+        self.assertLess(elapsed, 10)
@@ -0,0 +1,51 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from utils.nonce import NonceSource
+
+PROCESSES = 4
+THREADS = 4
+NONCES = 1000
+
+
+def _issue(source: NonceSource, queue):
+    results = [[] for _ in range(THREADS)]
+
+    def worker(out):
+        for _ in range(NONCES):
+            out.append(source.next())
+
+    threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queue.put(results)
+
+
+class TestNonceSource(TestCase):
+    def test_multi_process_stress(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = NonceSource(os.path.join(tmp, 'nonce'))
+            # open in the parent first so forked workers must reopen the shared file
+            first = source.next()
+
+            queue = multiprocessing.Queue()
+            processes = [multiprocessing.Process(target=_issue, args=(source, queue)) for _ in range(PROCESSES)]
+            for process in processes:
+                process.start()
+            sequences = [sequence for _ in processes for sequence in queue.get(timeout=60)]
+            for process in processes:
+                process.join()
+
+            last = source.next()
+
+        nonces = [nonce for sequence in sequences for nonce in sequence]
+        self.assertEqual(len(nonces), PROCESSES * THREADS * NONCES)
+        self.assertEqual(len(set(nonces)), len(nonces))
+        for sequence in sequences:
+            self.assertTrue(all(a < b for a, b in zip(sequence, sequence[1:])))
+        self.assertTrue(first < min(nonces) and max(nonces) < last)
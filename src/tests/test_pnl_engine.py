@@ -0,0 +1,125 @@
+from unittest import TestCase
+
+import numpy as np
+
+from components.actions.mt5_demo_mock import Mt5DemoMock
+from utils.pnl_engine import BUY, SELL, PnLEngine
+
+
+class TestPnLEngine(TestCase):
+    def setUp(self):
+        self.engine = PnLEngine(capacity=2)
+        self.engine.update_prices({'EURUSD': (1.1000, 1.1002), 'BTCUSD': (50000.0, 50010.0)})
+
+    def test_revalues_longs_at_bid_and_shorts_at_ask(self):
+        self.engine.open('a', 'EURUSD', 'buy', 1.0, 1.0990, contract_size=100000)
+        self.engine.open('b', 'EURUSD', 'sell', 0.5, 1.1010, contract_size=100000)
+        self.engine.open('c', 'BTCUSD', BUY, 2.0, 49000.0)
+
+        self.assertAlmostEqual(self.engine.pnl('a'), 100.0)
+        self.assertAlmostEqual(self.engine.pnl('b'), 40.0)
+        self.assertAlmostEqual(self.engine.pnl('c'), 2000.0)
+
+        self.engine.update_prices({'EURUSD': (1.0980, 1.0982)})
+        self.assertAlmostEqual(self.engine.pnl('a'), -100.0)
+        self.assertAlmostEqual(self.engine.unrealized('EURUSD'), -100.0 + 140.0)
+        self.assertAlmostEqual(self.engine.unrealized(currency='USD'), 40.0 + 2000.0)
+
+    def test_totals_kept_per_quote_currency(self):
+        self.engine.update_prices({'USDJPY': (150.00, 150.02)})
+        self.engine.open('a', 'EURUSD', 'buy', 1.0, 1.0990, contract_size=100000)
+        self.engine.open('b', 'USDJPY', 'buy', 1.0, 149.00, contract_size=100000)
+        self.engine.open('c', 'btc_mxn', 'buy', 0.1, 900000.0, currency='mxn')
+
+        unrealized = self.engine.unrealized()
+        self.assertEqual(set(unrealized), {'USD', 'JPY', 'MXN'})
+        self.assertAlmostEqual(unrealized['USD'], 100.0)
+        self.assertAlmostEqual(unrealized['JPY'], 100000.0)
+        self.assertAlmostEqual(self.engine.close('b', price=149.50), 50000.0)
+        totals = self.engine.as_json()
+        self.assertEqual(totals['realized'], {'JPY': 50000.0})
+        self.assertEqual(totals['unrealized'], {'USD': 100.0, 'JPY': 0.0, 'MXN': 0.0})
+        self.assertEqual(totals['symbols']['USDJPY']['currency'], 'JPY')
+
+    def test_spot_holdings_move_exposure_only(self):
+        self.engine.trade('btc_mxn', 'buy', 0.5)
+        self.engine.trade('btc_mxn', 'sell', 0.2)
+        self.assertAlmostEqual(self.engine.exposure('btc_mxn'), 0.3)
+        self.assertEqual(len(self.engine), 0)
+        self.assertEqual(self.engine.as_json()['symbols']['btc_mxn']['net_volume'], 0.3)
+        self.engine.trade('btc_mxn', 'sell', 0.3)
+        self.assertEqual(self.engine.exposure(), {})
+
+    def test_exposure_and_close(self):
+        self.engine.open('a', 'EURUSD', 'buy', 1.0, 1.0990, contract_size=100000)
+        self.engine.open('b', 'EURUSD', SELL, 0.25, 1.1010)
+        self.engine.open('c', 'BTCUSD', 'sell', 1.0, 51000.0)
+        self.assertEqual(self.engine.exposure('EURUSD'), 0.75)
+        self.assertEqual(self.engine.exposure(), {'EURUSD': 0.75, 'BTCUSD': -1.0})
+
+        self.assertAlmostEqual(self.engine.close('a', price=1.1000), 100.0)
+        self.assertEqual(self.engine.exposure('EURUSD'), -0.25)
+        # the row moved into the closed slot keeps its key
+        self.assertAlmostEqual(self.engine.pnl('c'), 990.0)
+        self.assertIsNone(self.engine.close('a'))
+        self.assertEqual(len(self.engine), 2)
+        self.assertAlmostEqual(self.engine.as_json()['symbols']['EURUSD']['realized'], 100.0)
+
+    def test_matches_per_position_loop(self):
+        rng = np.random.default_rng(1)
+        symbols = ['EURUSD', 'BTCUSD', 'GBPUSD']
+        expected = {}
+        for i in range(3000):
+            symbol = symbols[i % 3]
+            side = 'buy' if rng.random() < 0.5 else 'sell'
+            volume, entry = round(rng.random(), 2) + 0.01, 1 + rng.random()
+            self.engine.open(i, symbol, side, volume, entry)
+            expected[i] = (symbol, side, volume, entry)
+        for i in range(0, 3000, 7):
+            self.engine.close(i)
+            del expected[i]
+
+        quotes = {symbol: (1.5, 1.5001) for symbol in symbols}
+        self.engine.update_prices(quotes)
+        for key, (symbol, side, volume, entry) in expected.items():
+            bid, ask = quotes[symbol]
+            pnl = (bid - entry) * volume if side == 'buy' else (entry - ask) * volume
+            self.assertAlmostEqual(self.engine.pnl(key), pnl)
+
+    def test_triggered_stops(self):
+        self.engine.open('long', 'EURUSD', 'buy', 1.0, 1.1, sl=1.0950, tp=1.1050)
+        self.engine.open('short', 'EURUSD', 'sell', 1.0, 1.1, sl=1.1050, tp=1.0950)
+        self.assertEqual(self.engine.triggered(), [])
+        self.engine.update_prices({'EURUSD': (1.0940, 1.0942)})
+        self.assertEqual(sorted(self.engine.triggered()), ['long', 'short'])
+
+    def test_replace_owner_positions(self):
+        self.engine.open(('mt5', 1), 'EURUSD', 'buy', 1.0, 1.1)
+        self.engine.open(('other', 1), 'EURUSD', 'buy', 1.0, 1.1)
+        self.engine.replace('mt5', [(2, 'EURUSD', 'sell', 0.5, 1.1, 0, 0, None)])
+
+        self.assertNotIn(('mt5', 1), self.engine)
+        self.assertIn(('other', 1), self.engine)
+        self.assertEqual(self.engine.exposure('EURUSD'), 0.5)
+        self.assertEqual(self.engine.realized, {})
+
+
+class TestMT5PnL(TestCase):
+    def setUp(self):
+        self.action = Mt5DemoMock()
+        self.action.pnl = PnLEngine()
+
+    def tearDown(self):
+        self.action.gateway.stop()
+
+    def test_orders_feed_the_engine(self):
+        result = self.action.place_order('EURUSD', 'buy', 0.1)
+        key = (self.action.name, result['order'])
+        self.assertIn(key, self.action.pnl)
+        self.assertEqual(self.action.pnl.exposure('EURUSD'), 0.1)
+        # bought at the ask, marked at the bid
+        self.assertAlmostEqual(self.action.pnl.pnl(key), (result['bid'] - result['ask']) * 0.1 * 100000)
+
+        self.action.close_position(result['order'])
+        self.assertEqual(len(self.action.pnl), 0)
+        self.assertEqual(self.action.pnl.exposure('EURUSD'), 0.0)
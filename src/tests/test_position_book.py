@@ -0,0 +1,44 @@
+from collections import namedtuple
+from unittest import TestCase
+
+from utils.position_book import PositionBook, POSITION_TYPE_BUY, POSITION_TYPE_SELL
+
+Position = namedtuple('Position', ['ticket', 'symbol', 'type', 'volume'])
+
+
+class TestPositionBook(TestCase):
+    def setUp(self):
+        self.book = PositionBook([
+            Position(1, 'EURUSD', POSITION_TYPE_BUY, 0.3),
+            Position(2, 'EURUSD', POSITION_TYPE_SELL, 0.1),
+            Position(3, 'USDJPY', POSITION_TYPE_SELL, 1.0),
+        ])
+
+    def test_lookups_and_exposure(self):
+        self.assertEqual(self.book.get(2).volume, 0.1)
+        self.assertEqual([p.ticket for p in self.book.for_symbol('EURUSD')], [1, 2])
+        self.assertEqual(self.book.net_exposure('EURUSD'), 0.2)
+        self.assertEqual(self.book.net_exposure(), {'EURUSD': 0.2, 'USDJPY': -1.0})
+
+    def test_remove_and_replace(self):
+        self.assertEqual(self.book.remove(3).symbol, 'USDJPY')
+        self.assertIsNone(self.book.remove(3))
+        self.assertEqual(self.book.symbols, ['EURUSD'])
+        self.assertEqual(self.book.net_exposure('USDJPY'), 0)
+
+        self.book.add(Position(1, 'EURUSD', POSITION_TYPE_BUY, 0.1))  # partial close of ticket 1
+        self.assertEqual(self.book.net_exposure('EURUSD'), 0)
+
+        self.book.replace([Position(4, 'EURUSD', POSITION_TYPE_BUY, 2)], symbol='EURUSD')
+        self.assertEqual(len(self.book), 1)
+        self.assertEqual(self.book.net_exposure(), {'EURUSD': 2.0})
+
+    def test_many_positions(self):
+        book = PositionBook()
+        for ticket in range(20000):
+            book.add(Position(ticket, f'SYM{ticket % 10}', ticket % 2, 0.01))
+        for ticket in range(0, 20000, 2):
+            book.remove(ticket)
+        self.assertEqual(len(book.for_symbol('SYM1')), 2000)
+        self.assertEqual(book.for_symbol('SYM2'), [])
+        self.assertEqual(book.net_exposure('SYM1'), -20.0)
@@ -0,0 +1,46 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from utils.rate_limit import TokenBucket, endpoint_class, ORDERS, READS
+
+PROCESSES = 3
+REQUESTS = 40
+
+
+def _acquire(bucket: TokenBucket, queue):
+    for _ in range(REQUESTS):
+        bucket.acquire()
+    queue.put(time.time())
+
+
+class TestTokenBucket(TestCase):
+    def test_endpoint_class(self):
+        self.assertEqual(endpoint_class('get'), READS)
+        self.assertEqual(endpoint_class('POST'), ORDERS)
+        self.assertEqual(endpoint_class('DELETE'), ORDERS)
+
+    def test_queued_pacing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            bucket = TokenBucket('test', requests=10, seconds=1, path=os.path.join(tmp, 'bucket'))
+            waits = [bucket.reserve() for _ in range(12)]
+        self.assertEqual(waits[:10], [0.0] * 10)
+        self.assertAlmostEqual(waits[10], 0.1, places=2)
+        self.assertAlmostEqual(waits[11], 0.2, places=2)
+
+    def test_shared_across_processes(self):
+        # 20 burst + 200/s: 120 requests from three workers cannot finish in under 0.5s combined
+        with tempfile.TemporaryDirectory() as tmp:
+            bucket = TokenBucket('test', requests=20, seconds=0.1, path=os.path.join(tmp, 'bucket'))
+            queue = multiprocessing.Queue()
+            start = time.time()
+            processes = [multiprocessing.Process(target=_acquire, args=(bucket, queue)) for _ in range(PROCESSES)]
+            for process in processes:
+                process.start()
+            finished = max(queue.get(timeout=30) for _ in processes)
+            for process in processes:
+                process.join()
+
+        self.assertGreaterEqual(finished - start, (PROCESSES * REQUESTS - 20) / 200 * 0.95)
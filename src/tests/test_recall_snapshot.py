@@ -0,0 +1,94 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from benchmarks.mock_exchange import MockExchange
+from components.actions.recall_spot import RecallSnapshot, RecallSpot
+from config import recall_config
+
+PORTFOLIO = {'tokens': [
+    {'token': '0xa', 'symbol': 'USDC', 'chain': 'evm', 'specificChain': 'mainnet', 'amount': 100, 'value': 100},
+    {'token': '0xb', 'symbol': 'USDC', 'chain': 'evm', 'specificChain': 'polygon', 'amount': 50, 'value': 50},
+    {'token': 'So1', 'symbol': 'SOL', 'chain': 'svm', 'specificChain': 'svm', 'amount': 2, 'value': 300},
+]}
+BALANCES = {'balances': [{'symbol': 'usdc', 'chain': 'evm', 'specificChain': 'mainnet', 'amount': 90}]}
+TRADES = {'trades': [{'id': '1', 'fromChain': 'evm', 'fromSpecificChain': 'polygon'}]}
+
+
+class TestRecallSnapshot(TestCase):
+    def test_merges_per_chain(self):
+        snapshot = RecallSnapshot(PORTFOLIO, BALANCES, TRADES)
+        self.assertEqual(sorted(snapshot.chains), ['mainnet', 'polygon', 'svm'])
+        self.assertEqual(snapshot.balance('usdc'), 90)  # balances win over portfolio amounts
+        self.assertEqual(snapshot.balance('USDC', 'polygon'), 50)
+        self.assertIsNone(snapshot.balance('WETH'))
+        self.assertEqual(len(snapshot.chain('polygon').trades), 1)
+        self.assertEqual([c.chain for c in snapshot.chains_of('svm')], ['svm'])
+        self.assertEqual(snapshot.value, 450)
+
+    def test_failed_resource_carried_over(self):
+        previous = RecallSnapshot(PORTFOLIO, BALANCES, TRADES)
+        snapshot = RecallSnapshot({'tokens': []}, None, None, previous=previous)
+        self.assertEqual(snapshot.value, 0)
+        self.assertEqual(snapshot.balance('USDC'), 90)
+        self.assertEqual(snapshot.loaded['balances'], previous.loaded['balances'])
+        self.assertEqual(len(snapshot.chain('polygon').trades), 1)
+
+
+class TestRecallSnapshotRefresh(TestCase):
+    def setUp(self):
+        self.saved = dict(vars(recall_config))
+        self.dir = tempfile.TemporaryDirectory()
+        recall_config.token_cache_file = os.path.join(self.dir.name, 'tokens.json')
+        recall_config.token_refresh_interval = 0
+        # the poll alone would not run again during the test
+        recall_config.snapshot_refresh_interval = 3600
+
+    def tearDown(self):
+        vars(recall_config).update(self.saved)
+        self.dir.cleanup()
+
+    def wait_for_snapshot(self, recall, after=None):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            snapshot = recall.snapshot
+            if snapshot.loaded and snapshot is not after:
+                return snapshot
+            time.sleep(0.01)
+        self.fail('snapshot was not refreshed')
+
+    def test_own_trade_refreshes_snapshot(self):
+        with MockExchange() as url:
+            recall_config.base_url = url
+            recall = RecallSpot()
+            first = self.wait_for_snapshot(recall)
+            self.assertIsNotNone(recall.execute_trade('0xa', '0xb', '1'))
+            self.assertIsNot(self.wait_for_snapshot(recall, after=first), first)
+            recall._snapshot_task.stop()
+
+    def test_percent_size_waits_for_a_snapshot_after_our_trade(self):
+        recall_config.snapshot_refresh_interval = 0
+        with MockExchange() as url:
+            recall_config.base_url = url
+            recall = RecallSpot()
+            recall.snapshot = RecallSnapshot(PORTFOLIO, BALANCES, TRADES)
+            self.assertEqual(recall.size_from_snapshot('USDC', 'mainnet', '50%'), '45.0')
+            self.assertIsNotNone(recall.execute_trade('0xa', '0xb', '45'))
+            # the balance it would size from was spent by the trade
+            with self.assertRaises(ValueError):
+                recall.size_from_snapshot('USDC', 'mainnet', '50%')
+            recall.snapshot = RecallSnapshot(PORTFOLIO, BALANCES, TRADES, previous=recall.snapshot)
+            self.assertEqual(recall.size_from_snapshot('USDC', 'mainnet', '50%'), '45.0')
+
+    def test_unknown_token_fails_before_trading(self):
+        recall_config.snapshot_refresh_interval = 0
+        with MockExchange() as url:
+            recall_config.base_url = url
+            recall = RecallSpot()
+            trades = []
+            recall.execute_trade = lambda **trade: trades.append(trade)
+            recall.set_data({'side': 'buy', 'base': 'NOTATOKEN', 'quote': 'USDC', 'size': '10'})
+            with self.assertRaises(ValueError):
+                recall.run()
+            self.assertEqual(trades, [])
@@ -0,0 +1,72 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from components.actions.recall_spot import KNOWN_TOKENS, RecallTokenResolver, build_token_mappings, normalize_address
+
+PORTFOLIO = [
+    {'token': '0x514910771AF9Ca656af840dff83E8264EcF986CA', 'symbol': 'link', 'chain': 'evm'},
+    {'token': 'So11111111111111111111111111111111111111112', 'symbol': 'SOL', 'chain': 'svm', 'specificChain': 'svm'},
+]
+
+
+class TestRecallTokenResolver(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'tokens.json')
+        self.calls = 0
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def loader(self):
+        self.calls += 1
+        return PORTFOLIO
+
+    def resolver(self):
+        return RecallTokenResolver(self.loader, self.path, ttl=3600, negative_ttl=300)
+
+    def test_seeded_and_case_insensitive(self):
+        resolver = self.resolver()
+        self.assertEqual(resolver.resolve('weth'), '0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2')
+        self.assertEqual(resolver.resolve('ETH'), resolver.resolve('WETH'))
+        self.assertEqual(resolver.symbol_for('0xC02AAA39B223FE8D0A0E5C4F27EAD9083C756CC2'), 'WETH')
+        self.assertEqual(normalize_address('So11111111111111111111111111111111111111112'),
+                         'So11111111111111111111111111111111111111112')
+        self.assertEqual(self.calls, 0)
+
+    def test_negative_cache_requests_one_refresh(self):
+        resolver = self.resolver()
+        wakes = []
+        resolver.on_miss = lambda: wakes.append(1)
+        self.assertIsNone(resolver.resolve('LINK'))
+        self.assertIsNone(resolver.resolve('link'))
+        self.assertEqual(len(wakes), 1)
+        self.assertEqual(self.calls, 0)
+
+        resolver.refresh()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(resolver.resolve('LINK'), '0x514910771af9ca656af840dff83e8264ecf986ca')
+        self.assertFalse(resolver.misses)
+
+    def test_refresh_shared_through_file(self):
+        first = self.resolver()
+        first.refresh()
+        first.refresh()
+        self.assertEqual(self.calls, 1)
+
+        # another worker starts from the saved mappings and skips the API while they are fresh
+        second = self.resolver()
+        self.assertEqual(second.resolve('LINK'), first.resolve('LINK'))
+        second.refresh()
+        self.assertEqual(self.calls, 1)
+
+    def test_duplicate_symbols(self):
+        relisted = [
+            {'token': '0x514910771AF9Ca656af840dff83E8264EcF986CA', 'symbol': 'LINK', 'chain': 'evm'},
+            {'token': '0x0000000000000000000000000000000000000001', 'symbol': 'LINK', 'chain': 'evm'},
+        ]
+        # the portfolio's last listing wins, the seeded list keeps mainnet USDC (listed first)
+        self.assertEqual(build_token_mappings(relisted)['mainnet']['LINK'], '0x0000000000000000000000000000000000000001')
+        self.assertEqual(build_token_mappings(KNOWN_TOKENS, first_wins=True)['mainnet']['USDC'],
+                         '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48')
@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+from components.actions.base.action import Action, ActionManager
+from components.events.base.event import Event, EventManager
+from utils.registry_cache import RegistryVersion, VersionedCache, registry_version
+
+
+class CachedAction(Action):
+    objects = ActionManager()
+
+    def run(self, *args, **kwargs):
+        pass
+
+
+class CachedEvent(Event):
+    pass
+
+
+class TestVersionedCache(TestCase):
+    def test_built_once_per_version(self):
+        version = RegistryVersion()
+        cache = VersionedCache(version)
+        renders = []
+
+        def build():
+            renders.append(version.value)
+            return f'page {len(renders)}'
+
+        first = cache.get('dashboard', build)
+        self.assertEqual(cache.get('dashboard', build), first)
+        self.assertEqual(renders, [0])
+
+        version.bump()
+        page, etag = cache.get('dashboard', build)
+        self.assertEqual(page, 'page 2')
+        self.assertNotEqual(etag, first[1])
+        # views are cached separately
+        self.assertNotEqual(cache.get('registry', lambda: '{}')[1], etag)
+
+
+class TestRegistryVersion(TestCase):
+    def assertBumps(self, change, expected=True):
+        before = registry_version.value
+        change()
+        self.assertEqual(registry_version.value != before, expected)
+
+    def test_registry_changes_bump_the_version(self):
+        manager = EventManager()
+        event = CachedEvent()
+        action = CachedAction()
+
+        self.assertBumps(action.register)
+        self.assertBumps(lambda: manager.add(event))
+        self.assertBumps(lambda: event.add_action(action, 'symbol == EURUSD'))
+        self.assertBumps(lambda: setattr(event, 'active', False))
+        self.assertBumps(lambda: setattr(event, 'active', False), expected=False)
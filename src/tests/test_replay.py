@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+
+from components.actions.mt5_demo_mock import Mt5DemoMock, SimulatedTerminal
+from components.events.base.event import Event
+from components.logs.log_event import LogEvent
+from utils.pnl_engine import PnLEngine
+from utils.price_feed import PriceFeed
+from utils.replay import PayloadRecorder, Replay, parse_time, read_payloads
+from utils.risk import RiskConfig, RiskEngine
+
+START = 1700000000
+
+
+class ReplayEvent(Event):
+    pass
+
+
+class TestReadPayloads(TestCase):
+    def test_parse_time(self):
+        self.assertEqual(parse_time(START), START)
+        self.assertEqual(parse_time(START * 1000), START)
+        self.assertEqual(parse_time('2023-11-14T22:13:20Z'), START)
+        self.assertEqual(parse_time(str(START)), START)
+        self.assertIsNone(parse_time('soon'))
+
+    def test_recorded_and_bare_payloads(self):
+        handle, path = tempfile.mkstemp(suffix='.ndjson')
+        os.close(handle)
+        try:
+            recorder = PayloadRecorder(path)
+            recorder.write({'key': 'a'})
+            recorder.write({'key': 'b', 'time': START})
+            recorder.close()
+            with open(path, 'a') as records:
+                # blank, not JSON, and JSON that isn't an object: all skipped
+                records.write('\nnot json\n[1]\n"key"\n')
+                records.write(json.dumps({'key': 'c', 'timenow': '2023-11-14T22:13:20Z'}) + '\n')
+
+            records = list(read_payloads(path))
+        finally:
+            os.remove(path)
+
+        self.assertEqual([payload['key'] for _, payload in records], ['a', 'b', 'c'])
+        # received time when the payload has none of its own
+        self.assertGreater(records[0][0], START)
+        self.assertEqual(records[1][0], START)
+        self.assertEqual(records[2][0], START)
+
+
+class TestReplay(TestCase):
+    def setUp(self):
+        self.write = patch.object(LogEvent, 'write', lambda self: None)
+        self.write.start()
+        frame = pd.DataFrame({
+            'time': [START + 60 * i for i in range(6)],
+            'open': [1.1000, 1.1000, 1.1010, 1.1030, 1.1040, 1.1050],
+            'high': [1.1005, 1.1012, 1.1035, 1.1041, 1.1052, 1.1055],
+            'low': [1.0995, 1.0998, 1.1008, 1.1025, 1.1035, 1.1045],
+            'close': [1.1000, 1.1010, 1.1030, 1.1040, 1.1050, 1.1050],
+        })
+        self.action = Mt5DemoMock(terminal=SimulatedTerminal(1, 'demo', PriceFeed(frame, symbol='EURUSD')))
+        self.action.pnl = PnLEngine()
+        self.action.risk = RiskEngine(RiskConfig(), self.action.pnl)
+        self.event = ReplayEvent()
+        self.event.add_action(self.action)
+
+    def tearDown(self):
+        self.action.gateway.stop()
+        self.write.stop()
+
+    def test_fills_at_simulated_prices_on_virtual_clock(self):
+        records = [
+            (START, {'key': self.event.key, 'action': 'buy', 'symbol': 'EURUSD', 'volume': '1'}),
+            (START + 180, {'key': 'someone-else', 'action': 'buy', 'symbol': 'EURUSD', 'volume': '1'}),
+            (START + 240, {'key': self.event.key, 'action': 'positions', 'symbol': 'EURUSD'}),
+        ]
+        replay = Replay([self.event], risk=self.action.risk, pnl=self.action.pnl)
+        report = replay.run(records)
+
+        self.assertEqual(report['payloads'], 3)
+        self.assertEqual(report['triggered'], 2)
+        self.assertEqual(report['unrouted'], 1)
+        self.assertEqual(report['simulated_seconds'], 240)
+        self.assertEqual(report['actions']['Mt5DemoMock'], {'runs': 2, 'errors': 0})
+        self.assertEqual(report['risk']['fills'], 1)
+        # bought at the first bar's close, marked at the close of the last bar closed by START + 240
+        self.assertEqual(report['pnl']['unrealized']['USD'], round((1.1040 - 1.1000) * 100000, 2))
+
+    def test_stop_loss_realized_in_report(self):
+        records = [
+            (START, {'key': self.event.key, 'action': 'sell', 'symbol': 'EURUSD', 'volume': '1',
+                     'stop_loss': '1.1020'}),
+            # only moves the clock past the stop; nothing asks the terminal for its positions
+            (START + 240, {'key': 'someone-else'}),
+        ]
+        report = Replay([self.event], risk=self.action.risk, pnl=self.action.pnl).run(records)
+
+        # sold at the first bar's close, stopped out inside the third bar (closed at START + 180)
+        loss = round((1.1000 - 1.1020) * 100000, 2)
+        self.assertEqual(report['pnl']['positions'], 0)
+        self.assertEqual(report['pnl']['realized'], {'USD': loss})
+        self.assertEqual(report['pnl']['unrealized'], {'USD': 0})
+        self.assertEqual(report['risk']['fills'], 2)
+        self.assertEqual(report['risk']['exposure'], {})
+        self.assertEqual(report['risk']['daily_pnl'], {'USD': loss})
+
+    def test_risk_engine_runs_on_virtual_clock(self):
+        config = RiskConfig()
+        config.max_orders_per_minute = 1
+        self.action.risk = risk = RiskEngine(config, self.action.pnl)
+        records = [(START + 30 * i, {'action': 'buy', 'symbol': 'EURUSD', 'volume': '0.1'}) for i in range(6)]
+
+        with patch('components.events.base.event.get_risk_engine', return_value=risk):
+            report = Replay([self.event], route_to=self.event, risk=risk).run(records)
+
+        # one order per simulated minute gets through, however fast the replay runs
+        self.assertEqual(report['risk']['accepted'], 3)
+        self.assertEqual(report['risk']['rejected'], {'max_orders_per_minute': 3})
@@ -0,0 +1,70 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from utils.resilience import Resilience, ResilienceConfig, CircuitOpenError, endpoint_key, OPEN, CLOSED
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+def make_resilience(**overrides):
+    config = ResilienceConfig()
+    config.max_attempts = 3
+    config.base_delay = 0
+    config.failure_threshold = 2
+    config.reset_timeout = 60
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return Resilience(config)
+
+
+class TestResilience(TestCase):
+    def test_endpoint_key(self):
+        self.assertEqual(endpoint_key('bitso', 'delete', 'https://x/api/v3/orders/aBc123XyZ9?x=1'),
+                         'bitso:DELETE /api/v3/orders/{id}')
+
+    def test_retries_idempotent_request(self):
+        resilience = make_resilience(failure_threshold=10)
+        responses = iter([FakeResponse(502), FakeResponse(200)])
+        response = resilience.call('bitso', 'GET', 'https://x/v3/balance', lambda: next(responses))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(resilience.retries, 1)
+
+    def test_does_not_retry_order_that_may_have_executed(self):
+        resilience = make_resilience(failure_threshold=10)
+        calls = []
+
+        def send():
+            calls.append(1)
+            raise requests.exceptions.ReadTimeout('read timed out')
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            resilience.call('bitso', 'POST', 'https://x/v3/orders', send)
+        self.assertEqual(len(calls), 1)
+
+    def test_retries_rate_limited_order(self):
+        resilience = make_resilience(failure_threshold=10)
+        responses = iter([FakeResponse(429), FakeResponse(200)])
+        response = resilience.call('bitso', 'POST', 'https://x/v3/orders', lambda: next(responses))
+        self.assertEqual(response.status_code, 200)
+
+    def test_breaker_opens_and_recovers(self):
+        resilience = make_resilience(max_attempts=1)
+        url = 'https://x/v3/balance'
+        for _ in range(2):
+            resilience.call('bitso', 'GET', url, lambda: FakeResponse(503))
+        breaker = resilience.breaker(endpoint_key('bitso', 'GET', url))
+        self.assertEqual(breaker.state, OPEN)
+
+        with self.assertRaises(CircuitOpenError):
+            resilience.call('bitso', 'GET', url, lambda: FakeResponse(200))
+
+        with patch('utils.resilience.time.monotonic', return_value=breaker.opened_at + 61):
+            response = resilience.call('bitso', 'GET', url, lambda: FakeResponse(200))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(breaker.state, CLOSED)
@@ -0,0 +1,145 @@
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from components.actions.base.action import Action
+from components.events.base.event import Event
+from components.logs.log_event import LogEvent
+from utils.risk import OrderIntent, RiskCheck, RiskConfig, RiskEngine, RiskRejected, parse_limits
+
+
+def _config(**limits):
+    config = RiskConfig()
+    config.max_order_size = parse_limits(limits.get('max_order_size'))
+    config.max_position = parse_limits(limits.get('max_position'))
+    config.max_orders_per_minute = limits.get('max_orders_per_minute', 0)
+    config.max_daily_loss = parse_limits(limits.get('max_daily_loss'))
+    return config
+
+
+class OrderAction(Action):
+    def __init__(self):
+        super().__init__()
+        self.sent = 0
+
+    def order_intent(self, data, strategy):
+        return OrderIntent(strategy, data['symbol'], data['side'], float(data['size']))
+
+    def run(self, *args, **kwargs):
+        self.sent += 1
+
+
+class RiskEvent(Event):
+    pass
+
+
+class TestRiskEngine(TestCase):
+    def test_parse_limits(self):
+        self.assertEqual(parse_limits('2'), {'*': 2.0})
+        self.assertEqual(parse_limits('EURUSD=5, btc_mxn=0.01,*=1'), {'EURUSD': 5.0, 'BTC_MXN': 0.01, '*': 1.0})
+        self.assertEqual(parse_limits(None), {})
+
+    def test_max_order_size_per_symbol(self):
+        engine = RiskEngine(_config(max_order_size='EURUSD=1,*=0.5'))
+        engine.check(OrderIntent('s', 'EURUSD', 'buy', 1.0))
+        with self.assertRaises(RiskRejected) as rejected:
+            engine.check(OrderIntent('s', 'GBPUSD', 'buy', 1.0))
+        self.assertEqual(rejected.exception.check, 'max_order_size')
+        # sizes only known at the exchange aren't size-checked
+        engine.check(OrderIntent('s', 'GBPUSD', 'buy', None))
+
+    def test_max_position_allows_reducing_orders(self):
+        engine = RiskEngine(_config(max_position='2'))
+        engine.pnl.open('a', 'EURUSD', 'buy', 1.5, 1.1000)
+        engine.check(OrderIntent('s', 'EURUSD', 'buy', 0.5))
+        with self.assertRaises(RiskRejected):
+            engine.check(OrderIntent('s', 'EURUSD', 'buy', 1.0))
+        engine.check(OrderIntent('s', 'EURUSD', 'sell', 3.0))
+        with self.assertRaises(RiskRejected):
+            engine.check(OrderIntent('s', 'EURUSD', 'sell', 4.0))
+
+        engine.pnl.close('a')
+        self.assertEqual(engine.exposure(), {})
+
+    def test_max_position_counts_spot_holdings(self):
+        engine = RiskEngine(_config(max_position='btc_mxn=0.1'))
+        engine.pnl.trade('btc_mxn', 'buy', 0.08)
+        with self.assertRaises(RiskRejected):
+            engine.check(OrderIntent('s', 'btc_mxn', 'buy', 0.05))
+        engine.pnl.trade('btc_mxn', 'sell', 0.08)
+        engine.check(OrderIntent('s', 'btc_mxn', 'buy', 0.05))
+
+    def test_orders_per_minute_per_strategy(self):
+        engine = RiskEngine(_config(max_orders_per_minute=3))
+        for _ in range(3):
+            engine.check(OrderIntent('fast', 'EURUSD', 'buy', 0.1))
+        with self.assertRaises(RiskRejected):
+            engine.check(OrderIntent('fast', 'EURUSD', 'buy', 0.1))
+        engine.check(OrderIntent('slow', 'EURUSD', 'buy', 0.1))
+
+        now = time.time()
+        engine.clock = lambda: now + 61
+        engine.check(OrderIntent('fast', 'EURUSD', 'buy', 0.1))
+        self.assertEqual(engine.rejected, {'max_orders_per_minute': 1})
+
+    def test_daily_loss_counts_realized_and_open(self):
+        engine = RiskEngine(_config(max_daily_loss='100'))
+        engine.record_fill('EURUSD', realized=-60.0)
+        engine.pnl.update_prices({'EURUSD': (1.1000, 1.1002)})
+        engine.pnl.open('a', 'EURUSD', 'buy', 1.0, 1.1000, contract_size=1000)
+        engine.check(OrderIntent('s', 'EURUSD', 'buy', 0.1))
+        engine.pnl.update_prices({'EURUSD': (1.0600, 1.0602)})
+        with self.assertRaises(RiskRejected) as rejected:
+            engine.check(OrderIntent('s', 'EURUSD', 'buy', 0.1))
+        self.assertEqual(rejected.exception.check, 'max_daily_loss')
+
+    def test_daily_loss_per_currency(self):
+        engine = RiskEngine(_config(max_daily_loss='USD=100,JPY=10000'))
+        engine.pnl.update_prices({'EURUSD': (1.1500, 1.1502), 'USDJPY': (141.00, 141.02)})
+        engine.pnl.open('a', 'EURUSD', 'buy', 1.0, 1.1000, contract_size=1000)
+        engine.pnl.open('b', 'USDJPY', 'buy', 1.0, 150.00, contract_size=1000)
+        engine.record_fill('USDJPY', realized=-2000.0)
+        self.assertAlmostEqual(engine.daily_pnl('USD'), 50.0)
+        self.assertAlmostEqual(engine.daily_pnl('JPY'), -11000.0)
+        # a yen loss doesn't stop dollar symbols, and a dollar gain doesn't offset it
+        engine.check(OrderIntent('s', 'EURUSD', 'buy', 0.1))
+        with self.assertRaises(RiskRejected):
+            engine.check(OrderIntent('s', 'EURJPY', 'buy', 0.1))
+
+    def test_custom_checks(self):
+        class NoSells(RiskCheck):
+            name = 'no_sells'
+
+            def check(self, intent, engine):
+                if intent.side == 'sell':
+                    raise RiskRejected(self.name, 'sells are disabled')
+
+        engine = RiskEngine(_config())
+        engine.add_check(NoSells())
+        with self.assertRaises(RiskRejected):
+            engine.check(OrderIntent('s', 'EURUSD', 'sell', 0.1))
+
+    def test_checks_take_microseconds(self):
+        engine = RiskEngine(_config(max_order_size='1', max_position='1000000', max_orders_per_minute=10 ** 9,
+                                    max_daily_loss='1000'))
+        intent = OrderIntent('s', 'EURUSD', 'buy', 0.1)
+        start = time.perf_counter()
+        for _ in range(10000):
+            engine.check(intent)
+        self.assertLess((time.perf_counter() - start) / 10000, 50e-6)
+
+
+class TestEventRiskStage(TestCase):
+    def test_rejected_orders_skip_the_action(self):
+        with patch.object(LogEvent, 'write', lambda self: None):
+            event, action = RiskEvent(), OrderAction()
+            event.add_action(action)
+            engine = RiskEngine(_config(max_order_size='1'))
+            with patch('components.events.base.event.get_risk_engine', return_value=engine):
+                event.trigger(data={'key': event.key, 'symbol': 'EURUSD', 'side': 'buy', 'size': '0.5'})
+                event.trigger(data={'key': event.key, 'symbol': 'EURUSD', 'side': 'buy', 'size': '5'})
+
+        self.assertEqual(action.sent, 1)
+        self.assertEqual(action.logs[-1].status, 'REJECTED')
+        self.assertEqual(engine.accepted, 1)
+        self.assertEqual(engine.rejected, {'max_order_size': 1})
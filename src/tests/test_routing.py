@@ -0,0 +1,93 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from components.actions.base.action import Action
+from components.events.base.event import Event
+from components.logs.log_event import LogEvent
+from utils.routing import RouteError, RoutingIndex, parse_rule
+
+
+class RecordingAction(Action):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.payloads = []
+
+    def run(self, *args, **kwargs):
+        self.payloads.append(self.validate_data())
+
+
+class RoutedEvent(Event):
+    pass
+
+
+class TestParseRule(TestCase):
+    def test_clauses(self):
+        rule = parse_rule('symbol in {EURUSD, "gbpusd"} AND strategy = Scalper and volume >= 0.5 and side not in [close]')
+        self.assertEqual([str(condition) for condition in rule], [
+            'symbol in {eurusd, gbpusd}', 'strategy == scalper', 'volume >= 0.5', 'side not in {close}',
+        ])
+        self.assertEqual(parse_rule(None), [])
+
+    def test_invalid(self):
+        for rule in ('symbol', 'symbol ==', 'volume > lots', 'symbol in {EURUSD,}'):
+            with self.assertRaises(RouteError, msg=rule):
+                parse_rule(rule)
+
+
+class TestRoutingIndex(TestCase):
+    def test_equality_and_residual(self):
+        index = RoutingIndex()
+        index.add('fx', 'symbol in {EURUSD, GBPUSD}')
+        index.add('scalper-sells', 'strategy == scalper and side == sell and volume < 1')
+        index.add('everything')
+        index.add('not-fx', 'symbol not in {EURUSD, GBPUSD}')
+
+        self.assertEqual(index.match({'symbol': 'eurusd'}), ['fx', 'everything'])
+        self.assertEqual(index.match({'symbol': 'BTCUSD', 'strategy': 'Scalper', 'side': 'SELL', 'volume': '0.5'}),
+                         ['scalper-sells', 'everything', 'not-fx'])
+        self.assertEqual(index.match({'strategy': 'scalper', 'side': 'sell', 'volume': 'lots'}), ['everything'])
+
+    def test_targets_routed_once_in_link_order(self):
+        index = RoutingIndex()
+        index.add('b', 'strategy == x')
+        index.add('a', 'symbol == eurusd')
+        index.add('b', 'symbol == eurusd')
+        self.assertEqual(index.match({'symbol': 'EURUSD', 'strategy': 'x'}), ['b', 'a'])
+        index.remove('b')
+        self.assertEqual(index.match({'symbol': 'EURUSD', 'strategy': 'x'}), ['a'])
+
+    def test_thousands_of_rules_share_one_table(self):
+        index = RoutingIndex()
+        for i in range(5000):
+            index.add(i, f'strategy == s{i} and symbol in {{EURUSD, GBPUSD}}')
+        self.assertEqual(index.match({'strategy': 's4321', 'symbol': 'GBPUSD'}), [4321])
+        self.assertEqual(len(index.compile()), 1)
+
+
+class TestEventRouting(TestCase):
+    def setUp(self):
+        self.write = patch.object(LogEvent, 'write', lambda self: None)
+        self.write.start()
+        self.event = RoutedEvent()
+        self.fx = RecordingAction('Fx')
+        self.crypto = RecordingAction('Crypto')
+        self.event.add_action(self.fx, 'symbol in {EURUSD, GBPUSD}')
+        self.event.add_action(self.crypto, 'symbol == BTCMXN')
+
+    def tearDown(self):
+        self.write.stop()
+
+    def test_payload_runs_only_matching_actions(self):
+        self.event.trigger(data={'key': self.event.key, 'symbol': 'GBPUSD'})
+        self.event.trigger(data={'key': self.event.key, 'symbol': 'btcmxn'})
+        self.event.trigger(data={'key': self.event.key, 'symbol': 'XAUUSD'})
+
+        self.assertEqual([payload['symbol'] for payload in self.fx.payloads], ['GBPUSD'])
+        self.assertEqual([payload['symbol'] for payload in self.crypto.payloads], ['btcmxn'])
+        self.assertEqual(len(self.event.logs), 3)
+
+    def test_invalid_rule_is_not_linked(self):
+        with self.assertRaises(RouteError):
+            self.event.add_action(RecordingAction('Broken'), 'symbol ~ EURUSD')
+        self.assertEqual(len(self.event._actions), 2)
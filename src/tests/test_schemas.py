@@ -0,0 +1,101 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch
+
+from components.actions.base.action import Action
+from components.events.base.event import Event
+from components.logs.log_event import LogEvent
+from components.schemas.base.schema import Field, Schema, SchemaError
+from components.schemas.trading import BitsoOrder, MT5Order, Order, Position
+
+
+class CountingAction(Action):
+    schema = MT5Order
+
+    def __init__(self):
+        super().__init__()
+        self.payloads = []
+
+    def run(self, *args, **kwargs):
+        self.payloads.append(self.validate_data())
+
+
+class SchemaEvent(Event):
+    pass
+
+
+class TestSchema(TestCase):
+    def test_coerces_tradingview_strings(self):
+        data = MT5Order.validate({'key': 'k', 'action': 'BUY', 'symbol': 'eurusd', 'volume': ' 0.10 ',
+                                  'stop_loss': '1.0950', 'take_profit': ''})
+        self.assertEqual(data, {'key': 'k', 'action': 'buy', 'symbol': 'EURUSD', 'volume': 0.1,
+                                'order_type': 'market', 'stop_loss': 1.095})
+
+    def test_reports_every_error(self):
+        with self.assertRaises(SchemaError) as raised:
+            MT5Order.validate({'action': 'hold', 'volume': '{{strategy.order.contracts}}', 'ticket': '1.5'})
+        errors = raised.exception.errors
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(errors[0].startswith('action must be one of'))
+
+    def test_cross_field_rules(self):
+        with self.assertRaises(SchemaError):
+            MT5Order.validate({'action': 'close'})
+        with self.assertRaises(SchemaError):
+            BitsoOrder.validate({'side': 'buy'})
+        self.assertEqual(BitsoOrder.validate({'side': 'cancel'})['book'], 'btc_mxn')
+        self.assertEqual(BitsoOrder.validate({'side': 'sell', 'size': '25 %'})['size'], '25%')
+        with self.assertRaises(SchemaError):
+            BitsoOrder.validate({'side': 'sell', 'size': '250%'})
+        with self.assertRaises(SchemaError):
+            Order.validate({'side': 'buy', 'quantity': '1', 'symbol': 'x', 'order_type': 'limit'})
+
+    def test_inheritance_and_aliases(self):
+        class Base(Schema):
+            symbol = Field(str, required=True, case='upper', aliases=('ticker',))
+
+        class Child(Base):
+            qty = Field(int, minimum=1, default=1)
+
+        self.assertEqual(Child.validate({'ticker': 'btcusd'}), {'ticker': 'btcusd', 'symbol': 'BTCUSD', 'qty': 1})
+        self.assertIsNot(Child.__dict__['_compiled'], Base.compile())
+
+    def test_example_json(self):
+        self.assertEqual(json.loads(MT5Order().as_json())['volume'], 0.1)
+
+    def test_examples_pass_their_own_validation(self):
+        for schema in (Order, Position, BitsoOrder, MT5Order):
+            schema.validate(json.loads(schema().as_json()))
+
+
+class TestIngressValidation(TestCase):
+    def setUp(self):
+        self.write = patch.object(LogEvent, 'write', lambda self: None)
+        self.write.start()
+        self.event = SchemaEvent()
+        self.action = CountingAction()
+        self.event.add_action(self.action)
+
+    def tearDown(self):
+        self.write.stop()
+
+    def test_malformed_payload_rejected_before_actions(self):
+        with self.assertRaises(SchemaError):
+            self.event.trigger(data={'key': self.event.key, 'action': 'buy', 'volume': 'lots'})
+        self.assertEqual(self.action.payloads, [])
+        self.assertEqual(len(self.event.logs), 0)
+
+    def test_actions_receive_normalized_payloads(self):
+        self.event.trigger(data={'key': self.event.key, 'action': 'Sell', 'volume': '2'})
+        self.assertEqual(self.action.payloads[0]['volume'], 2.0)
+        self.assertEqual(self.action.payloads[0]['action'], 'sell')
+
+    def test_only_accepting_actions_run(self):
+        other = CountingAction()
+        other.schema = BitsoOrder
+        self.event.add_action(other)
+        self.event.trigger(data={'key': self.event.key, 'action': 'buy'})
+
+        self.assertEqual(len(self.action.payloads), 1)
+        self.assertEqual(other.payloads, [])
+        self.assertEqual(other.logs[-1].status, 'REJECTED')
@@ -0,0 +1,93 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from components.actions.process_signal import MIN_HISTORY, ProcessSignal
+from components.logs.log_event import LogEvent
+from utils.signal_analytics import SignalAnalytics, SignalWindow
+
+START = 1700000000
+
+
+def _expected(frame: pd.DataFrame) -> dict:
+    """Recomputes the window statistics from scratch with pandas"""
+    nxt = frame['price'].shift(-1)
+    directional = frame['direction'] != 0
+    resolved = directional & nxt.notna()
+    hits = ((nxt - frame['price']) * frame['direction'] > 0) & resolved
+    return {'count': len(frame), 'avg_confidence': frame['confidence'].mean(),
+            'hit_rate': hits.sum() / resolved.sum(),
+            'confidence_median': frame['confidence'].median()}
+
+
+class TestSignalWindow(TestCase):
+    def test_running_totals_match_full_recompute(self):
+        rng = np.random.default_rng(4)
+        window = SignalWindow(capacity=50)
+        rows = []
+        for i in range(400):
+            direction = int(rng.choice([1, -1, 0]))
+            price, confidence = float(100 + rng.normal()), float(rng.uniform(0, 100))
+            window.push(START + 60 * i, direction, price, confidence)
+            rows.append({'direction': direction, 'price': price, 'confidence': confidence})
+            if i in (10, 49, 50, 51, 399):
+                frame = pd.DataFrame(rows[-50:])
+                expected = _expected(frame)
+                stats = window.stats()
+                self.assertEqual(stats['count'], expected['count'])
+                self.assertAlmostEqual(stats['avg_confidence'], expected['avg_confidence'], places=3)
+                self.assertAlmostEqual(stats['hit_rate'], expected['hit_rate'], places=3)
+                self.assertAlmostEqual(stats['confidence_median'], expected['confidence_median'])
+                self.assertAlmostEqual(stats['signals_per_hour'], 60.0)
+
+    def test_flip_rate(self):
+        window = SignalWindow(capacity=10)
+        for i, direction in enumerate([1, 1, -1, 0, -1, 1]):
+            window.push(START + i, direction, 100.0, 50.0)
+        # 5 directional signals, 2 of the 4 transitions between them change direction
+        self.assertEqual(window.stats()['flip_rate'], 0.5)
+
+    def test_keyed_by_strategy_and_symbol(self):
+        analytics = SignalAnalytics(window=10)
+        analytics.record('trend', 'eurusd', 'buy', 1.1, 70, START)
+        analytics.record('trend', 'EURUSD', 'sell', 1.2, 90, START + 60)
+        analytics.record('mean', 'EURUSD', 'buy', 1.1, 40, START)
+
+        self.assertEqual(analytics.stats('trend', 'EURUSD')['count'], 2)
+        self.assertEqual(analytics.stats('trend', 'EURUSD')['hit_rate'], 1.0)
+        self.assertEqual(list(analytics.as_json(strategy='mean')), ['mean'])
+        self.assertEqual(analytics.stats('none', 'EURUSD'), {'count': 0})
+
+
+class TestProcessSignal(TestCase):
+    def setUp(self):
+        self.write = patch.object(LogEvent, 'write', lambda self: None)
+        self.write.start()
+        self.action = ProcessSignal()
+        self.action.analytics = SignalAnalytics()
+
+    def tearDown(self):
+        self.write.stop()
+
+    def _signal(self, i, action, price, confidence):
+        self.action.set_data({'symbol': 'EURUSD', 'strategy': 'trend', 'action': action, 'price': price,
+                              'confidence': confidence, 'timestamp': START + 60 * i})
+        self.action.run()
+        return self.action.analytics.stats('trend', 'EURUSD')
+
+    def test_thresholds_come_from_history(self):
+        # fixed thresholds until there is enough history
+        info = {'confidence': 85}
+        self.assertEqual(self.action._analyze_signal(info, {'count': 1})['signal_strength'], 'Strong')
+
+        # a strategy whose buys keep being followed by higher prices, with confidence always 85-95
+        for i in range(MIN_HISTORY):
+            stats = self._signal(i, 'buy', 1.0 + i / 100, 85 + i % 10)
+        self.assertEqual(stats['hit_rate'], 1.0)
+
+        # 85 is low for this strategy, 95 is in its top quartile
+        self.assertEqual(self.action._analyze_signal({'confidence': 85}, stats)['signal_strength'], 'Weak')
+        self.assertEqual(self.action._analyze_signal({'confidence': 95}, stats)['signal_strength'], 'Strong')
+        self.assertEqual(self.action._analyze_signal({'confidence': 95}, stats)['risk_level'], 'Low')
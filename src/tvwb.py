@@ -1,5 +1,6 @@
 import json
 import os
+from contextlib import ExitStack
 from subprocess import run
 
 import typer
@@ -136,13 +137,17 @@ def add_action_to_settings(
 @app.command('action:link')
 def action_link(
         action_name: str,
-        event_name: str
+        event_name: str,
+        when: str = typer.Option(
+            None,
+            help='Routing rule on payload fields, e.g. "symbol in {EURUSD, GBPUSD} and strategy == scalper".',
+        )
 ):
     """
     Links an action to an event.
     """
-    logger.info(f'Setting {event_name} to trigger --->\t{action_name}')
-    link_action_to_event(action_name, event_name)
+    logger.info(f'Setting {event_name} to trigger --->\t{action_name}' + (f' when {when}' if when else ''))
+    link_action_to_event(action_name, event_name, when)
 
 
 @app.command('action:unlink')
@@ -217,6 +222,102 @@ def trigger_event(name: str):
     return True
 
 
+@app.command('replay')
+def replay(
+        path: str = typer.Argument(..., help='NDJSON file of recorded webhook payloads (see WEBHOOK_RECORD_FILE).'),
+        event: str = typer.Option(
+            default=None,
+            help='Send every payload to this event instead of matching payload keys to events.',
+        ),
+        actions: str = typer.Option(
+            default='Mt5DemoMock',
+            help='Comma-separated actions to run, linked to every event. BitsoSpot runs against a local mock exchange.',
+        ),
+        feed: str = typer.Option(
+            default=None,
+            help='CSV/Parquet price feed Mt5DemoMock fills against (same as MT5_SIM_FEED).',
+        ),
+        output_json: bool = typer.Option(
+            False, '--json',
+            help='Print the report as JSON.',
+        ),
+):
+    """
+    Replays recorded webhooks through the events and actions in-process, on a virtual clock.
+    """
+    import logging
+    # background refreshes would only add wall-clock noise to a simulated run
+    os.environ['MT5_MARK_INTERVAL'] = '0'
+    for setting in ('BITSO_MARKETS_REFRESH', 'BITSO_BALANCE_RECONCILE', 'BITSO_OPEN_ORDERS_POLL'):
+        os.environ.setdefault(setting, '0')
+    if feed:
+        os.environ['MT5_SIM_FEED'] = feed
+    logging.disable(logging.INFO)
+
+    # keep replayed triggers out of the live dashboard log
+    import tempfile
+    from components.logs import log_event
+    log_event.LOG_LOCATION = os.path.join(tempfile.mkdtemp(prefix='tvwb-replay-'), 'log.log')
+    open(log_event.LOG_LOCATION, 'w').close()
+
+    from components.actions.base.action import am
+    from components.events.base.event import em
+    from components.events.base.table import EventTableConfig
+    from settings import REGISTERED_EVENTS
+    from utils.pnl_engine import get_pnl_engine
+    from utils.register import register_action as load_action, register_event as load_event, register_event_table
+    from utils.replay import Replay, read_payloads
+    from utils.risk import get_risk_engine
+
+    action_names = [name.strip() for name in actions.split(',') if name.strip()]
+    try:
+        with ExitStack() as stack:
+            if 'BitsoSpot' in action_names:
+                from benchmarks.mock_exchange import MockExchange
+                from config import bitso_config
+                bitso_config.base_url = stack.enter_context(MockExchange())
+
+            events = [load_event(name) for name in ([event] if event else REGISTERED_EVENTS)]
+            events = [registered for registered in events if registered is not None]
+            if not events:
+                raise typer.BadParameter(f'No events could be registered ({event or REGISTERED_EVENTS})')
+            for name in action_names:
+                if load_action(name) is None:
+                    raise typer.BadParameter(f'Action {name} could not be registered')
+            for registered in events:
+                for action in am.get_all():
+                    registered.add_action(action)
+
+            # table events load on demand with their own links, when a payload's key is theirs
+            table_path = EventTableConfig().path
+            if table_path and not event:
+                register_event_table(table_path, em, am)
+
+            report = Replay(events, route_to=events[0] if event else None, risk=get_risk_engine(),
+                            pnl=get_pnl_engine(), lookup=em.find).run(read_payloads(path))
+    finally:
+        logging.disable(logging.NOTSET)
+
+    if output_json:
+        print(json.dumps(report, indent=2, default=str))
+        return report
+
+    print(f"Replayed {report['payloads']} payloads in {report['elapsed']:.3f}s "
+          f"({report['payloads_per_second']} payloads/s)")
+    if report['speedup']:
+        print(f"Simulated {report['simulated_seconds']:.0f}s of alerts, {report['speedup']}x faster than real time")
+    print(f"Triggered {report['triggered']}, unrouted {report['unrouted']}, errors {report['errors']}")
+    for name, runs in report['actions'].items():
+        print(f"  {name}: {runs['runs']} runs, {runs['errors']} errors")
+    risk, pnl = report['risk'], report['pnl']
+    print(f"Orders accepted {risk['accepted']}, rejected {sum(risk['rejected'].values())}, fills {risk['fills']}")
+    print(f"Open positions {pnl['positions']}")
+    for currency in sorted(set(pnl['realized']) | set(pnl['unrealized'])):
+        print(f"  PnL {currency}: realized {pnl['realized'].get(currency, 0)}, "
+              f"unrealized {pnl['unrealized'].get(currency, 0)}")
+    return report
+
+
 @app.command('util:send-webhook')
 def send_webhook(key: str):
     logger.info(f'Sending webhook')
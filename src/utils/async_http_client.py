@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple, Union
+
+import aiohttp
+import requests
+
+from utils.http_client import HTTPClientConfig
+from utils.log import get_logger
+from utils.rate_limit import RateLimiter, get_rate_limiter
+
+logger = get_logger(__name__)
+
+
+class ConnectError(requests.exceptions.ConnectionError):
+    """The connection could not be established, so the request was never sent"""
+
+
+class AsyncResponse:
+    """
+    Fully read response from the asyncio client. Mirrors the parts of requests.Response
+    the actions use, so sync and async code paths handle responses the same way.
+    """
+
+    __slots__ = ('status_code', 'headers', 'text', 'url', 'reason')
+
+    def __init__(self, status_code: int, headers: Dict[str, str], text: str, url: str, reason: str = ''):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.url = url
+        self.reason = reason
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if not self.ok:
+            # raise the same exception type as the sync path
+            raise requests.HTTPError(f'{self.status_code} Error: {self.reason} for url: {self.url}', response=self)
+
+
+class AsyncHTTPClient:
+    """
+    Shared aiohttp client. aiohttp sessions are bound to an event loop, so one pooled
+    session (and connector) is kept per running loop.
+    """
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None, rate_limiter: Optional[RateLimiter] = None):
+        self.config = config or HTTPClientConfig()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def _timeout(self, timeout: Union[float, Tuple[float, float], None]) -> aiohttp.ClientTimeout:
+        if timeout is None:
+            connect, read = self.config.timeout
+        elif isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect, read = timeout, timeout
+        return aiohttp.ClientTimeout(connect=connect, sock_read=read)
+
+    def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.async_limit,
+                limit_per_host=self.config.async_limit_per_host
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self._timeout(None))
+            self._sessions[loop] = session
+            logger.debug(f'Created pooled async HTTP session: {self.config}')
+        return session
+
+    async def request(self, method: str, url: str, timeout: Union[float, Tuple[float, float], None] = None,
+                      exchange: Optional[str] = None, **kwargs) -> AsyncResponse:
+        """
+        Sends a request over the loop's pooled session and reads the body
+        :param method: HTTP method
+        :param url: full URL
+        :param timeout: seconds, or (connect, read) tuple. Defaults to the configured timeouts.
+        :param exchange: exchange whose rate limits apply; the request waits for a token first
+        :return: AsyncResponse
+        """
+        await self.rate_limiter.acquire_async(exchange, method)
+        # aiohttp errors are raised as their requests equivalents, so callers handle one set of exceptions
+        try:
+            async with self.session().request(method, url, timeout=self._timeout(timeout), **kwargs) as response:
+                text = await response.text()
+                return AsyncResponse(response.status, dict(response.headers), text, str(response.url),
+                                     response.reason or '')
+        except aiohttp.ClientConnectorError as e:
+            raise ConnectError(str(e)) from e
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.Timeout(f'Request to {url} timed out') from e
+        except aiohttp.ClientError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    async def close(self):
+        """Closes the current loop's session"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+_async_http_client = None
+_async_http_client_lock = threading.Lock()
+
+
+def get_async_http_client() -> AsyncHTTPClient:
+    """
+    Gets the process-wide shared asyncio HTTP client
+    :return: AsyncHTTPClient()
+    """
+    global _async_http_client
+    if _async_http_client is None:
+        with _async_http_client_lock:
+            if _async_http_client is None:
+                _async_http_client = AsyncHTTPClient()
+    return _async_http_client
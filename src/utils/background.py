@@ -0,0 +1,59 @@
+import threading
+from typing import Callable
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs `fn` every `interval` seconds on a daemon thread. Errors are logged and the
+    task keeps running, so a failed refresh just leaves the previous data in place.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable, run_immediately: bool = False):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.run_immediately = run_immediately
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running or self.interval <= 0:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f'Started background task {self.name} (every {self.interval}s)')
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Runs the task as soon as possible instead of waiting for the interval"""
+        self._wake.set()
+
+    def run_now(self):
+        try:
+            self.fn()
+        except Exception as e:
+            logger.error(f'Background task {self.name} failed: {e}')
+
+    def _loop(self):
+        if self.run_immediately:
+            self.run_now()
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.run_now()
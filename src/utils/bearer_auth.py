@@ -1,50 +1,109 @@
 import requests
 from typing import Dict, Any, Optional
 
+from utils.async_http_client import AsyncHTTPClient, AsyncResponse, get_async_http_client
+from utils.http_client import HTTPClient, get_http_client
+from utils.resilience import get_resilience
+
 
 class BearerTokenAuthenticator:
     """
     Simple Bearer token authenticator for APIs that use Bearer token authentication
     """
 
-    def __init__(self, api_key: str):
+    SUPPORTED_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+    def __init__(self, api_key: str, http_client: Optional[HTTPClient] = None, exchange: Optional[str] = None):
         self.api_key = api_key
+        self.http = http_client or get_http_client()
+        # name the shared HTTP client rate limits requests under (None = not limited)
+        self.exchange = exchange
+        self.resilience = get_resilience()
 
-    def authenticated_request(self, url: str, method: str = 'GET', body: Optional[Dict[str, Any]] = None, timeout: int = 30) -> requests.Response:
+    def auth_headers(self) -> Dict[str, str]:
+        return {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+    def authenticated_request(self, url: str, method: str = 'GET', body: Optional[Dict[str, Any]] = None, timeout=None) -> requests.Response:
         """
-        Make an authenticated request using Bearer token
+        Make an authenticated request using Bearer token (sent over the shared connection pool)
 
         Args:
             url: The full URL to make the request to
             method: HTTP method (GET, POST, PUT, DELETE)
             body: Request body (will be sent as JSON)
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds, or a (connect, read) tuple. Defaults to the pool's timeouts.
 
         Returns:
             requests.Response object
         """
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
+        method = method.upper()
+        if method not in self.SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        def send():
+            return self.http.request(
+                method=method,
+                url=url,
+                headers=self.auth_headers(),
+                json=body if method in ('POST', 'PUT') else None,
+                timeout=timeout,
+                exchange=self.exchange
+            )
+
+        return self.resilience.call(self.exchange, method, url, send)
+
+
+class AsyncBearerTokenAuthenticator(BearerTokenAuthenticator):
+    """
+    Bearer token authenticator that can also send requests on the asyncio client
+    """
 
-        if method.upper() == 'GET':
-            return requests.get(url, headers=headers, timeout=timeout)
-        elif method.upper() == 'POST':
-            return requests.post(url, json=body, headers=headers, timeout=timeout)
-        elif method.upper() == 'PUT':
-            return requests.put(url, json=body, headers=headers, timeout=timeout)
-        elif method.upper() == 'DELETE':
-            return requests.delete(url, headers=headers, timeout=timeout)
-        else:
+    def __init__(self, api_key: str, http_client: Optional[HTTPClient] = None,
+                 async_http_client: Optional[AsyncHTTPClient] = None, exchange: Optional[str] = None):
+        super().__init__(api_key, http_client, exchange)
+        self.async_http = async_http_client or get_async_http_client()
+
+    async def authenticated_request_async(self, url: str, method: str = 'GET', body: Optional[Dict[str, Any]] = None,
+                                          timeout=None) -> AsyncResponse:
+        """
+        Make an authenticated request using Bearer token on the asyncio connection pool
+        """
+        method = method.upper()
+        if method not in self.SUPPORTED_METHODS:
             raise ValueError(f"Unsupported HTTP method: {method}")
 
+        def send():
+            return self.async_http.request(
+                method=method,
+                url=url,
+                headers=self.auth_headers(),
+                json=body if method in ('POST', 'PUT') else None,
+                timeout=timeout,
+                exchange=self.exchange
+            )
+
+        return await self.resilience.call_async(self.exchange, method, url, send)
+
 
-def create_bearer_authenticator(api_key: str) -> BearerTokenAuthenticator:
+def create_bearer_authenticator(api_key: str, http_client: Optional[HTTPClient] = None,
+                                exchange: Optional[str] = None) -> BearerTokenAuthenticator:
     """
     Factory function to create a Bearer token authenticator
     """
     if not api_key:
         raise ValueError('API key is required')
 
-    return BearerTokenAuthenticator(api_key)
\ No newline at end of file
+    return BearerTokenAuthenticator(api_key, http_client, exchange)
+
+
+def create_async_bearer_authenticator(api_key: str, exchange: Optional[str] = None) -> AsyncBearerTokenAuthenticator:
+    """
+    Factory function to create a Bearer token authenticator with async request support
+    """
+    if not api_key:
+        raise ValueError('API key is required')
+
+    return AsyncBearerTokenAuthenticator(api_key, exchange=exchange)
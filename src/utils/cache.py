@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+class CachedValue:
+    """
+    A single value produced by `loader` and considered fresh for `ttl` seconds.
+    Reads return the cached value; a stale value is reloaded on read, and a failed
+    load (exception or None) keeps the previous value and is not retried on read
+    for `retry_interval` seconds, so an unreachable API doesn't add a round trip to every read.
+    """
+
+    def __init__(self, name: str, loader: Callable, ttl: float, retry_interval: float = 30):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.value = None
+        self.loaded_at: Optional[float] = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl
+
+    def refresh(self):
+        """
+        Reloads the value now
+        :return: the (possibly previous) cached value
+        """
+        with self._lock:
+            try:
+                value = self.loader()
+            except Exception as e:
+                logger.error(f'Refreshing {self.name} failed: {e}')
+                value = None
+            if value is not None:
+                self.value = value
+                self.loaded_at = time.monotonic()
+            else:
+                self._next_attempt = time.monotonic() + self.retry_interval
+            return self.value
+
+    def get(self):
+        if self.stale and time.monotonic() >= self._next_attempt:
+            return self.refresh()
+        return self.value
+
+    def invalidate(self):
+        """Marks the value stale so the next read (or refresh) reloads it"""
+        with self._lock:
+            self.loaded_at = None
+            self._next_attempt = 0.0
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+            self.loaded_at = time.monotonic()
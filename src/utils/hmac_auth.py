@@ -7,6 +7,11 @@ from typing import Dict, Any, Optional
 from urllib.parse import urlparse
 import requests
 
+from utils.async_http_client import AsyncHTTPClient, AsyncResponse, get_async_http_client
+from utils.http_client import HTTPClient, get_http_client
+from utils.nonce import NonceSource, get_nonce_source
+from utils.resilience import get_resilience
+
 
 class HMACAuthConfig:
     def __init__(self, api_key: str, api_secret: str):
@@ -22,19 +27,23 @@ class AuthenticatedRequest:
 
 
 class HMACAuthenticator:
-    def __init__(self, config: HMACAuthConfig):
+    def __init__(self, config: HMACAuthConfig, http_client: Optional[HTTPClient] = None,
+                 nonce_source: Optional[NonceSource] = None, exchange: str = 'bitso'):
         self.api_key = config.api_key
         self.api_secret = config.api_secret
         self.last_nonce = 0
+        self.http = http_client or get_http_client()
+        self.nonce_source = nonce_source or get_nonce_source()
+        # name the shared HTTP client rate limits requests under
+        self.exchange = exchange
+        self.resilience = get_resilience()
 
     def _generate_nonce(self) -> int:
         """
         Generate a unique nonce that increases with each API call
-        Uses UNIX timestamp with additional uniqueness
+        Millisecond UNIX timestamp, strictly increasing across threads and worker processes
         """
-        timestamp = int(time.time())
-        # Ensure nonce is always increasing
-        self.last_nonce = max(self.last_nonce + 1, timestamp)
+        self.last_nonce = self.nonce_source.next()
         return self.last_nonce
 
     def _build_signature_string(self, nonce: int, method: str, path: str, payload: Optional[Any] = None) -> str:
@@ -80,23 +89,36 @@ class HMACAuthenticator:
             'Authorization': auth_header
         }
 
-    def authenticated_request(self, url: str, method: str, body: Optional[Any] = None) -> requests.Response:
+    def headers_for(self, url: str, method: str, body: Optional[Any] = None) -> Dict[str, str]:
         """
-        Create an authenticated HTTP request
+        Sign a request for the given URL and return its headers (shared by the sync and async paths)
         """
         parsed_url = urlparse(url)
         path = parsed_url.path
         if parsed_url.query:
             path += f"?{parsed_url.query}"
 
-        headers = self.authenticate_request(AuthenticatedRequest(method, path, body))
+        return self.authenticate_request(AuthenticatedRequest(method, path, body))
 
-        return requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            json=body if body else None
-        )
+    def authenticated_request(self, url: str, method: str, body: Optional[Any] = None, timeout=None) -> requests.Response:
+        """
+        Create an authenticated HTTP request (sent over the shared connection pool)
+        Failed attempts are retried (re-signed with a fresh nonce) behind the endpoint's circuit breaker
+        """
+        def send():
+            # wait for the rate limit before taking a nonce: orders and reads are throttled separately
+            # but share one nonce sequence, so a request signed before queueing would reach the
+            # exchange after later nonces and be rejected
+            self.http.rate_limiter.acquire(self.exchange, method)
+            return self.http.request(
+                method=method,
+                url=url,
+                headers=self.headers_for(url, method, body),
+                json=body if body else None,
+                timeout=timeout
+            )
+
+        return self.resilience.call(self.exchange, method, url, send)
 
     def validate_response_signature(self, response_body: str, expected_signature: str) -> bool:
         """
@@ -111,14 +133,55 @@ class HMACAuthenticator:
         return calculated_signature == expected_signature
 
 
-def create_hmac_authenticator(api_key: str, api_secret: str) -> HMACAuthenticator:
+class AsyncHMACAuthenticator(HMACAuthenticator):
+    """
+    HMAC authenticator that can also send requests on the asyncio client.
+    Signing and nonces are shared with the sync path, so both may be used on the same instance.
+    """
+
+    def __init__(self, config: HMACAuthConfig, http_client: Optional[HTTPClient] = None,
+                 async_http_client: Optional[AsyncHTTPClient] = None, nonce_source: Optional[NonceSource] = None,
+                 exchange: str = 'bitso'):
+        super().__init__(config, http_client, nonce_source, exchange)
+        self.async_http = async_http_client or get_async_http_client()
+
+    async def authenticated_request_async(self, url: str, method: str, body: Optional[Any] = None,
+                                          timeout=None) -> AsyncResponse:
+        """
+        Create an authenticated HTTP request on the asyncio connection pool
+        """
+        async def send():
+            # rate limit first, then sign (see authenticated_request)
+            await self.async_http.rate_limiter.acquire_async(self.exchange, method)
+            return await self.async_http.request(
+                method=method,
+                url=url,
+                headers=self.headers_for(url, method, body),
+                data=json.dumps(body) if body else None,
+                timeout=timeout
+            )
+
+        return await self.resilience.call_async(self.exchange, method, url, send)
+
+
+def create_hmac_authenticator(api_key: str, api_secret: str, http_client: Optional[HTTPClient] = None) -> HMACAuthenticator:
     """
     Factory function to create an HMAC authenticator
     """
     if not api_key or not api_secret:
         raise ValueError('API key and API secret are required')
 
-    return HMACAuthenticator(HMACAuthConfig(api_key, api_secret))
+    return HMACAuthenticator(HMACAuthConfig(api_key, api_secret), http_client)
+
+
+def create_async_hmac_authenticator(api_key: str, api_secret: str) -> AsyncHMACAuthenticator:
+    """
+    Factory function to create an HMAC authenticator with async request support
+    """
+    if not api_key or not api_secret:
+        raise ValueError('API key and API secret are required')
+
+    return AsyncHMACAuthenticator(HMACAuthConfig(api_key, api_secret))
 
 
 def create_authenticated_headers(api_key: str, api_secret: str, method: str, path: str, body: Optional[Any] = None) -> Dict[str, str]:
@@ -0,0 +1,113 @@
+import os
+import threading
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.log import get_logger
+from utils.rate_limit import RateLimiter, get_rate_limiter
+
+logger = get_logger(__name__)
+
+
+class HTTPClientConfig:
+    """Connection pool and timeout settings for outgoing exchange requests"""
+
+    def __init__(self):
+        # number of per-host pools kept alive, and connections kept per host
+        self.pool_connections = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+        self.pool_maxsize = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))
+        # block instead of opening throwaway connections once a host pool is exhausted
+        self.pool_block = os.getenv('HTTP_POOL_BLOCK', 'false').lower() == 'true'
+        # total / per-host connection limits for the asyncio client (0 = unlimited)
+        self.async_limit = int(os.getenv('HTTP_ASYNC_LIMIT', '1000'))
+        self.async_limit_per_host = int(os.getenv('HTTP_ASYNC_LIMIT_PER_HOST', '0'))
+        self.connect_timeout = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+        self.read_timeout = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+    def __str__(self):
+        return (f"HTTPClientConfig(pool_connections={self.pool_connections}, pool_maxsize={self.pool_maxsize}, "
+                f"timeout={self.timeout})")
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class HTTPClient:
+    """
+    Shared, thread-safe HTTP client backed by a pooled keep-alive requests.Session.
+    Connections are reused per host, so only the first call to an exchange pays DNS/TCP/TLS setup.
+    """
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None, rate_limiter: Optional[RateLimiter] = None):
+        self.config = config or HTTPClientConfig()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self._lock = threading.Lock()
+        self._session = None
+        self._pid = None
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        # sockets must not be shared with a forked (gunicorn) worker, so each process builds its own pool
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    self._session = self._build_session()
+                    self._pid = pid
+                    logger.debug(f'Created pooled HTTP session: {self.config}')
+        return self._session
+
+    def request(self, method: str, url: str, timeout: Union[float, Tuple[float, float], None] = None,
+                exchange: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Sends a request over the pooled session
+        :param method: HTTP method
+        :param url: full URL
+        :param timeout: seconds, or (connect, read) tuple. Defaults to the configured timeouts.
+        :param exchange: exchange whose rate limits apply; the request waits for a token first
+        :return: requests.Response
+        """
+        self.rate_limiter.acquire(exchange, method)
+        return self.session.request(method=method, url=url, timeout=timeout or self.config.timeout, **kwargs)
+
+    def close(self):
+        """Closes all pooled connections"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """
+    Gets the process-wide shared HTTP client
+    :return: HTTPClient()
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HTTPClient()
+    return _http_client
@@ -4,6 +4,7 @@ import time
 
 from utils.formatting import snake_case
 from utils.log import get_logger
+from utils.routing import RouteError, parse_rule
 
 logger = get_logger(__name__)
 
@@ -47,6 +48,19 @@ def validate_settings():
             logger.critical(f'Event ({event}) is not a string')
             return False
 
+    # make sure every link's routing rule parses
+    try:
+        from settings import REGISTERED_LINKS
+    except ImportError:
+        REGISTERED_LINKS = []
+    for link in REGISTERED_LINKS:
+        if len(link) > 2:
+            try:
+                parse_rule(link[2])
+            except RouteError as e:
+                logger.critical(f'Link ({link[0]}, {link[1]}) has an invalid routing rule: {e}')
+                return False
+
     # make sure all registered actions exist
     for action in REGISTERED_ACTIONS:
         try:
@@ -178,8 +192,8 @@ def add_event(event_name):
     build_settings(events=events)
 
 
-def link_action_to_event(action_name, event_name):
-    """Link action to event in settings.py"""
+def link_action_to_event(action_name, event_name, rule=None):
+    """Link action to event in settings.py, optionally only for payloads matching a routing rule"""
 
     try:
         from settings import REGISTERED_LINKS
@@ -187,7 +201,7 @@ def link_action_to_event(action_name, event_name):
         logger.error('Could not import REGISTERED_LINKS from settings.py')
         return
 
-    links = REGISTERED_LINKS + [(action_name, event_name)]
+    links = REGISTERED_LINKS + [(action_name, event_name, rule) if rule else (action_name, event_name)]
 
     # use set to remove duplicates
     links = list(set(links))
@@ -204,11 +218,9 @@ def unlink_action_to_event(action_name, event_name):
         logger.error('Could not import REGISTERED_LINKS from settings.py')
         return
 
-    links = REGISTERED_LINKS
+    links = [link for link in REGISTERED_LINKS if tuple(link[:2]) != (action_name, event_name)]
 
-    if (action_name, event_name) in links:
-        links.remove((action_name, event_name))
-    else:
+    if len(links) == len(REGISTERED_LINKS):
         logger.warning(f'Link ({action_name}, {event_name}) not found in settings.py')
 
     build_settings(links=links)
@@ -0,0 +1,301 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Iterable
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# MetaTrader5 last_error() codes meaning the terminal connection is gone (IPC send/receive/init/connect/timeout)
+DISCONNECTED_ERRORS = (-10000, -10001, -10002, -10003, -10004, -10005)
+
+
+class MT5GatewayConfig:
+    """MetaTrader 5 gateway settings"""
+
+    def __init__(self):
+        # seconds a caller waits for the terminal to serve its request
+        self.request_timeout = float(os.getenv('MT5_REQUEST_TIMEOUT', '30'))
+        # reconnect attempts after the terminal reports a lost connection
+        self.reconnect_attempts = int(os.getenv('MT5_RECONNECT_ATTEMPTS', '3'))
+        # seconds a quote (symbol_info_tick) is reused before asking the terminal again
+        self.tick_ttl = float(os.getenv('MT5_TICK_TTL', '0.25'))
+
+    def __str__(self):
+        return (f"MT5GatewayConfig(request_timeout={self.request_timeout}, "
+                f"reconnect_attempts={self.reconnect_attempts}, tick_ttl={self.tick_ttl})")
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _hit_rate(hits: int, misses: int):
+    return round(hits / (hits + misses), 4) if hits + misses else None
+
+
+class MT5SymbolCache:
+    """
+    Per-symbol cache: static contract specifications (digits, volume limits and step) are kept
+    for the life of the process, ticks for `tick_ttl` seconds. Loaders are only called on a miss.
+    """
+
+    def __init__(self, tick_ttl: float):
+        self.tick_ttl = tick_ttl
+        self.specs = {}
+        self.ticks = {}
+        self.spec_hits = 0
+        self.spec_misses = 0
+        self.tick_hits = 0
+        self.tick_misses = 0
+        self._lock = threading.Lock()
+
+    def spec(self, symbol: str, load: Callable):
+        spec = self.specs.get(symbol)
+        with self._lock:
+            if spec is not None:
+                self.spec_hits += 1
+                return spec
+            self.spec_misses += 1
+        spec = load()
+        if spec is not None:
+            self.specs[symbol] = spec
+        return spec
+
+    def tick(self, symbol: str, load: Callable):
+        cached = self.ticks.get(symbol)
+        now = time.monotonic()
+        with self._lock:
+            if cached is not None and now - cached[0] < self.tick_ttl:
+                self.tick_hits += 1
+                return cached[1]
+            self.tick_misses += 1
+        tick = load()
+        if tick is not None:
+            self.ticks[symbol] = (now, tick)
+        return tick
+
+    def invalidate_tick(self, symbol: str = None):
+        if symbol is None:
+            self.ticks.clear()
+        else:
+            self.ticks.pop(symbol, None)
+
+    def round_volume(self, symbol: str, volume: float) -> float:
+        """
+        Clamps a volume to the symbol's limits and rounds it to the nearest volume_step
+        :raises KeyError: if the symbol's specification isn't cached
+        """
+        spec = self.specs[symbol]
+        step = Decimal(str(spec.volume_step))
+        volume = max(spec.volume_min, min(volume, spec.volume_max))
+        steps = (Decimal(str(volume)) / step).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        return float(max(steps, 1) * step)
+
+    def as_json(self):
+        return {
+            'symbols': sorted(self.specs),
+            'spec_hits': self.spec_hits,
+            'spec_misses': self.spec_misses,
+            'spec_hit_rate': _hit_rate(self.spec_hits, self.spec_misses),
+            'tick_hits': self.tick_hits,
+            'tick_misses': self.tick_misses,
+            'tick_hit_rate': _hit_rate(self.tick_hits, self.tick_misses),
+            'tick_ttl': self.tick_ttl,
+        }
+
+
+class MT5Gateway:
+    """
+    Owns a MetaTrader 5 terminal connection on a single worker thread.
+
+    The MetaTrader5 package keeps one process-wide terminal connection and is not thread-safe,
+    so every call is queued and executed in order on the gateway thread; callers get a Future
+    (submit) or wait for the result (call). A job runs as `fn(terminal, *args)` and can make
+    several terminal calls without re-queueing. When the terminal reports a lost connection
+    the gateway logs in again and, for jobs marked retry, runs the job once more.
+
+    `terminal` is the MetaTrader5 module, or any object exposing the same functions
+    (see Mt5DemoMock for a stand-in that runs on Linux).
+    """
+
+    def __init__(self, terminal, login: int, password: str, server: str, config: MT5GatewayConfig = None,
+                 name: str = 'mt5-gateway'):
+        self.terminal = terminal
+        self.login = login
+        self.password = password
+        self.server = server
+        self.config = config or MT5GatewayConfig()
+        self.name = name
+        self.connected = False
+        self.reconnects = 0
+        self.cache = MT5SymbolCache(self.config.tick_ttl)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts the gateway thread and connects to the terminal
+        :raises Exception: if the first connection fails
+        """
+        with self._lock:
+            if not self.running:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+        self.call(lambda terminal: self._connect())
+        return self
+
+    def stop(self):
+        """Shuts the terminal connection down after the queued requests have been served"""
+        if self.running:
+            self.submit(lambda terminal: self._shutdown())
+            self._queue.put(None)
+            self._thread.join(timeout=self.config.request_timeout)
+
+    def submit(self, fn: Callable, *args, retry: bool = False, **kwargs) -> Future:
+        """
+        Queues `fn(terminal, *args, **kwargs)` for the gateway thread
+        :param retry: run the job again after a reconnect (only for requests that are safe to repeat)
+        :return: Future resolving to the job's result
+        """
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # already on the gateway thread (a job calling a helper), run inline instead of deadlocking
+            self._run(future, fn, args, kwargs, retry)
+        else:
+            self._queue.put((future, fn, args, kwargs, retry))
+        return future
+
+    def call(self, fn: Callable, *args, retry: bool = False, **kwargs):
+        """
+        Runs `fn(terminal, *args, **kwargs)` on the gateway thread and waits for it
+        :return: the job's result
+        """
+        return self.submit(fn, *args, retry=retry, **kwargs).result(timeout=self.config.request_timeout)
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, fn, args, kwargs, retry = item
+            if future.set_running_or_notify_cancel():
+                self._run(future, fn, args, kwargs, retry)
+
+    def _run(self, future: Future, fn: Callable, args, kwargs, retry: bool):
+        try:
+            if not self.connected:
+                self._connect()
+            try:
+                result = fn(self.terminal, *args, **kwargs)
+            except Exception:
+                # a job may raise on the None a dropped terminal returns
+                if not self._lost_connection():
+                    raise
+                self._reconnect()
+                if not retry:
+                    raise
+                result = fn(self.terminal, *args, **kwargs)
+            else:
+                if result is None and self._lost_connection():
+                    self._reconnect()
+                    if retry:
+                        result = fn(self.terminal, *args, **kwargs)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+
+    def _lost_connection(self) -> bool:
+        code = self.terminal.last_error()
+        if code and code[0] in DISCONNECTED_ERRORS:
+            logger.warning(f'MT5 terminal connection lost: {code}')
+            self.connected = False
+            return True
+        return False
+
+    def _connect(self):
+        if not self.terminal.initialize():
+            raise Exception(f"MT5 initialization failed: {self.terminal.last_error()}")
+        if not self.terminal.login(login=self.login, password=self.password, server=self.server):
+            raise Exception(f"MT5 login failed: {self.terminal.last_error()}")
+        self.connected = True
+        logger.info(f'Connected to MT5 terminal ({self.server}, login {self.login})')
+        return True
+
+    def _reconnect(self):
+        for attempt in range(1, self.config.reconnect_attempts + 1):
+            try:
+                self.terminal.shutdown()
+                self._connect()
+                self.reconnects += 1
+                return
+            except Exception as e:
+                logger.error(f'MT5 reconnect attempt {attempt}/{self.config.reconnect_attempts} failed: {e}')
+        raise Exception('MT5 terminal connection lost and could not be re-established')
+
+    def _shutdown(self):
+        if self.connected:
+            self.terminal.shutdown()
+            self.connected = False
+            logger.info('MT5 connection closed')
+
+    def symbol_info(self, symbol: str):
+        """
+        Static symbol specification (contract size, digits, volume limits), fetched once per symbol.
+        Prices in it go stale, use symbol_info_tick for quotes.
+        """
+        return self.cache.spec(symbol, lambda: self.call(lambda terminal: terminal.symbol_info(symbol), retry=True))
+
+    def prefetch(self, symbols: Iterable[str]):
+        """
+        Queues specification lookups for several symbols without waiting on each one
+        :return: list of Futures
+        """
+        return [self.submit(lambda terminal, symbol=symbol: self.symbol_info(symbol), retry=True)
+                for symbol in symbols if symbol not in self.cache.specs]
+
+    def symbol_info_tick(self, symbol: str):
+        """
+        Latest quote, reused for up to tick_ttl seconds
+        """
+        return self.cache.tick(symbol, lambda: self.call(lambda terminal: terminal.symbol_info_tick(symbol),
+                                                         retry=True))
+
+    def round_volume(self, symbol: str, volume: float) -> float:
+        """
+        Clamps and rounds a volume to the symbol's cached volume limits and step
+        """
+        if self.symbol_info(symbol) is None:
+            raise ValueError(f"Could not get symbol info for {symbol}")
+        return self.cache.round_volume(symbol, volume)
+
+    def account_info(self):
+        return self.call(lambda terminal: terminal.account_info(), retry=True)
+
+    def positions_get(self, **kwargs):
+        return self.call(lambda terminal: terminal.positions_get(**kwargs), retry=True)
+
+    def last_error(self):
+        return self.call(lambda terminal: terminal.last_error())
+
+    def order_send(self, request: dict):
+        """
+        Sends an order. Not retried after a reconnect, since the terminal may have sent it.
+        """
+        return self.call(lambda terminal: terminal.order_send(request))
+
+    def as_json(self):
+        return {
+            'connected': self.connected,
+            'queued': self._queue.qsize(),
+            'reconnects': self.reconnects,
+            'symbol_cache': self.cache.as_json(),
+        }
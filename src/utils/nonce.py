@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+
+from utils.shared_state import SharedState
+
+NONCE_LOCATION = os.getenv('NONCE_FILE', '.nonce')
+
+
+class NonceSource:
+    """
+    Strictly increasing, high-resolution nonces shared by every thread and process on the host.
+
+    The last issued nonce lives in a memory-mapped file locked on every call, so separate
+    gunicorn workers (each with their own authenticator) never issue the same or an
+    out-of-order nonce. Nonces follow the clock at `resolution` ticks per second and run
+    ahead of it by one per call during bursts.
+    """
+
+    def __init__(self, path: str = NONCE_LOCATION, resolution: int = 1000):
+        self.path = path
+        self.resolution = resolution
+        self._state = SharedState(path, '<Q')
+        self._last = 0
+
+    def next(self) -> int:
+        """
+        Issues the next nonce
+        :return: int
+        """
+        with self._state.locked() as state:
+            last = max(state.read()[0], self._last)
+            nonce = max(last + 1, int(time.time() * self.resolution))
+            state.write(nonce)
+            self._last = nonce
+            return nonce
+
+
+_nonce_source = None
+_nonce_source_lock = threading.Lock()
+
+
+def get_nonce_source() -> NonceSource:
+    """
+    Gets the process-wide nonce source backed by NONCE_LOCATION
+    :return: NonceSource()
+    """
+    global _nonce_source
+    if _nonce_source is None:
+        with _nonce_source_lock:
+            if _nonce_source is None:
+                _nonce_source = NonceSource()
+    return _nonce_source
@@ -0,0 +1,354 @@
+import threading
+from typing import Dict, Hashable, Iterable, Tuple
+
+import numpy as np
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+BUY = 1
+SELL = -1
+
+
+def side_sign(side) -> int:
+    """
+    :param side: 'buy'/'sell' or BUY/SELL
+    :return: BUY (+1) or SELL (-1)
+    """
+    if side in ('buy', BUY):
+        return BUY
+    if side in ('sell', SELL):
+        return SELL
+    raise ValueError(f'Unknown side: {side}')
+
+
+def quote_currency(symbol: str) -> str:
+    """
+    The currency a symbol's PnL is in: what follows the separator of 'btc_mxn' or 'BTC/USDT',
+    otherwise the second three letters of an FX symbol ('USDJPY' -> 'JPY', 'EURUSD.m' -> 'USD')
+    """
+    symbol = symbol.upper()
+    for separator in ('_', '/', '-'):
+        if separator in symbol:
+            return symbol.rsplit(separator, 1)[1]
+    return symbol[3:6] or symbol
+
+
+class PnLEngine:
+    """
+    Open positions held column-wise in NumPy arrays (symbol index, side, volume, entry price,
+    stop loss, take profit, unrealized PnL), revalued in one vectorized pass per price update.
+
+    Positions are keyed by any hashable, e.g. (action name, ticket). Opening and closing are
+    O(1): rows are appended, and a closed row is filled with the last one. Net volume per
+    symbol is kept incrementally, so exposure lookups never touch the position columns.
+    Longs are marked at the bid and shorts at the ask; PnL is in the symbol's quote currency
+    (price move x volume x contract size), so totals are only ever summed per currency.
+    Spot fills (trade) are holdings with no entry to value: they only move the symbol's net volume.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._rows: Dict[Hashable, int] = {}
+        self._keys = []
+        self.size = 0
+        # position columns
+        self._symbol = np.zeros(capacity, dtype=np.int32)
+        self._side = np.zeros(capacity, dtype=np.int8)
+        self._volume = np.zeros(capacity, dtype=np.float64)
+        self._entry = np.zeros(capacity, dtype=np.float64)
+        self._sl = np.zeros(capacity, dtype=np.float64)
+        self._tp = np.zeros(capacity, dtype=np.float64)
+        self._pnl = np.zeros(capacity, dtype=np.float64)
+        # symbol columns
+        self.symbols = []
+        self.currencies = []
+        self._symbol_index: Dict[str, int] = {}
+        self._bid = np.full(0, np.nan)
+        self._ask = np.full(0, np.nan)
+        self._contract = np.zeros(0)
+        self._net = np.zeros(0)
+        self._held = np.zeros(0)
+        self._count = np.zeros(0, dtype=np.int64)
+        self._unrealized = np.zeros(0)
+        self.realized: Dict[str, float] = {}
+        self.revaluations = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def _grow(self):
+        capacity = len(self._symbol) * 2
+        for name in ('_symbol', '_side', '_volume', '_entry', '_sl', '_tp', '_pnl'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def _symbol_id(self, symbol: str, contract_size: float = None, currency: str = None) -> int:
+        index = self._symbol_index.get(symbol)
+        if index is None:
+            index = self._symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.currencies.append(quote_currency(symbol))
+            self._bid = np.append(self._bid, np.nan)
+            self._ask = np.append(self._ask, np.nan)
+            self._contract = np.append(self._contract, 1.0)
+            self._net = np.append(self._net, 0.0)
+            self._held = np.append(self._held, 0.0)
+            self._count = np.append(self._count, 0)
+            self._unrealized = np.append(self._unrealized, 0.0)
+        if contract_size is not None:
+            self._contract[index] = contract_size
+        if currency:
+            self.currencies[index] = currency.upper()
+        return index
+
+    def _value(self, rows, symbols, bid, ask):
+        mark = np.where(self._side[rows] > 0, bid, ask)
+        pnl = (mark - self._entry[rows]) * self._side[rows] * self._volume[rows] * self._contract[symbols]
+        return np.nan_to_num(pnl)
+
+    def _open(self, key, symbol: str, side, volume: float, price: float, sl: float, tp: float, contract_size,
+              currency: str = None):
+        if key in self._rows:
+            self._close(key, realize=False)
+        if self.size == len(self._symbol):
+            self._grow()
+        index = self._symbol_id(symbol, contract_size, currency)
+        sign = side_sign(side)
+        row = self.size
+        self._symbol[row] = index
+        self._side[row] = sign
+        self._volume[row] = volume
+        self._entry[row] = price
+        self._sl[row] = sl or 0.0
+        self._tp[row] = tp or 0.0
+        # a single row is cheaper to value in plain Python than through array calls
+        mark = float(self._bid[index] if sign > 0 else self._ask[index])
+        pnl = (mark - price) * sign * volume * float(self._contract[index])
+        self._pnl[row] = 0.0 if pnl != pnl else pnl
+        self._rows[key] = row
+        self._keys.append(key)
+        self.size += 1
+        self._net[index] += sign * volume
+        self._count[index] += 1
+        self._unrealized[index] += self._pnl[row]
+
+    def _close(self, key, price: float = None, realize: bool = True):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return None
+        index = self._symbol[row]
+        sign, volume = int(self._side[row]), float(self._volume[row])
+        if price is None:
+            realized = float(self._pnl[row])
+        else:
+            realized = float((price - self._entry[row]) * sign * volume * self._contract[index])
+        if realize:
+            symbol = self.symbols[index]
+            self.realized[symbol] = self.realized.get(symbol, 0.0) + realized
+        self._net[index] -= sign * volume
+        self._count[index] -= 1
+        self._unrealized[index] -= self._pnl[row]
+        if not self._count[index]:
+            # drop the rounding residue once a symbol is flat
+            self._net[index] = self._unrealized[index] = 0.0
+
+        last = self.size - 1
+        if row != last:
+            for column in (self._symbol, self._side, self._volume, self._entry, self._sl, self._tp, self._pnl):
+                column[row] = column[last]
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+        self.size -= 1
+        return realized
+
+    def open(self, key: Hashable, symbol: str, side, volume: float, price: float, sl: float = 0.0,
+             tp: float = 0.0, contract_size: float = None, currency: str = None):
+        """
+        Adds a position (or replaces the one with the same key) and values it at the last known prices
+        :param side: 'buy'/'sell' or BUY/SELL
+        :param contract_size: units per lot of the symbol, kept for later positions on it
+        :param currency: the symbol's profit currency, if it isn't the one its name implies
+        """
+        with self._lock:
+            self._open(key, symbol, side, volume, price, sl, tp, contract_size, currency)
+
+    def close(self, key: Hashable, price: float = None):
+        """
+        Removes a position and books its PnL as realized
+        :param price: fill price of the close, or None to realize at the last mark
+        :return: realized PnL, or None if the key isn't open
+        """
+        with self._lock:
+            return self._close(key, price)
+
+    def replace(self, owner, positions: Iterable[Tuple], symbol: str = None):
+        """
+        Replaces one owner's positions, e.g. an action's after it listed them from the exchange.
+        Keys are (owner, id); positions no longer listed are dropped without realizing PnL.
+        :param positions: (id, symbol, side, volume, price, sl, tp, contract_size[, currency]) tuples
+        :param symbol: only replace this symbol's positions
+        """
+        with self._lock:
+            listed = set()
+            for position_id, *position in positions:
+                key = (owner, position_id)
+                listed.add(key)
+                self._open(key, *position)
+            for key in [key for key in self._rows if isinstance(key, tuple) and key[0] == owner
+                        and key not in listed]:
+                if symbol is None or self.symbols[self._symbol[self._rows[key]]] == symbol:
+                    self._close(key, realize=False)
+
+    def trade(self, symbol: str, side, volume: float):
+        """
+        Books a spot fill: the bought (or sold) amount is held, not a position, so it moves the
+        symbol's exposure but isn't revalued
+        :param side: 'buy'/'sell' or BUY/SELL
+        """
+        with self._lock:
+            index = self._symbol_id(symbol)
+            held = self._held[index] + side_sign(side) * volume
+            self._held[index] = 0.0 if abs(held) < 1e-12 else held
+
+    def update_prices(self, quotes: Dict[str, Tuple[float, float]]):
+        """
+        Sets symbols' bid/ask and revalues every open position in one pass
+        :param quotes: {symbol: (bid, ask)}
+        """
+        with self._lock:
+            for symbol, (bid, ask) in quotes.items():
+                index = self._symbol_id(symbol)
+                self._bid[index] = bid
+                self._ask[index] = ask
+            self._revalue()
+
+    def _revalue(self):
+        size = self.size
+        symbols = self._symbol[:size]
+        pnl = self._value(slice(0, size), symbols, self._bid[symbols], self._ask[symbols])
+        self._pnl[:size] = pnl
+        # bincount of no positions is an int array; keep it float for the positions opened later
+        self._unrealized = np.bincount(symbols, weights=pnl, minlength=len(self.symbols)).astype(np.float64)
+        self.revaluations += 1
+
+    def triggered(self) -> list:
+        """
+        :return: keys of positions whose stop loss or take profit is crossed at the current marks
+        """
+        with self._lock:
+            size = self.size
+            symbols = self._symbol[:size]
+            side, sl, tp = self._side[:size], self._sl[:size], self._tp[:size]
+            mark = np.where(side > 0, self._bid[symbols], self._ask[symbols])
+            long, short = side > 0, side < 0
+            hit = ((sl > 0) & ((long & (mark <= sl)) | (short & (mark >= sl)))) | \
+                  ((tp > 0) & ((long & (mark >= tp)) | (short & (mark <= tp))))
+            return [self._keys[row] for row in np.flatnonzero(hit)]
+
+    def exposure(self, symbol: str = None):
+        """
+        Net lots (longs minus shorts, plus spot holdings) for a symbol, or {symbol: net lots}; O(1) per symbol
+        """
+        if symbol is not None:
+            index = self._symbol_index.get(symbol)
+            return 0.0 if index is None else float(self._net[index] + self._held[index])
+        return {name: float(net) for name, net in zip(self.symbols, self._net + self._held) if net}
+
+    def currency(self, symbol: str) -> str:
+        index = self._symbol_index.get(symbol)
+        return quote_currency(symbol) if index is None else self.currencies[index]
+
+    def _by_currency(self, values, currency: str = None):
+        totals = {}
+        for name, value in zip(self.currencies, values):
+            totals[name] = totals.get(name, 0.0) + float(value)
+        return totals.get(currency.upper(), 0.0) if currency else totals
+
+    def notional(self, symbol: str = None, currency: str = None):
+        """
+        Net exposure in quote currency at the mid price, for a symbol, or gross (absolute) for one currency,
+        or {currency: gross notional}
+        """
+        mid = np.nan_to_num((self._bid + self._ask) / 2)
+        notional = self._net * self._contract * mid
+        if symbol is not None:
+            index = self._symbol_index.get(symbol)
+            return 0.0 if index is None else float(notional[index])
+        return self._by_currency(np.abs(notional), currency)
+
+    def unrealized(self, symbol: str = None, currency: str = None):
+        """
+        Unrealized PnL of a symbol or of one currency's symbols, or {currency: unrealized}
+        """
+        if symbol is not None:
+            index = self._symbol_index.get(symbol)
+            return 0.0 if index is None else float(self._unrealized[index])
+        return self._by_currency(self._unrealized, currency)
+
+    def realized_by_currency(self) -> Dict[str, float]:
+        totals = {}
+        for symbol, realized in self.realized.items():
+            currency = self.currency(symbol)
+            totals[currency] = totals.get(currency, 0.0) + realized
+        return totals
+
+    def pnl(self, key: Hashable):
+        row = self._rows.get(key)
+        return None if row is None else float(self._pnl[row])
+
+    def as_json(self):
+        with self._lock:
+            mid = np.nan_to_num((self._bid + self._ask) / 2)
+            notional = self._net * self._contract * mid
+            symbols = {
+                symbol: {
+                    'positions': int(self._count[index]),
+                    'net_volume': round(float(self._net[index] + self._held[index]), 8),
+                    'notional': round(float(notional[index]), 2),
+                    'unrealized': round(float(self._unrealized[index]), 2),
+                    'realized': round(self.realized.get(symbol, 0.0), 2),
+                    'currency': self.currencies[index],
+                    'bid': None if np.isnan(self._bid[index]) else float(self._bid[index]),
+                    'ask': None if np.isnan(self._ask[index]) else float(self._ask[index]),
+                }
+                for index, symbol in enumerate(self.symbols)
+                if self._count[index] or self._held[index] or symbol in self.realized
+            }
+            # totals are per quote currency, PnL in different currencies doesn't add up
+            return {
+                'positions': self.size,
+                'gross_notional': _rounded(self._by_currency(np.abs(notional))),
+                'unrealized': _rounded(self._by_currency(self._unrealized)),
+                'realized': _rounded(self.realized_by_currency()),
+                'symbols': symbols,
+            }
+
+
+def _rounded(totals: Dict[str, float]) -> Dict[str, float]:
+    return {currency: round(total, 2) for currency, total in totals.items()}
+
+
+_pnl_engine = None
+_pnl_engine_lock = threading.Lock()
+
+
+def get_pnl_engine() -> PnLEngine:
+    """
+    Gets the process-wide position and PnL engine
+    :return: PnLEngine()
+    """
+    global _pnl_engine
+    if _pnl_engine is None:
+        with _pnl_engine_lock:
+            if _pnl_engine is None:
+                _pnl_engine = PnLEngine()
+    return _pnl_engine
@@ -0,0 +1,109 @@
+import threading
+from decimal import Decimal
+from typing import Iterable
+
+# MetaTrader 5 position types
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+
+class PositionBook:
+    """
+    Open positions indexed by ticket and by symbol, with net exposure (buy volume minus
+    sell volume, in lots) per symbol kept up to date on every change.
+
+    Positions are MetaTrader 5 TradePosition records (anything with ticket, symbol, type
+    and volume attributes). Lookups, adds and removals are O(1); listing a symbol's
+    positions is proportional to that symbol's positions only.
+    """
+
+    def __init__(self, positions: Iterable = ()):
+        self._positions = {}
+        self._by_symbol = {}
+        self._exposure = {}
+        self._lock = threading.RLock()
+        self.replace(positions)
+
+    @staticmethod
+    def _signed_volume(position) -> Decimal:
+        volume = Decimal(str(position.volume))
+        return volume if position.type == POSITION_TYPE_BUY else -volume
+
+    def _index(self, position):
+        self._positions[position.ticket] = position
+        # dicts keep insertion order, so a symbol's positions list in the order they were opened
+        self._by_symbol.setdefault(position.symbol, {})[position.ticket] = None
+        self._exposure[position.symbol] = self._exposure.get(position.symbol, Decimal(0)) + self._signed_volume(position)
+
+    def _unindex(self, ticket):
+        position = self._positions.pop(ticket, None)
+        if position is None:
+            return None
+        tickets = self._by_symbol[position.symbol]
+        del tickets[ticket]
+        if tickets:
+            self._exposure[position.symbol] -= self._signed_volume(position)
+        else:
+            del self._by_symbol[position.symbol]
+            del self._exposure[position.symbol]
+        return position
+
+    def add(self, position):
+        """Adds a position, or replaces the one with the same ticket (e.g. after a partial close)"""
+        with self._lock:
+            self._unindex(position.ticket)
+            self._index(position)
+
+    def remove(self, ticket):
+        """
+        :return: the removed position, or None if the ticket isn't open
+        """
+        with self._lock:
+            return self._unindex(ticket)
+
+    def replace(self, positions: Iterable, symbol: str = None):
+        """
+        Replaces every position (or only one symbol's) with a fresh listing from the terminal
+        """
+        with self._lock:
+            if symbol is None:
+                self._positions, self._by_symbol, self._exposure = {}, {}, {}
+            else:
+                for ticket in list(self._by_symbol.get(symbol, ())):
+                    self._unindex(ticket)
+            for position in positions:
+                self._index(position)
+
+    def get(self, ticket):
+        return self._positions.get(ticket)
+
+    def for_symbol(self, symbol: str = None) -> list:
+        """
+        :return: open positions on a symbol, or all of them
+        """
+        with self._lock:
+            if symbol is None:
+                return list(self._positions.values())
+            return [self._positions[ticket] for ticket in self._by_symbol.get(symbol, ())]
+
+    def net_exposure(self, symbol: str = None):
+        """
+        :return: net lots for a symbol, or {symbol: net lots} for every symbol
+        """
+        with self._lock:
+            if symbol is not None:
+                return float(self._exposure.get(symbol, 0))
+            return {symbol: float(exposure) for symbol, exposure in self._exposure.items()}
+
+    @property
+    def symbols(self) -> list:
+        return list(self._by_symbol)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, ticket):
+        return ticket in self._positions
+
+    def __iter__(self):
+        return iter(self.for_symbol())
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from utils.log import get_logger
+from utils.shared_state import SharedState
+
+logger = get_logger(__name__)
+
+RATE_LIMIT_DIR = os.getenv('RATE_LIMIT_DIR', '.ratelimit')
+
+# endpoint classes
+ORDERS = 'orders'
+READS = 'reads'
+
+# (requests, per seconds) defaults, overridable with RATE_LIMIT_<EXCHANGE>_<CLASS>="<requests>/<seconds>"
+DEFAULT_LIMITS = {
+    ('bitso', ORDERS): (150, 60),
+    ('bitso', READS): (150, 60),
+    ('recall', ORDERS): (60, 60),
+    ('recall', READS): (60, 60),
+}
+
+
+def endpoint_class(method: str) -> str:
+    """
+    Classifies a request for rate limiting: anything that changes state counts against orders
+    :param method: HTTP method
+    :return: ORDERS or READS
+    """
+    return READS if method.upper() in ('GET', 'HEAD', 'OPTIONS') else ORDERS
+
+
+class RateLimitConfig:
+    """Per exchange / endpoint class request limits"""
+
+    def __init__(self):
+        self.enabled = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+        self.limits: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        for (exchange, cls), default in DEFAULT_LIMITS.items():
+            self.limits[(exchange, cls)] = self._parse(
+                os.getenv(f'RATE_LIMIT_{exchange.upper()}_{cls.upper()}'), default
+            )
+
+    @staticmethod
+    def _parse(value, default):
+        if not value:
+            return default
+        try:
+            requests, seconds = value.split('/')
+            return float(requests), float(seconds)
+        except ValueError:
+            raise ValueError(f'Rate limits must look like "<requests>/<seconds>", got: {value}')
+
+    def get(self, exchange: str, cls: str):
+        return self.limits.get((exchange, cls))
+
+    def __str__(self):
+        return f"RateLimitConfig(enabled={self.enabled}, limits={self.limits})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all workers on the host. Callers that find the bucket empty still
+    take a token (the balance goes negative) and are told how long to wait for it, so waiting
+    requests are paced out in arrival order instead of failing or stampeding.
+    """
+
+    def __init__(self, name: str, requests: float, seconds: float, path: str = None):
+        self.name = name
+        self.rate = requests / seconds
+        self.burst = max(requests, 1.0)
+        self._state = SharedState(path or os.path.join(RATE_LIMIT_DIR, name), '<dd')
+
+    def reserve(self) -> float:
+        """
+        Takes a token
+        :return: seconds the caller must wait before sending
+        """
+        with self._state.locked() as state:
+            tokens, updated = state.read()
+            now = time.time()
+            if updated == 0:
+                tokens = self.burst
+            else:
+                tokens = min(self.burst, tokens + max(now - updated, 0.0) * self.rate)
+            tokens -= 1
+            state.write(tokens, now)
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def acquire(self):
+        """Blocks until a token is available"""
+        wait = self.reserve()
+        if wait:
+            logger.debug(f'Rate limit {self.name}: queued for {wait:.3f}s')
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Waits (without blocking the event loop) until a token is available"""
+        wait = self.reserve()
+        if wait:
+            logger.debug(f'Rate limit {self.name}: queued for {wait:.3f}s')
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    """Lazily built token buckets for each (exchange, endpoint class)"""
+
+    def __init__(self, config: RateLimitConfig = None):
+        self.config = config or RateLimitConfig()
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, exchange: str, method: str):
+        """
+        Gets the bucket a request counts against
+        :return: TokenBucket() or None when the request is not limited
+        """
+        if not self.config.enabled or exchange is None:
+            return None
+        key = (exchange, endpoint_class(method))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = self.config.get(*key)
+            if limit is None:
+                return None
+            with self._lock:
+                bucket = self._buckets.setdefault(key, TokenBucket(f'{key[0]}.{key[1]}', *limit))
+        return bucket
+
+    def acquire(self, exchange: str, method: str):
+        bucket = self.bucket(exchange, method)
+        if bucket is not None:
+            bucket.acquire()
+
+    async def acquire_async(self, exchange: str, method: str):
+        bucket = self.bucket(exchange, method)
+        if bucket is not None:
+            await bucket.acquire_async()
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Gets the process-wide rate limiter
+    :return: RateLimiter()
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+    return _rate_limiter
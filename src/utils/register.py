@@ -62,13 +62,18 @@ def register_event(event_name: str):
 
 
 def register_link(link: tuple, event_manager, action_manager):
+    """
+    Links an action to an event.
+    :param link: (action name, event name) or (action name, event name, routing rule)
+    :return: bool
+    """
     try:
         logger.info(f"DEBUG: Attempting to register link {link[0]} -> {link[1]}")
         action = action_manager.get(link[0])
         logger.info(f"DEBUG: Found action: {action} (type: {type(action)})")
         event = event_manager.get(link[1])
         logger.info(f"DEBUG: Found event: {event} (type: {type(event)})")
-        event.add_action(action)
+        event.add_action(action, link[2] if len(link) > 2 else None)
         logger.info(f"DEBUG: Successfully added action to event. Event now has {len(event._actions)} actions")
         logger.info(f'Link "{link[0]} -> {link[1]}" registered successfully!')
         return True
@@ -77,3 +82,23 @@ def register_link(link: tuple, event_manager, action_manager):
         logger.error(e)
         # print stack trace
         traceback.print_exc()
+
+
+def register_event_table(path: str, event_manager, action_manager):
+    """
+    Registers the events of an event table (CSV or SQLite), loaded as they're first used.
+    :param path: str
+    :return: EventTable()
+    """
+    logger.info(f'Registering event table --->\t{path}')
+    try:
+        from components.events.base.table import open_event_table
+        table = open_event_table(path, action_manager)
+        event_manager.add_table(table)
+        logger.info(f'Event table "{path}" registered successfully! ({len(table)} events)')
+        return table
+    except Exception as e:
+        logger.error(f'Event table "{path}" failed to register!')
+        logger.error(e)
+        # print stack trace
+        traceback.print_exc()
@@ -0,0 +1,54 @@
+import threading
+import uuid
+from typing import Callable, Dict, Tuple
+
+# ETags are only compared within one process; this keeps them from repeating across restarts and workers
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class RegistryVersion:
+    """
+    Counter bumped whenever the registry shown on the dashboard changes: an action or event
+    registered (table events included, as they load), a link added or an event (de)activated.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+registry_version = RegistryVersion()
+
+
+class VersionedCache:
+    """
+    Views of the registry (the rendered dashboard, the /registry JSON) built once per registry
+    version and served from memory until the next change
+    """
+
+    def __init__(self, version: RegistryVersion = registry_version):
+        self.version = version
+        self._views: Dict[str, Tuple[int, object, str]] = {}
+        self.builds = 0
+
+    def get(self, name: str, build: Callable[[], object]) -> Tuple[object, str]:
+        """
+        :param build: makes the view, called only when the registry changed since the last build
+        :return: (view, etag)
+        """
+        # read the version before building, so a change during the build is rebuilt on the next call
+        version = self.version.value
+        cached = self._views.get(name)
+        if cached is None or cached[0] != version:
+            self.builds += 1
+            cached = self._views[name] = (version, build(), f'{BOOT_ID}-{name}-{version}')
+        return cached[1], cached[2]
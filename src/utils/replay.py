@@ -0,0 +1,205 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# payload fields tried, in order, for the alert's own timestamp
+TIME_FIELDS = ('time', 'timestamp', 'timenow')
+
+
+class ReplayConfig:
+    """Webhook recording settings"""
+
+    def __init__(self):
+        # append every received webhook payload to this NDJSON file, for `tvwb replay` (unset disables)
+        self.record_file = os.getenv('WEBHOOK_RECORD_FILE')
+
+    def __str__(self):
+        return f"ReplayConfig(record_file={self.record_file})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def parse_time(value) -> Optional[float]:
+    """
+    Converts epoch seconds / milliseconds or an ISO 8601 string (TradingView's {{timenow}}) to epoch seconds
+    :return: float, or None if the value isn't a time
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    value = str(value).strip()
+    try:
+        return parse_time(float(value))
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def read_payloads(path: str) -> Iterator[Tuple[Optional[float], dict]]:
+    """
+    Reads recorded webhooks from an NDJSON file, one payload per line. Lines written by
+    PayloadRecorder ({"received": ..., "payload": {...}}) and bare payloads are both accepted;
+    a payload's own time field wins over the time it was received.
+    :return: (epoch seconds or None, payload) per line
+    """
+    with open(path, 'r') as records:
+        for number, line in enumerate(records, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f'{path}:{number}: not JSON, skipped')
+                continue
+            if not isinstance(record, dict):
+                logger.warning(f'{path}:{number}: not a JSON object, skipped')
+                continue
+            payload = record.get('payload') if isinstance(record.get('payload'), dict) else record
+            received = record.get('received') if payload is not record else None
+            timestamp = next((parse_time(payload[field]) for field in TIME_FIELDS if field in payload), None)
+            yield (timestamp if timestamp is not None else parse_time(received)), payload
+
+
+class PayloadRecorder:
+    """Appends webhook payloads to an NDJSON file that `tvwb replay` can read back"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # line buffered and opened for append, so each payload is one write() workers can interleave safely
+        self._file = open(path, 'a', buffering=1)
+
+    def write(self, payload: dict):
+        line = json.dumps({'received': time.time(), 'payload': payload}, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class VirtualClock:
+    """Simulated epoch seconds, moved forward by the replay to each payload's time"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def advance(self, to: float):
+        if to > self.now:
+            self.now = to
+
+    def time(self) -> float:
+        return self.now
+
+
+class Replay:
+    """
+    Pushes recorded payloads through Event.trigger in-process, as fast as the actions allow.
+
+    Payloads are routed by key like the /webhook endpoint does, or all to one event (keys depend
+    on the install that recorded them). Before each payload the virtual clock moves to its time,
+    and so does every action with an `advance(to)` method (Mt5DemoMock on a price feed), so fills
+    and stops happen at simulated prices. The risk engine's clock is the virtual clock for the run.
+    """
+
+    def __init__(self, events: List, route_to=None, clock: VirtualClock = None, risk=None, pnl=None, lookup=None):
+        self.events = events
+        self.route_to = route_to
+        # key -> events, for events not in `events` (EventManager.find loads table events on demand)
+        self.lookup = lookup
+        self.clock = clock or VirtualClock()
+        self.risk = risk
+        self.pnl = pnl
+        self._by_key = {}
+        for event in events:
+            if event.webhook:
+                self._by_key.setdefault(event.key, []).append(event)
+
+    def _actions(self):
+        actions = {}
+        for event in ([self.route_to] if self.route_to else self.events):
+            for action in event._actions:
+                actions[id(action)] = action
+        return list(actions.values())
+
+    def run(self, records: Iterable[Tuple[Optional[float], dict]]) -> dict:
+        """
+        Replays (epoch seconds or None, payload) records in order
+        :return: report of throughput, action runs, fills and PnL
+        """
+        actions = self._actions()
+        clocked = [action for action in actions if callable(getattr(action, 'advance', None))]
+        counts = {'payloads': 0, 'triggered': 0, 'unrouted': 0, 'errors': 0}
+        first = last = None
+        runs_before = {action.name: (action.stats.count, action.stats.error_count) for action in actions}
+
+        wall_clock = risk_report = None
+        if self.risk is not None:
+            wall_clock, self.risk.clock = self.risk.clock, self.clock.time
+        started = time.perf_counter()
+        try:
+            for timestamp, payload in records:
+                counts['payloads'] += 1
+                if timestamp is not None:
+                    first = timestamp if first is None else first
+                    last = timestamp
+                    self.clock.advance(timestamp)
+                    for action in clocked:
+                        action.advance(self.clock.now)
+
+                events = [self.route_to] if self.route_to else self._by_key.get(payload.get('key'), ())
+                if not events and self.lookup is not None:
+                    events = self.lookup(payload.get('key'))
+                if not events:
+                    counts['unrouted'] += 1
+                    continue
+                for event in events:
+                    try:
+                        event.trigger(data=payload)
+                        counts['triggered'] += 1
+                    except Exception as e:
+                        counts['errors'] += 1
+                        logger.debug(f'Replay: {event} failed on {payload}: {e}')
+            for action in actions:
+                if callable(getattr(action, 'mark_to_market', None)):
+                    action.mark_to_market()
+        finally:
+            elapsed = time.perf_counter() - started
+            if wall_clock is not None:
+                # read on the virtual clock, the wall clock's day would reset the replay's daily PnL
+                risk_report = self.risk.as_json()
+                self.risk.clock = wall_clock
+
+        simulated = (last - first) if first is not None else 0.0
+        report = dict(counts)
+        report.update({
+            'elapsed': round(elapsed, 4),
+            'payloads_per_second': round(counts['payloads'] / elapsed, 1) if elapsed else None,
+            'simulated_seconds': simulated,
+            'speedup': round(simulated / elapsed, 1) if elapsed and simulated else None,
+            'actions': {
+                action.name: {
+                    'runs': action.stats.count - runs_before[action.name][0],
+                    'errors': action.stats.error_count - runs_before[action.name][1],
+                }
+                for action in actions
+            },
+        })
+        if risk_report is not None:
+            report['risk'] = risk_report
+        if self.pnl is not None:
+            report['pnl'] = self.pnl.as_json()
+        return report
@@ -0,0 +1,256 @@
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from utils.async_http_client import ConnectError
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# methods that are safe to send twice; others are only retried when they provably never reached the exchange
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+# statuses worth retrying; 429 and 503 mean the request was not processed
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+NOT_PROCESSED_STATUSES = (429, 503)
+# statuses that count against the upstream's health
+FAILURE_STATUSES = (500, 502, 503, 504)
+
+# order ids, uuids and the like in a path collapse into one endpoint
+_ID_SEGMENT = re.compile(r'^(?=.*\d)[\w-]{8,}$')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without contacting the exchange while an endpoint's breaker is open"""
+
+
+class ResilienceConfig:
+    """Retry and circuit breaker settings for exchange requests"""
+
+    def __init__(self):
+        self.max_attempts = int(os.getenv('RETRY_MAX_ATTEMPTS', '3'))
+        self.base_delay = float(os.getenv('RETRY_BASE_DELAY', '0.2'))
+        self.max_delay = float(os.getenv('RETRY_MAX_DELAY', '5'))
+        self.failure_threshold = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+        self.reset_timeout = float(os.getenv('BREAKER_RESET_TIMEOUT', '30'))
+
+    def __str__(self):
+        return (f"ResilienceConfig(max_attempts={self.max_attempts}, base_delay={self.base_delay}, "
+                f"failure_threshold={self.failure_threshold}, reset_timeout={self.reset_timeout})")
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def endpoint_key(exchange: Optional[str], method: str, url: str) -> str:
+    """
+    Names the endpoint a request belongs to, e.g. "bitso:DELETE /api/v3/orders/{id}"
+    """
+    parsed = urlparse(url)
+    path = '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in parsed.path.split('/'))
+    return f'{exchange or parsed.netloc}:{method.upper()} {path}'
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. Once open it fails fast until reset_timeout has passed,
+    then lets a single probe through (half-open); the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.total_failures = 0
+        self.total_rejections = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                logger.info(f'Circuit {self.name}: half-open, probing')
+                return True
+            self.total_rejections += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f'Circuit {self.name}: closed')
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f'Circuit {self.name}: open after {self.failures} consecutive failures')
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def as_json(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'total_failures': self.total_failures,
+            'total_rejections': self.total_rejections,
+            'open_for': round(time.monotonic() - self.opened_at, 3) if self.state == OPEN else None,
+        }
+
+
+class Resilience:
+    """
+    Retries with jittered exponential backoff plus a circuit breaker per exchange endpoint.
+    `send` is called once per attempt and must build (and sign) a fresh request each time.
+    """
+
+    def __init__(self, config: Optional[ResilienceConfig] = None):
+        self.config = config or ResilienceConfig()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.retries = 0
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = CircuitBreaker(key, self.config.failure_threshold, self.config.reset_timeout)
+                    self._breakers[key] = breaker
+        return breaker
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.config.max_delay)
+        # full jitter
+        return random.uniform(0, min(self.config.max_delay, self.config.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def _not_sent(error: Exception) -> bool:
+        # a failed connect means the request never left this host
+        if isinstance(error, (requests.exceptions.ConnectTimeout, ConnectError)):
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            reason = getattr(error.args[0], 'reason', error.args[0])
+            return isinstance(reason, NewConnectionError)
+        return False
+
+    def _should_retry(self, method: str, response=None, error: Exception = None) -> bool:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if error is not None:
+            return idempotent or self._not_sent(error)
+        if response.status_code not in RETRY_STATUSES:
+            return False
+        return idempotent or response.status_code in NOT_PROCESSED_STATUSES
+
+    def _record(self, breaker: CircuitBreaker, response=None, error: Exception = None):
+        if error is not None or response.status_code in FAILURE_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def call(self, exchange: Optional[str], method: str, url: str, send: Callable):
+        """
+        Sends a request with retries and circuit breaking
+        :return: the last response (even if its status is an error)
+        :raises CircuitOpenError: if the endpoint's breaker is open
+        """
+        breaker = self.breaker(endpoint_key(exchange, method, url))
+        for attempt in range(self.config.max_attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(f'Circuit {breaker.name} is open, not sending request')
+            response, error = None, None
+            try:
+                response = send()
+            except requests.exceptions.RequestException as e:
+                error = e
+            self._record(breaker, response, error)
+
+            last_attempt = attempt == self.config.max_attempts - 1
+            if last_attempt or not self._should_retry(method, response, error):
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(attempt, response)
+            self.retries += 1
+            logger.warning(f'{breaker.name}: attempt {attempt + 1} failed '
+                           f'({error or response.status_code}), retrying in {delay:.2f}s')
+            time.sleep(delay)
+
+    async def call_async(self, exchange: Optional[str], method: str, url: str, send: Callable):
+        """
+        Async version of call(); `send` returns an awaitable
+        """
+        breaker = self.breaker(endpoint_key(exchange, method, url))
+        for attempt in range(self.config.max_attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(f'Circuit {breaker.name} is open, not sending request')
+            response, error = None, None
+            try:
+                response = await send()
+            except requests.exceptions.RequestException as e:
+                error = e
+            self._record(breaker, response, error)
+
+            last_attempt = attempt == self.config.max_attempts - 1
+            if last_attempt or not self._should_retry(method, response, error):
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(attempt, response)
+            self.retries += 1
+            logger.warning(f'{breaker.name}: attempt {attempt + 1} failed '
+                           f'({error or response.status_code}), retrying in {delay:.2f}s')
+            await asyncio.sleep(delay)
+
+    def as_json(self):
+        return {
+            'retries': self.retries,
+            'breakers': {key: breaker.as_json() for key, breaker in list(self._breakers.items())},
+        }
+
+
+_resilience = None
+_resilience_lock = threading.Lock()
+
+
+def get_resilience() -> Resilience:
+    """
+    Gets the process-wide retry / circuit breaker registry
+    :return: Resilience()
+    """
+    global _resilience
+    if _resilience is None:
+        with _resilience_lock:
+            if _resilience is None:
+                _resilience = Resilience()
+    return _resilience
@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from utils.log import get_logger
+from utils.pnl_engine import PnLEngine, get_pnl_engine
+
+logger = get_logger(__name__)
+
+# an order an action is about to send; size is None when it is only known at the exchange (e.g. "25%")
+OrderIntent = namedtuple('OrderIntent', ['strategy', 'symbol', 'side', 'size'])
+
+
+class RiskRejected(Exception):
+    """Raised by a pre-trade check; the order is dropped before any exchange call"""
+
+    def __init__(self, check: str, message: str):
+        super().__init__(message)
+        self.check = check
+
+
+def parse_limits(value: Optional[str]) -> Dict[str, float]:
+    """
+    Parses a limit setting: a single number for every symbol ("2"), or per-symbol (or per-currency)
+    values with an optional "*" default ("EURUSD=5,btc_mxn=0.01,*=1"). 0 or unset means no limit.
+    """
+    limits = {}
+    for item in (value or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        symbol, _, limit = item.rpartition('=')
+        limits[symbol.strip().upper() or '*'] = float(limit)
+    return limits
+
+
+class RiskConfig:
+    """Pre-trade risk limits (0 or unset disables a check)"""
+
+    def __init__(self):
+        # largest single order, in the action's units (lots for MT5, major currency for Bitso)
+        self.max_order_size = parse_limits(os.getenv('RISK_MAX_ORDER_SIZE'))
+        # largest net position per symbol an order may build up to
+        self.max_position = parse_limits(os.getenv('RISK_MAX_POSITION'))
+        # orders per strategy in any 60 second window
+        self.max_orders_per_minute = int(os.getenv('RISK_MAX_ORDERS_PER_MINUTE', '0'))
+        # loss per currency (realized today plus open unrealized) at which new orders in that currency
+        # stop until the next UTC day
+        self.max_daily_loss = parse_limits(os.getenv('RISK_MAX_DAILY_LOSS'))
+
+    def __str__(self):
+        return (f"RiskConfig(max_order_size={self.max_order_size}, max_position={self.max_position}, "
+                f"max_orders_per_minute={self.max_orders_per_minute}, max_daily_loss={self.max_daily_loss})")
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _limit(limits: Dict[str, float], symbol: str) -> float:
+    return limits.get(symbol.upper(), limits.get('*', 0.0))
+
+
+class RiskCheck:
+    """
+    A pre-trade check: raises RiskRejected to stop an order. Checks only read the engine's
+    in-memory state, they must never call an exchange.
+    """
+
+    name = 'check'
+
+    def check(self, intent: OrderIntent, engine: 'RiskEngine'):
+        raise NotImplementedError
+
+
+class MaxOrderSize(RiskCheck):
+    name = 'max_order_size'
+
+    def __init__(self, limits: Dict[str, float]):
+        self.limits = limits
+
+    def check(self, intent, engine):
+        limit = _limit(self.limits, intent.symbol)
+        if limit and intent.size is not None and intent.size > limit:
+            raise RiskRejected(self.name, f'{intent.symbol} order size {intent.size} exceeds {limit}')
+
+
+class MaxPosition(RiskCheck):
+    name = 'max_position'
+
+    def __init__(self, limits: Dict[str, float]):
+        self.limits = limits
+
+    def check(self, intent, engine):
+        limit = _limit(self.limits, intent.symbol)
+        if not limit or intent.size is None:
+            return
+        current = engine.exposure(intent.symbol)
+        projected = current + (intent.size if intent.side == 'buy' else -intent.size)
+        # orders that reduce the position are always allowed
+        if abs(projected) > limit and abs(projected) > abs(current):
+            raise RiskRejected(self.name, f'{intent.symbol} position would be {projected:g}, limit is {limit:g}')
+
+
+class OrderRate(RiskCheck):
+    name = 'max_orders_per_minute'
+
+    def __init__(self, limit: int, window: float = 60.0):
+        self.limit = limit
+        self.window = window
+
+    def check(self, intent, engine):
+        if not self.limit:
+            return
+        sent = engine.orders_sent(intent.strategy, self.window)
+        if sent >= self.limit:
+            raise RiskRejected(self.name, f'strategy {intent.strategy} sent {sent} orders in the last '
+                                          f'{self.window:g}s, limit is {self.limit}')
+
+
+class DailyLoss(RiskCheck):
+    name = 'max_daily_loss'
+
+    def __init__(self, limits: Dict[str, float]):
+        self.limits = limits
+
+    def check(self, intent, engine):
+        # PnL in different currencies isn't comparable, the symbol's own currency is checked
+        currency = engine.currency(intent.symbol)
+        limit = _limit(self.limits, currency)
+        if not limit:
+            return
+        pnl = engine.daily_pnl(currency)
+        if pnl <= -limit:
+            raise RiskRejected(self.name, f'daily loss {-pnl:.2f} {currency} reached the limit of {limit:g}')
+
+
+class RiskEngine:
+    """
+    Pre-trade risk stage run by Event.trigger before each action sends an order.
+
+    State is kept in memory and updated incrementally: order timestamps per strategy (a sliding
+    window) and realized PnL per currency for the current UTC day (record_fill). Net exposure and
+    open PnL are read from the PnL engine the actions book their positions and fills in. Every
+    check is a few lookups, so a rejected signal costs microseconds and never reaches an exchange.
+    """
+
+    def __init__(self, config: RiskConfig = None, pnl: PnLEngine = None):
+        self.config = config or RiskConfig()
+        self.checks: List[RiskCheck] = [
+            MaxOrderSize(self.config.max_order_size),
+            MaxPosition(self.config.max_position),
+            OrderRate(self.config.max_orders_per_minute),
+            DailyLoss(self.config.max_daily_loss),
+        ]
+        # positions and spot fills: exposure for the position limit, open PnL for the daily loss limit
+        self.pnl = pnl if pnl is not None else PnLEngine()
+        # epoch seconds; `tvwb replay` swaps in its virtual clock
+        self.clock = time.time
+        self._orders: Dict[str, deque] = {}
+        self._day = None
+        self._realized: Dict[str, float] = {}
+        self.accepted = 0
+        self.rejected: Dict[str, int] = {}
+        self.fills = 0
+        self._lock = threading.Lock()
+
+    def add_check(self, check: RiskCheck):
+        """Adds a custom check, run after the built-in ones"""
+        self.checks.append(check)
+
+    def exposure(self, symbol: str = None):
+        return self.pnl.exposure(symbol)
+
+    def orders_sent(self, strategy: str, window: float) -> int:
+        orders = self._orders.get(strategy)
+        if not orders:
+            return 0
+        cutoff = self.clock() - window
+        while orders and orders[0] <= cutoff:
+            orders.popleft()
+        return len(orders)
+
+    def _roll_day(self):
+        today = datetime.fromtimestamp(self.clock(), timezone.utc).date()
+        if today != self._day:
+            self._day = today
+            self._realized = {}
+
+    def currency(self, symbol: str) -> str:
+        return self.pnl.currency(symbol)
+
+    def daily_pnl(self, currency: str = None):
+        """
+        Realized PnL since 00:00 UTC plus the open positions' unrealized PnL
+        :return: the PnL in one currency, or {currency: PnL}
+        """
+        self._roll_day()
+        pnl = dict(self._realized)
+        for name, unrealized in self.pnl.unrealized().items():
+            pnl[name] = pnl.get(name, 0.0) + unrealized
+        if currency is not None:
+            return pnl.get(currency.upper(), 0.0)
+        return pnl
+
+    def check(self, intent: OrderIntent):
+        """
+        Runs every check and counts the order against its strategy's rate if all pass
+        :raises RiskRejected: on the first failed check
+        """
+        with self._lock:
+            for check in self.checks:
+                try:
+                    check.check(intent, self)
+                except RiskRejected as e:
+                    self.rejected[e.check] = self.rejected.get(e.check, 0) + 1
+                    raise
+            self._orders.setdefault(intent.strategy, deque()).append(self.clock())
+            self.accepted += 1
+
+    def record_fill(self, symbol: str, realized: float = 0.0, currency: str = None):
+        """
+        Counts a fill and adds the PnL it booked to today's; its exposure is booked in the PnL engine
+        :param realized: PnL booked by the fill, e.g. when it closed a position
+        :param currency: the currency realized is in, if it isn't the symbol's quote currency
+        """
+        with self._lock:
+            self.fills += 1
+            if realized:
+                self._roll_day()
+                currency = (currency or self.currency(symbol)).upper()
+                self._realized[currency] = self._realized.get(currency, 0.0) + realized
+
+    def as_json(self):
+        return {
+            'accepted': self.accepted,
+            'rejected': dict(self.rejected),
+            'fills': self.fills,
+            'exposure': self.exposure(),
+            'daily_pnl': {currency: round(pnl, 2) for currency, pnl in self.daily_pnl().items()},
+            'limits': {
+                'max_order_size': self.config.max_order_size,
+                'max_position': self.config.max_position,
+                'max_orders_per_minute': self.config.max_orders_per_minute,
+                'max_daily_loss': self.config.max_daily_loss,
+            },
+        }
+
+
+_risk_engine = None
+_risk_engine_lock = threading.Lock()
+
+
+def get_risk_engine() -> RiskEngine:
+    """
+    Gets the process-wide pre-trade risk engine; exposure and open PnL come from the PnL engine
+    :return: RiskEngine()
+    """
+    global _risk_engine
+    if _risk_engine is None:
+        with _risk_engine_lock:
+            if _risk_engine is None:
+                _risk_engine = RiskEngine(pnl=get_pnl_engine())
+    return _risk_engine
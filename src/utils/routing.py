@@ -0,0 +1,185 @@
+import operator
+import re
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
+
+# a routing rule is "and"-ed clauses on payload fields, e.g.
+#   "symbol in {EURUSD, GBPUSD} and strategy == scalper and side != buy"
+_CLAUSE = re.compile(r'^\s*(\w+)\s*(==|=|!=|>=|<=|>|<|not\s+in\b|in\b)\s*(.*?)\s*$', re.IGNORECASE)
+_AND = re.compile(r'\s+and\s+', re.IGNORECASE)
+_COMPARISONS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+
+class RouteError(ValueError):
+    """Raised for a routing rule that can't be parsed"""
+
+
+def normalize(value) -> Optional[str]:
+    """Payload and rule values are compared as stripped, lower case strings"""
+    if value is None:
+        return None
+    return str(value).strip().lower()
+
+
+def _values(text: str) -> Tuple[str, ...]:
+    text = text.strip()
+    if text[:1] in '{[(' and text[-1:] in '}])':
+        text = text[1:-1]
+    values = tuple(normalize(value.strip().strip('\'"')) for value in text.split(','))
+    if not all(values):
+        raise RouteError(f'empty value in {text!r}')
+    return values
+
+
+class Condition:
+    """
+    One clause of a rule. `==` and `in` clauses are equality conditions the index hashes on;
+    every other operator is a residual predicate checked on the candidates the index returns.
+    """
+
+    __slots__ = ('field', 'op', 'values', '_test')
+
+    def __init__(self, field: str, op: str, values: Tuple[str, ...]):
+        self.field = field
+        self.op = op
+        self.values = values
+        if op in _COMPARISONS:
+            compare, bound = _COMPARISONS[op], float(values[0])
+            self._test = lambda value: compare(float(value), bound)
+        elif op == '!=':
+            self._test = lambda value: value != values[0]
+        elif op == 'not in':
+            excluded = frozenset(values)
+            self._test = lambda value: value not in excluded
+        else:
+            allowed = frozenset(values)
+            self._test = lambda value: value in allowed
+
+    @property
+    def equality(self) -> bool:
+        return self.op in ('==', 'in')
+
+    def test(self, data: dict) -> bool:
+        value = normalize(data.get(self.field))
+        if value is None:
+            return False
+        try:
+            return self._test(value)
+        except ValueError:
+            # a comparison on a value that isn't a number
+            return False
+
+    def __str__(self):
+        if self.op in ('in', 'not in'):
+            return f"{self.field} {self.op} {{{', '.join(self.values)}}}"
+        return f'{self.field} {self.op} {self.values[0]}'
+
+
+def parse_rule(rule: Optional[str]) -> List[Condition]:
+    """
+    Parses a routing rule; an empty rule matches every payload
+    :param rule: e.g. "symbol in {EURUSD, GBPUSD} and strategy == scalper", operators are
+        ==, !=, in, not in, >, >=, <, <= (numeric)
+    :return: list of Condition()
+    :raises RouteError: if a clause can't be parsed
+    """
+    conditions = []
+    if not rule or not rule.strip():
+        return conditions
+    for clause in _AND.split(rule.strip()):
+        match = _CLAUSE.match(clause)
+        if not match or not match.group(3):
+            raise RouteError(f'cannot parse routing clause {clause!r}')
+        field, op, text = match.group(1), ' '.join(match.group(2).lower().split()), match.group(3)
+        op = '==' if op == '=' else op
+        values = _values(text) if op in ('in', 'not in') else (normalize(text.strip('\'"')),)
+        if op in _COMPARISONS:
+            try:
+                float(values[0])
+            except ValueError:
+                raise RouteError(f'{field} {op} needs a number, got {text!r}')
+        conditions.append(Condition(field, op, values))
+    return conditions
+
+
+class Route:
+    __slots__ = ('target', 'rule', 'position', 'residual')
+
+    def __init__(self, target, rule: str, position: int, residual: List[Condition]):
+        self.target = target
+        self.rule = rule
+        self.position = position
+        self.residual = residual
+
+
+class RoutingIndex:
+    """
+    Routes payloads to targets (an event's actions) by content-based rules.
+
+    Rules are compiled into one hash table per set of equality fields ("signature"): a rule on
+    `symbol in {A, B} and strategy == X` is stored under the keys (a, x) and (b, x) of the
+    (strategy, symbol) table. Matching builds one key per table from the payload and looks it up,
+    then checks the candidates' residual predicates (!=, not in, comparisons). The cost grows with
+    the number of distinct signatures and matched rules, not with the number of rules.
+    """
+
+    def __init__(self):
+        self._rules: List[Tuple[Any, Optional[str]]] = []
+        self._tables: Optional[List[Tuple[Tuple[str, ...], Dict[tuple, List[Route]]]]] = None
+
+    def __len__(self):
+        return len(self._rules)
+
+    def add(self, target, rule: Optional[str] = None):
+        """
+        :param rule: routing rule, None routes every payload to the target
+        :raises RouteError: if the rule can't be parsed
+        """
+        parse_rule(rule)
+        self._rules.append((target, rule))
+        self._tables = None
+
+    def remove(self, target):
+        self._rules = [(other, rule) for other, rule in self._rules if other is not target]
+        self._tables = None
+
+    def rules(self) -> List[Tuple[Any, Optional[str]]]:
+        return list(self._rules)
+
+    def compile(self):
+        tables: Dict[Tuple[str, ...], Dict[tuple, List[Route]]] = {}
+        for position, (target, rule) in enumerate(self._rules):
+            indexed, residual = {}, []
+            for condition in parse_rule(rule):
+                # a second equality clause on a field is checked as a residual predicate
+                if condition.equality and condition.field not in indexed:
+                    indexed[condition.field] = condition.values
+                else:
+                    residual.append(condition)
+            signature = tuple(sorted(indexed))
+            route = Route(target, rule, position, residual)
+            table = tables.setdefault(signature, {})
+            for key in product(*(indexed[field] for field in signature)):
+                table.setdefault(key, []).append(route)
+        self._tables = list(tables.items())
+        return self._tables
+
+    def match(self, data: dict) -> list:
+        """
+        :return: targets with a rule matching the payload, in the order they were added
+        """
+        tables = self._tables if self._tables is not None else self.compile()
+        matched = []
+        for signature, table in tables:
+            key = tuple(normalize(data.get(field)) for field in signature)
+            for route in table.get(key, ()):
+                if all(condition.test(data) for condition in route.residual):
+                    matched.append(route)
+        if len(tables) > 1:
+            matched.sort(key=lambda route: route.position)
+        targets = []
+        for route in matched:
+            # a target linked with several rules is routed once
+            if not any(target is route.target for target in targets):
+                targets.append(route.target)
+        return targets
@@ -0,0 +1,70 @@
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+from utils.log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = get_logger(__name__)
+
+
+class SharedState:
+    """
+    A few fixed-size values in a memory-mapped file, shared by every thread and process on the host.
+    Callers read and update them inside `locked()`, which holds both a thread lock and an exclusive
+    flock on the file.
+    """
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.struct = struct.Struct(fmt)
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._pid = None
+        if fcntl is None:
+            logger.warning(f'fcntl is not available, {path} is only shared within this process')
+
+    def _open(self):
+        # a forked child shares the parent's open file description, which flock does not
+        # distinguish between processes, so each process opens the file itself
+        if self._file is not None:
+            self._map.close()
+            self._file.close()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._file = os.fdopen(fd, 'r+b')
+        if os.fstat(fd).st_size < self.struct.size:
+            self._file.write(b'\0' * self.struct.size)
+            self._file.flush()
+        self._map = mmap.mmap(fd, self.struct.size)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                yield self
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def read(self) -> tuple:
+        """Reads the stored values, only call inside locked()"""
+        return self.struct.unpack_from(self._map, 0)
+
+    def write(self, *values):
+        """Stores new values, only call inside locked()"""
+        self.struct.pack_into(self._map, 0, *values)
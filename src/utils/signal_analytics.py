@@ -0,0 +1,171 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from commons import SIGNAL_WINDOW
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+LONG_ACTIONS = ('buy', 'long')
+SHORT_ACTIONS = ('sell', 'short')
+
+
+def signal_direction(action) -> int:
+    """
+    :return: 1 for buy/long, -1 for sell/short, 0 for anything else (close, exit, ...)
+    """
+    action = str(action).lower()
+    if action in LONG_ACTIONS:
+        return 1
+    if action in SHORT_ACTIONS:
+        return -1
+    return 0
+
+
+class SignalWindow:
+    """
+    The last `capacity` signals of one (strategy, symbol), held column-wise in NumPy ring buffers.
+
+    A signal is a hit when the price at the next signal moved in its direction. Hits, flips
+    (a directional signal opposite to the previous one) and the confidence sum are kept as
+    running totals, added on push and subtracted when a signal falls out of the window, so
+    statistics never rescan history. Percentiles are read off the confidence column directly.
+    """
+
+    def __init__(self, capacity: int = SIGNAL_WINDOW):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.directions = np.zeros(capacity, dtype=np.int8)
+        self.prices = np.zeros(capacity)
+        self.confidences = np.zeros(capacity)
+        # 1 hit, 0 miss, -1 not resolved yet (no later signal, or no direction / price)
+        self.outcomes = np.full(capacity, -1, dtype=np.int8)
+        self.flips = np.zeros(capacity, dtype=np.int8)
+        self.count = 0
+        self.total = 0
+        self._next = 0
+        self._last_direction = 0
+        self._confidence_sum = 0.0
+        self._directional = 0
+        self._flip_count = 0
+        self._resolved = 0
+        self._hits = 0
+
+    def push(self, timestamp: float, direction: int, price: float, confidence: float):
+        if self.count:
+            previous = (self._next - 1) % self.capacity
+            if self.directions[previous] and self.prices[previous] > 0 and price > 0:
+                hit = int((price - float(self.prices[previous])) * int(self.directions[previous]) > 0)
+                self.outcomes[previous] = hit
+                self._resolved += 1
+                self._hits += hit
+
+        slot = self._next
+        if self.count == self.capacity:
+            # the oldest signal leaves the window
+            self._confidence_sum -= float(self.confidences[slot])
+            self._directional -= int(self.directions[slot] != 0)
+            self._flip_count -= int(self.flips[slot])
+            if self.outcomes[slot] >= 0:
+                self._resolved -= 1
+                self._hits -= int(self.outcomes[slot])
+        else:
+            self.count += 1
+
+        flip = int(bool(direction) and bool(self._last_direction) and direction != self._last_direction)
+        self.times[slot] = timestamp
+        self.directions[slot] = direction
+        self.prices[slot] = price
+        self.confidences[slot] = confidence
+        self.outcomes[slot] = -1
+        self.flips[slot] = flip
+        self._confidence_sum += confidence
+        self._directional += int(direction != 0)
+        self._flip_count += flip
+        if direction:
+            self._last_direction = direction
+        self._next = (slot + 1) % self.capacity
+        self.total += 1
+
+    def _column(self, column: np.ndarray) -> np.ndarray:
+        return column if self.count == self.capacity else column[:self.count]
+
+    def stats(self) -> dict:
+        if not self.count:
+            return {'count': 0}
+        oldest = self._next if self.count == self.capacity else 0
+        newest = (self._next - 1) % self.capacity
+        span = self.times[newest] - self.times[oldest]
+        q50, q75 = np.percentile(self._column(self.confidences), (50, 75))
+        return {
+            'count': self.count,
+            'total': self.total,
+            'hit_rate': round(self._hits / self._resolved, 4) if self._resolved else None,
+            'resolved': self._resolved,
+            'avg_confidence': round(self._confidence_sum / self.count, 4),
+            'confidence_median': float(q50),
+            'confidence_p75': float(q75),
+            'flip_rate': round(self._flip_count / (self._directional - 1), 4) if self._directional > 1 else None,
+            'signals_per_hour': round((self.count - 1) * 3600 / span, 4) if span > 0 else None,
+            'last_direction': self._last_direction,
+            'last_time': float(self.times[newest]),
+        }
+
+
+class SignalAnalytics:
+    """Rolling signal statistics per (strategy, symbol)"""
+
+    def __init__(self, window: int = SIGNAL_WINDOW):
+        self.window = window
+        self._windows: Dict[Tuple[str, str], SignalWindow] = {}
+        self._lock = threading.Lock()
+
+    def record(self, strategy: str, symbol: str, action, price: float = 0.0, confidence: float = 0.0,
+               timestamp: Optional[float] = None) -> dict:
+        """
+        Adds a signal and returns its (strategy, symbol) statistics including it
+        :param timestamp: epoch seconds, defaults to now
+        """
+        key = (str(strategy), str(symbol).upper())
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = SignalWindow(self.window)
+            window.push(time.time() if timestamp is None else timestamp, signal_direction(action),
+                        float(price or 0), float(confidence or 0))
+            return window.stats()
+
+    def stats(self, strategy: str, symbol: str) -> dict:
+        window = self._windows.get((str(strategy), str(symbol).upper()))
+        return window.stats() if window is not None else {'count': 0}
+
+    def as_json(self, strategy: str = None, symbol: str = None):
+        """
+        :return: {strategy: {symbol: stats}}, optionally filtered
+        """
+        with self._lock:
+            result = {}
+            for (name, ticker), window in self._windows.items():
+                if (strategy is None or name == strategy) and (symbol is None or ticker == symbol.upper()):
+                    result.setdefault(name, {})[ticker] = window.stats()
+            return result
+
+
+_signal_analytics = None
+_signal_analytics_lock = threading.Lock()
+
+
+def get_signal_analytics() -> SignalAnalytics:
+    """
+    Gets the process-wide signal statistics
+    :return: SignalAnalytics()
+    """
+    global _signal_analytics
+    if _signal_analytics is None:
+        with _signal_analytics_lock:
+            if _signal_analytics is None:
+                _signal_analytics = SignalAnalytics()
+    return _signal_analytics